@@ -0,0 +1,43 @@
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON configs only
+    tomllib = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+
+# Sections main.py understands; a protocol package is only imported if its section has entries
+SECTIONS = ("robots", "udp", "osc", "midi", "mappings", "feedback", "jog", "control", "sharding", "state_table", "telemetry", "validation", "interpolation")
+
+class ConfigError(ValueError):
+    pass
+
+def load_config(path=None):
+    """
+    Load a relay config (.json, or .toml on Python 3.11+). Relative paths in
+    "mappings" are resolved against the config file's directory.
+    """
+    path = os.path.abspath(path or DEFAULT_CONFIG_PATH)
+    try:
+        if path.endswith(".toml"):
+            if tomllib is None:
+                raise ConfigError("TOML configs need Python 3.11+ (tomllib); use a .json config")
+            with open(path, "rb") as f:
+                config = tomllib.load(f)
+        else:
+            with open(path) as f:
+                config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Failed to load config {path}: {e}") from e
+    unknown = set(config) - set(SECTIONS)
+    if unknown:
+        raise ConfigError(f"Unknown config sections {sorted(unknown)} (expected {list(SECTIONS)})")
+    config_dir = os.path.dirname(path)
+    mappings = config.get("mappings", {})
+    for key, value in mappings.items():
+        mappings[key] = os.path.join(config_dir, value)
+    config["path"] = path
+    return config
@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Control socket for the daemon (main.py --daemon). One JSON object per line each way:
+#   {"cmd": "send", "protocol": "tcp", "id": "Filemona", "message": "GoHome/;"}
+#   {"ok": true, "result": true}
+# Commands run on the control thread against the managers' client snapshots; nothing
+# goes through the event bus, so control traffic never queues behind (or ahead of) relays.
+#
+# Command line client, from the com_manager directory:
+#   python -m app.control [--socket PATH | --port N] list | stats | reload | stop
+#   python -m app.control send tcp Filemona "GoHome/;"
+#   python -m app.control send osc OSC_GH /status ready
+#   python -m app.control send midi RelayMIDI 0xB0 41 127
+#   python -m app.control add tcp '{"id": "Mortadela", "host": "127.0.0.1", "port": 1026}'
+#   python -m app.control remove tcp Mortadela
+
+DEFAULT_CONTROL_PATH = os.path.join(tempfile.gettempdir(), "com_manager.sock")
+DEFAULT_CONTROL_PORT = 7010  # Used where Unix-domain sockets are unavailable
+MAX_REQUEST = 65536
+
+class ControlError(ValueError):
+    pass
+
+def _jsonable(value):
+    """Stats use tuple keys (e.g. per-control conditioning); JSON needs strings"""
+    if isinstance(value, dict):
+        return {k if isinstance(k, str) else str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+def control_address(config):
+    """(family, address) of the control socket from the config's "control" section"""
+    control = config.get("control", {})
+    if "port" in control or not hasattr(socket, "AF_UNIX"):
+        return socket.AF_INET, (control.get("host", "127.0.0.1"), control.get("port", DEFAULT_CONTROL_PORT))
+    return socket.AF_UNIX, control.get("path", DEFAULT_CONTROL_PATH)
+
+class ControlServer:
+    """
+    Serves control requests for a Relay on its own thread. A single selector
+    loop handles every connection, so a slow or stuck control client costs
+    one thread at most and never touches the relay threads.
+    """
+
+    def __init__(self, relay, family, address, logger=None, on_stop=None):
+        self.relay = relay
+        self.family = family
+        self.address = address
+        self.logger = logger or print
+        self.on_stop = on_stop
+        self.selector = selectors.DefaultSelector()
+        self.server = None
+        self.thread = None
+        self.running = False
+        self.requests = 0
+        self.errors = 0
+        self.commands = {
+            "list": self.cmd_list,
+            "stats": self.cmd_stats,
+            "send": self.cmd_send,
+            "add": self.cmd_add,
+            "remove": self.cmd_remove,
+            "reload": self.cmd_reload,
+            "stop": self.cmd_stop,
+        }
+
+    def start(self):
+        if self.family == socket.AF_INET:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind(self.address)
+        else:
+            self._claim_path()
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Owner-only from the moment bind() creates the file, not after a chmod
+            umask = os.umask(0o177)
+            try:
+                self.server.bind(self.address)
+            finally:
+                os.umask(umask)
+        self.server.listen(8)
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.logger(f"[Control] Listening on {self.address}")
+
+    def _claim_path(self):
+        """Remove a socket file left by a crashed daemon; raise ControlError if a live daemon still answers on it"""
+        if not os.path.exists(self.address):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.address)
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass  # Nobody listening: stale
+            except OSError as e:
+                raise ControlError(f"Control socket {self.address} exists and cannot be checked ({e}); not replacing it")
+            else:
+                raise ControlError(f"Control socket {self.address} is in use: a daemon is already running")
+        try:
+            os.unlink(self.address)
+        except FileNotFoundError:
+            pass
+
+    def _run(self):
+        buffers = {}
+        while self.running:
+            for key, _ in self.selector.select(timeout=0.5):
+                sock = key.fileobj
+                if sock is self.server:
+                    try:
+                        connection, _ = self.server.accept()
+                    except OSError:
+                        continue
+                    connection.setblocking(False)
+                    buffers[connection] = b""
+                    self.selector.register(connection, selectors.EVENT_READ)
+                    continue
+                try:
+                    data = sock.recv(4096)
+                except OSError:
+                    data = b""
+                if not data:
+                    self._close(sock, buffers)
+                    continue
+                buffer = buffers[sock] + data
+                *lines, buffers[sock] = buffer.split(b"\n")
+                if len(buffers[sock]) > MAX_REQUEST:
+                    self._close(sock, buffers)
+                    continue
+                for line in lines:
+                    if line.strip():
+                        self._reply(sock, self.handle(line))
+        for sock in list(buffers):
+            self._close(sock, buffers)
+
+    def _close(self, sock, buffers):
+        self.selector.unregister(sock)
+        buffers.pop(sock, None)
+        sock.close()
+
+    def _reply(self, sock, response):
+        try:
+            sock.setblocking(True)
+            sock.settimeout(1.0)
+            sock.sendall(json.dumps(response).encode("utf-8") + b"\n")
+            sock.setblocking(False)
+        except OSError as e:
+            self.logger(f"[Control] Failed to reply: {e}")
+
+    def handle(self, line):
+        """One request line -> response dict"""
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ControlError("Request must be a JSON object")
+            command = self.commands.get(request.get("cmd"))
+            if command is None:
+                raise ControlError(f"Unknown command '{request.get('cmd')}' (expected one of {list(self.commands)})")
+            return {"ok": True, "result": _jsonable(command(request))}
+        except (ControlError, ValueError, KeyError, TypeError) as e:
+            self.errors += 1
+            return {"ok": False, "error": str(e) if not isinstance(e, KeyError) else f"Missing field {e}"}
+        except Exception as e:
+            # E.g. OSError from a client that fails to start; the control thread must keep answering
+            self.errors += 1
+            self.logger(f"[Control] Request failed: {e!r}")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def _manager(self, request):
+        protocol = request["protocol"]
+        manager = self.relay.managers.get(protocol)
+        if manager is None:
+            raise ControlError(f"No {protocol} clients")
+        return manager
+
+    def cmd_list(self, request):
+        return self.relay.clients()
+
+    def cmd_stats(self, request):
+        stats = self.relay.stats()
+        stats["control"] = {"requests": self.requests, "errors": self.errors}
+        return stats
+
+    def cmd_send(self, request):
+        protocol = request["protocol"]
+        manager = self._manager(request)
+        client_id = request["id"]
+        if protocol == "tcp" and self.relay.validator:
+            # Raw commands skip validation but may move the robot: measure the next targets from its reported pose
+            self.relay.validator.forget(client_id)
+        if protocol in ("tcp", "udp"):
+            return manager.send_message(client_id, request["message"])
+        if protocol == "osc":
+            return manager.send_message(client_id, request["address"], request.get("value"))
+        if protocol == "midi":
+            return manager.send_message(client_id, *request["data"][:3])
+        raise ControlError(f"Unknown protocol '{protocol}'")
+
+    def cmd_add(self, request):
+        entry = request["client"]
+        if "id" not in entry:
+            raise ControlError("Client needs an \"id\"")
+        return self.relay.add_client(request["protocol"], entry)
+
+    def cmd_remove(self, request):
+        return self.relay.remove_client(request["protocol"], request["id"])
+
+    def cmd_reload(self, request):
+        self.relay.reload()
+        return True
+
+    def cmd_stop(self, request):
+        if self.on_stop is None:
+            raise ControlError("Not running as a daemon; type quit in main.py")
+        # After this reply has gone out
+        threading.Timer(0.1, self.on_stop).start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.server:
+            self.selector.unregister(self.server)
+            self.server.close()
+            if self.family != socket.AF_INET and os.path.exists(self.address):
+                os.unlink(self.address)
+        self.selector.close()
+
+def send_request(family, address, request, timeout=10.0):
+    """Send one request to a running daemon and return its response dict"""
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+def parse_command(args):
+    """Command line words -> request dict"""
+    if not args:
+        raise ControlError("No command")
+    cmd = args[0]
+    if cmd in ("list", "stats", "reload", "stop"):
+        return {"cmd": cmd}
+    if cmd == "send" and len(args) >= 4:
+        protocol, client_id = args[1], args[2]
+        if protocol == "osc":
+            value = " ".join(args[4:]) if len(args) > 4 else None
+            return {"cmd": cmd, "protocol": protocol, "id": client_id, "address": args[3], "value": value}
+        if protocol == "midi":
+            return {"cmd": cmd, "protocol": protocol, "id": client_id, "data": [int(v, 0) for v in args[3:6]]}
+        return {"cmd": cmd, "protocol": protocol, "id": client_id, "message": " ".join(args[3:])}
+    if cmd == "add" and len(args) == 3:
+        return {"cmd": cmd, "protocol": args[1], "client": json.loads(args[2])}
+    if cmd == "remove" and len(args) == 3:
+        return {"cmd": cmd, "protocol": args[1], "id": args[2]}
+    raise ControlError(f"Cannot parse command: {' '.join(args)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to a running relay daemon")
+    parser.add_argument("--socket", default=DEFAULT_CONTROL_PATH, help="Unix-domain control socket path")
+    parser.add_argument("--port", type=int, help="Control port on 127.0.0.1 instead of a Unix socket")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    if args.port or not hasattr(socket, "AF_UNIX"):
+        family, address = socket.AF_INET, ("127.0.0.1", args.port or DEFAULT_CONTROL_PORT)
+    else:
+        family, address = socket.AF_UNIX, args.socket
+    try:
+        request = parse_command(args.command)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    start = time.perf_counter()
+    try:
+        response = send_request(family, address, request)
+    except OSError as e:
+        print(f"Cannot reach the relay at {address}: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    if not response.get("ok"):
+        print(f"Error: {response.get('error')}")
+        sys.exit(1)
+    print(json.dumps(response["result"], indent=2))
+    print(f"({elapsed * 1e3:.1f} ms)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
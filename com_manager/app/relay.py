@@ -0,0 +1,563 @@
+import importlib
+import threading
+import time
+from bus.event_bus import EventBus, RobotCommand
+from bus.adapters import (udp_publisher, tcp_publisher, osc_publisher, osc_bundle_publisher, midi_publisher, tcp_sink,
+                          targets_robot, unknown_robot_sink)
+from tcp.robot_state import RobotStateStore
+from tcp.tcp_lanes import OutboundLanes
+
+# Protocol -> (manager module, class). Imported only when the config uses the protocol,
+# so a robots-only setup never loads pythonosc or a MIDI backend.
+PROTOCOLS = {
+    "tcp": ("tcp.tcp_client_manager", "TCPClientManager"),
+    "udp": ("udp.udp_client_manager", "UDPClientManager"),
+    "osc": ("osc.osc_client_manager", "OSCClientManager"),
+    "midi": ("midi.midi_client_manager", "MIDIClientManager"),
+}
+# Config section for each protocol's client list
+SECTION_PROTOCOLS = {"robots": "tcp", "udp": "udp", "osc": "osc", "midi": "midi"}
+
+def load_class(module_name, class_name):
+    return getattr(importlib.import_module(module_name), class_name)
+
+# Helper: Synchronous TCP send/receive (for relay)
+def tcp_send_and_receive(tcp_manager, client_id, message, timeout=5):
+    client = tcp_manager.clients.get(client_id)
+    if not client or not client.connected:
+        return None
+    try:
+        client.send_message(message)
+        # Wait for a response (naive: sleep and hope for a response)
+        # In production, use a queue or event for real sync
+        time.sleep(0.5)
+        # No direct way to get the last response in current TCPClient, so just return a dummy
+        return f"[Simulated TCP response to '{message}']"
+    except Exception as e:
+        return f"[TCP error: {e}]"
+
+class Relay:
+    """
+    Every manager, relay and helper of main.py, built from a config (see app/config.py).
+
+    Clients publish what they receive onto the bus (udp/message, tcp/message,
+    osc/message, osc/bundle, midi/event); the relays subscribe to those topics
+    and publish robot/command events, which a queued sink writes to the robots.
+    start() brings up every protocol's clients in parallel.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.managers = {}
+        self.robot_state = RobotStateStore()
+        self.bus = None
+        self.osc_router = None
+        self.midi_mapping = None
+        self.feedback = None
+        self.jog = None
+        self.state_table = None
+        self.telemetry = None
+        self.validator = None
+        self.interpolator = None
+        self.interpolated = None  # Robots whose pose targets are interpolated (None: all)
+        self.refusing = set()     # (source, robot) of dense streams whose last target was rejected
+        self.state_thread = None
+        self.stopping = threading.Event()
+        self.relayed = set()  # Protocols whose relay handlers are subscribed
+        self.sinks = {}       # Robot id -> its tcp_sink subscription
+        self.started = None
+        self.startup_time = None
+
+    def manager(self, protocol):
+        manager = self.managers.get(protocol)
+        if manager is None:
+            if protocol == "tcp" and self.config.get("sharding"):
+                # Robots spread over worker processes: {"processes": N}
+                from shard.sharded_manager import ShardedTCPManager
+                manager = self.managers[protocol] = ShardedTCPManager(**self.config["sharding"])
+            else:
+                manager = self.managers[protocol] = load_class(*PROTOCOLS[protocol])()
+        return manager
+
+    def mapping_path(self, name):
+        return self.config.get("mappings", {}).get(name)
+
+    def log(self, message):
+        print(f"{time.strftime('%H:%M:%S')} {message}")
+
+    def send_to_robots(self, source, command, targets=None, reply=None):
+        if self.validator:
+            targets = self.validate(source, command, targets, reply)
+            if targets == ():
+                return
+        if self.interpolator:
+            targets = self.interpolate(command, targets)
+            if targets == ():
+                return
+        self.bus.publish(RobotCommand("robot/command", source, command, targets=targets, reply=reply))
+
+    def validate(self, source, command, targets, reply):
+        """Robots that may receive command; the others are counted and reported back to the sender"""
+        now = time.perf_counter()
+        allowed = []
+        for client_id in targets or list(self.managers["tcp"].clients):
+            reasons = self.validator.validate(client_id, command, now)
+            if reasons is None:
+                allowed.append(client_id)
+                continue
+            message = f"[Rejected for {client_id}: {', '.join(reasons)}] {command}"
+            self.log(f"[Validation] {source}: {message}")
+            if reply:
+                reply(message)
+        return tuple(allowed)
+
+    def check_stream(self, source, client_id, command, stream=False):
+        """
+        Validate one target of a dense stream (jog, interpolator); True if it may be sent. A rejection
+        is logged once per run of rejections, not at the stream's rate.
+        """
+        reasons = self.validator.validate(client_id, command, time.perf_counter(), stream=stream)
+        key = (source, client_id)
+        if reasons is None:
+            self.refusing.discard(key)
+            return True
+        if key not in self.refusing:
+            self.refusing.add(key)
+            self.log(f"[Validation] {source}: [Rejected for {client_id}: {', '.join(reasons)}] {command}")
+        return False
+
+    def interpolate(self, command, targets):
+        """Pose targets go to the interpolator; returns the robots that get command as is"""
+        direct = []
+        for client_id in targets or list(self.managers["tcp"].clients):
+            if (self.interpolated is not None and client_id not in self.interpolated) or not self.interpolator.on_command(client_id, command):
+                direct.append(client_id)
+        return tuple(direct)
+
+    def start(self):
+        started = self.started = time.perf_counter()
+        config = self.config
+        self.bus = EventBus(logger=self.log)
+        self.manager("tcp")
+        self.bus.subscribe("robot/command", unknown_robot_sink(self.sinks), name="tcp_sink_unknown")
+        for entry in config.get("robots", []):
+            self._add_sink(entry["id"])
+        if config.get("state_table"):
+            self._setup_state_table()
+        if config.get("telemetry"):
+            from telemetry.telemetry_buffer import TelemetryStore
+            # Per-robot NumPy history of the state reports, e.g. {"seconds": 600, "rate_hz": 250}
+            self.telemetry = TelemetryStore(**config["telemetry"])
+        if self.state_table or self.telemetry:
+            self._setup_commanded()
+
+        if config.get("validation"):
+            from validation.command_validator import CommandValidator
+            # Per-robot limits ("*" for any robot) checked before pose/ and joints/ commands leave the relay
+            self.validator = CommandValidator(config["validation"], state_store=self.robot_state, logger=self.log)
+        if config.get("interpolation"):
+            self._setup_interpolation()
+
+        if config.get("jog"):
+            self._setup_jog()
+        for protocol in ("udp", "osc", "midi"):
+            if config.get(protocol):
+                self._setup_relay(protocol)
+
+        # All protocols in parallel; each manager also starts its own clients concurrently
+        threads = []
+        for section, protocol in SECTION_PROTOCOLS.items():
+            specs = [self._client_spec(protocol, entry) for entry in config.get(section, [])]
+            if specs:
+                threads.append(threading.Thread(target=self.manager(protocol).add_clients, args=(specs,), daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for client_id in list(self.sinks):
+            if client_id not in self.managers["tcp"].clients:
+                self._remove_sink(client_id)
+
+        if "midi" in self.managers:
+            for entry in config["midi"]:
+                self.managers["midi"].set_led_source(entry["id"], self.update_leds)
+        if config.get("osc") and config.get("feedback", {}).get("rate_hz"):
+            from osc.osc_feedback import FeedbackPublisher
+            # Stream robot state back as /robot/<name>/pose and /robot/<name>/joints
+            self.feedback = FeedbackPublisher(self.robot_state, self.manager("osc"), rate_hz=config["feedback"]["rate_hz"],
+                                              osc_client_ids=config["feedback"].get("osc_clients"), logger=self.log)
+            self.feedback.start()
+        self.startup_time = time.perf_counter() - started
+        return self
+
+    def _client_spec(self, protocol, entry):
+        spec = {key: value for key, value in entry.items() if key != "id"}
+        spec["client_id"] = entry["id"]
+        bus = self.bus
+        if protocol == "tcp":
+            spec["on_message"] = tcp_publisher(bus, handled=self.on_robot_message)
+        elif protocol == "udp":
+            spec["on_message"] = udp_publisher(bus)
+        elif protocol == "osc":
+            spec["on_message"] = osc_publisher(bus)
+            spec["on_bundle"] = osc_bundle_publisher(bus)
+        elif protocol == "midi":
+            spec = self._midi_spec(spec)
+            spec["on_message"] = midi_publisher(bus)
+        return spec
+
+    def add_client(self, protocol, entry):
+        """Add one client at runtime, given as a config entry (with "id"); returns False if it exists"""
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol '{protocol}' (expected one of {list(PROTOCOLS)})")
+        self._setup_relay(protocol)
+        new_sink = protocol == "tcp" and entry["id"] not in self.sinks
+        if new_sink:
+            self._add_sink(entry["id"])
+        ok = self.manager(protocol).add_client(**self._client_spec(protocol, entry))
+        if not ok and new_sink:
+            self._remove_sink(entry["id"])
+        if ok and protocol == "midi":
+            self.managers["midi"].set_led_source(entry["id"], self.update_leds)
+        return ok
+
+    def remove_client(self, protocol, client_id):
+        manager = self.managers.get(protocol)
+        removed = bool(manager) and manager.remove_client(client_id)
+        if removed and protocol == "tcp":
+            self._remove_sink(client_id)
+        return removed
+
+    def _add_sink(self, client_id):
+        # One queue and thread per robot, so one robot's stalled socket never holds up another.
+        # Lossless for commands: only stream targets (superseded by the next one) are dropped under overload
+        self.sinks[client_id] = self.bus.subscribe("robot/command", tcp_sink(self.managers["tcp"], client_id),
+                                                   name=f"tcp_sink/{client_id}", queue_size=1024,
+                                                   droppable=lambda event: event.stream, select=targets_robot(client_id))
+
+    def _remove_sink(self, client_id):
+        subscription = self.sinks.pop(client_id, None)
+        if subscription:
+            self.bus.unsubscribe(subscription)
+
+    def on_robot_message(self, client, message):
+        if not self.robot_state.on_tcp_message(client, message):
+            return False
+        if self.state_table or self.telemetry:
+            state = self.robot_state.get(client.client_id)
+            if self.state_table:
+                self.state_table.update_robot(client.client_id, connected=True, pose=state.pose, joints=state.joints, report=True)
+            if self.telemetry:
+                self.telemetry.on_state(state)
+        return True
+
+    def record_commanded(self, client_id, pose):
+        if pose is None:
+            return
+        if self.state_table:
+            self.state_table.update_robot(client_id, commanded=pose)
+        if self.telemetry:
+            self.telemetry.set_commanded(client_id, pose)
+
+    def _setup_commanded(self):
+        """Commanded poses for the state table and telemetry, from every pose command on the bus"""
+        from shard.state_table import parse_pose_command
+        tcp_manager = self.manager("tcp")
+
+        def record_command(event):
+            pose = parse_pose_command(event.command)
+            if pose:
+                for client_id in event.targets or list(tcp_manager.clients):
+                    self.record_commanded(client_id, pose)
+        self.bus.subscribe("robot/command", record_command, name="commanded")
+
+    def _setup_state_table(self):
+        """Latest robot and input state in shared memory for other processes (python -m shard.state_table)"""
+        from shard.state_table import StateTable
+        options = self.config["state_table"]
+        self.state_table = table = StateTable(options.get("name", "com_manager_state"), robots=options.get("robots", 16),
+                                              inputs=options.get("inputs", 256), create=True)
+        tcp_manager = self.manager("tcp")
+
+        def record_midi(bus_event):
+            event = bus_event.event
+            table.update_input(f"{bus_event.source}/{event.kind}/{event.channel}/{event.controller}", event.value)
+        self.bus.subscribe("midi/event", record_midi, name="state_table_midi")
+
+        def record_osc(event):
+            if event.args and isinstance(event.args[0], (int, float)):
+                table.update_input(f"{event.source}{event.address}", event.args[0])
+        self.bus.subscribe("osc/message", record_osc, name="state_table_osc")
+
+        # Connection changes have no callback; check them a few times a second
+        def record_connections():
+            connected = {}
+            while not self.stopping.wait(0.1):
+                for client_id, client in tcp_manager.clients.items():
+                    if connected.get(client_id) != client.connected:
+                        connected[client_id] = client.connected
+                        table.update_robot(client_id, connected=client.connected)
+        self.state_thread = threading.Thread(target=record_connections, daemon=True)
+        self.state_thread.start()
+
+    def _setup_relay(self, protocol):
+        if protocol in self.relayed or protocol == "tcp":
+            return
+        self.relayed.add(protocol)
+        getattr(self, f"_setup_{protocol}")()
+
+    def _setup_udp(self):
+        tcp_manager = self.manager("tcp")
+        udp_manager = self.manager("udp")
+
+        def udp_relay(event):
+            print(f"[Relay] UDP message from {event.addr}: {event.text}")
+            tcp_response = tcp_send_and_receive(tcp_manager, "RelayTCP", event.text)
+            client = udp_manager.clients.get(event.source)
+            if tcp_response and client:
+                client.send_message(tcp_response, addr=event.addr)
+        self.bus.subscribe("udp/message", udp_relay)
+
+    def _setup_osc(self):
+        from osc.osc_router import OSCRouter
+        tcp_manager = self.manager("tcp")
+        osc_manager = self.manager("osc")
+        # OSC routing table: OSC address patterns -> RAPID command templates,
+        # hot-reloaded from the mapping file while connections stay up
+        self.osc_router = osc_router = OSCRouter(logger=self.log)
+        if self.mapping_path("osc"):
+            osc_router.load_mapping(self.mapping_path("osc"))
+            osc_router.watch()
+
+        # Route OSC messages into one batch of RAPID commands per robot
+        def osc_to_rapid(messages):
+            batches = {}
+            for address, args in messages:
+                results = osc_router.dispatch(address, args)
+                if not results:
+                    print(f"[Relay] Unknown OSC message: {address}, {args}")
+                for route, msg in results:
+                    for client_id in route.targets or list(tcp_manager.clients):
+                        batches.setdefault(client_id, []).append(msg)
+            return {client_id: "".join(msgs) for client_id, msgs in batches.items()}
+
+        # TCP errors go back to the OSC client that sent the command
+        def osc_reply(client_id, address):
+            return lambda text: osc_manager.send_message(client_id, address, text)
+
+        def osc_relay(event):
+            print(f"[Relay] OSC message {event.address} {event.args}")
+            for client_id, msg in osc_to_rapid([(event.address, event.args)]).items():
+                self.send_to_robots(event.source, msg, targets=(client_id,), reply=osc_reply(event.source, event.address))
+        self.bus.subscribe("osc/message", osc_relay)
+
+        # Every message in a bundle goes out in a single TCP write per robot,
+        # so RAPID never applies half of it
+        def osc_bundle_relay(event):
+            messages = event.messages
+            print(f"[Relay] OSC bundle {[address for address, _ in messages]}")
+            for client_id, msg in osc_to_rapid(messages).items():
+                self.send_to_robots(event.source, msg, targets=(client_id,), reply=osc_reply(event.source, messages[0][0]))
+        self.bus.subscribe("osc/bundle", osc_bundle_relay)
+
+    def _setup_interpolation(self):
+        """Dense pose stream at the robots' rate between sparse pose targets, e.g. {"rate_hz": 100, "robots": ["Filemona"]}"""
+        from interpolation.pose_interpolator import PoseInterpolator
+        options = dict(self.config["interpolation"])
+        robots = options.pop("robots", None)
+        self.interpolated = set(robots) if robots else None
+
+        # Samples are validated too: Catmull-Rom can overshoot the keyframes out of the workspace.
+        # Only where they are is checked; their steps are smooth and the keyframes had the full check.
+        def send(client_id, command):
+            if self.validator and not self.check_stream("interpolator", client_id, command, stream=True):
+                return
+            self.bus.publish(RobotCommand("robot/command", "interpolator", command, targets=(client_id,), log=False, stream=True))
+        self.interpolator = PoseInterpolator(send, state_store=self.robot_state, logger=self.log, **options)
+        self.interpolator.start()
+
+    def _setup_jog(self):
+        from jog.jog_controller import JogController
+        from shard.state_table import parse_pose_command
+        jog = self.config["jog"]
+        robot = jog["robot"]
+        axes = {int(controller): axis for controller, axis in jog.get("axes", {"16": "x", "17": "y", "18": "z"}).items()}
+        options = {key: jog[key] for key in ("channel", "deadzone", "workspace") if key in jog}
+        limits = self.validator.limits_for(robot) if self.validator else None
+        if "workspace" not in options and limits is not None and limits.workspace is not None:
+            # Stop at the validator's workspace walls instead of having targets rejected there
+            options["workspace"] = limits.workspace.tolist()
+        self.jog = JogController(robot, self.manager("tcp"), axes=axes, rate_hz=jog.get("rate_hz", 50),
+                                 max_speed=jog.get("max_speed", 100.0), state_store=self.robot_state, logger=self.log,
+                                 **options)
+        send = self.jog.send
+        record = self.state_table or self.telemetry
+
+        # Jog targets skip the bus queue for latency, but get the same checks as relayed
+        # commands: the validator, and stopping any interpolated stream to the robot
+        def jog_send(command):
+            if self.interpolator:
+                self.interpolator.reset(robot)
+            if self.validator and not self.check_stream("jog", robot, command):
+                return False
+            if record:
+                self.record_commanded(robot, parse_pose_command(command))
+            return send(command)
+        self.jog.send = jog_send
+        self.jog.start()
+
+    def _setup_midi(self):
+        from midi.midi_mapping import MIDIMapping
+        # MIDI mapping: controls -> RAPID command templates, hot-reloaded while connections stay up
+        self.midi_mapping = midi_mapping = MIDIMapping(logger=self.log)
+        if self.mapping_path("midi"):
+            midi_mapping.load_mapping(self.mapping_path("midi"))
+            midi_mapping.watch()
+        jog = self.jog
+
+        def midi_relay(bus_event):
+            event = bus_event.event
+            if jog and jog.on_midi(event):
+                return
+            for binding, msg in midi_mapping.dispatch(event):
+                print(f"[Relay] MIDI {binding.name}: {msg}")
+                self.send_to_robots(bus_event.source, msg, targets=binding.targets)
+        self.bus.subscribe("midi/event", midi_relay)
+
+    def _midi_spec(self, spec):
+        """Resolve "device": "auto" and "output_device": "auto" against the backend's device lists"""
+        from midi.midi_backend import get_backend
+        device = spec.pop("device", "auto")
+        output = spec.pop("output_device", "auto")
+        backend = get_backend(spec.get("backend"))
+        if device == "auto":
+            # Auto-select MIDI device if only one is present
+            devices = backend.list_devices() if backend else []
+            print(f"[MIDI] Found {len(devices)} MIDI devices: {devices}")
+            device = devices[0][0] if devices else 0
+            if len(devices) > 1:
+                print(f"[MIDI] Multiple devices found, using the first: {devices[0][1]}")
+            elif not devices:
+                print("[MIDI] No MIDI devices found. MIDI client may not work.")
+        else:
+            devices = None
+        if output == "auto":
+            # The nanoKONTROL2 exposes an output port with the same name as its input
+            output = None
+            input_name = dict(devices or (backend.list_devices() if backend else [])).get(device)
+            if input_name and backend:
+                for index, name in backend.list_output_devices():
+                    if name.split()[0] == input_name.split()[0]:
+                        output = index
+                        break
+        spec["device_index"] = device
+        spec["output_device_index"] = output
+        return spec
+
+    # Button LEDs per robot (track 1 = first robot): S = connected, R = streaming state
+    def update_leds(self, leds):
+        from midi.midi_led import SOLO, RECORD, CYCLE
+        tcp_manager = self.managers["tcp"]
+        now = time.time()
+        states = {}
+        for i, client_id in enumerate(list(tcp_manager.clients)[:len(SOLO)]):
+            client = tcp_manager.clients.get(client_id)
+            state = self.robot_state.get(client_id)
+            states[SOLO[i]] = bool(client and client.connected)
+            states[RECORD[i]] = bool(state and now - state.timestamp < 0.5)
+        states[CYCLE] = bool(self.jog and self.jog.enabled)
+        leds.set_many(states)
+
+    def robots_connected(self):
+        clients = self.managers["tcp"].clients
+        return bool(clients) and all(client.connected for client in clients.values())
+
+    def wait_connected(self, timeout=10.0):
+        """Wait until every robot is connected; returns the seconds since start() began, or None on timeout"""
+        deadline = time.perf_counter() + timeout
+        while not self.robots_connected():
+            if time.perf_counter() > deadline:
+                return None
+            time.sleep(0.005)
+        return self.startup_time + (time.perf_counter() - deadline + timeout)
+
+    def clients(self):
+        """{protocol: {client_id: description}} from the current client snapshots"""
+        return {protocol: {client_id: " ".join(line.strip() for line in manager.describe(client_id, client))
+                           for client_id, client in manager.clients.items()}
+                for protocol, manager in self.managers.items()}
+
+    def stats(self):
+        stats = {
+            "uptime_s": time.perf_counter() - self.started,
+            "startup_s": self.startup_time,
+            "bus": {"published": self.bus.published, "unrouted": self.bus.unrouted, "subscriptions": self.bus.stats()},
+        }
+        if "midi" in self.managers:
+            stats["midi"] = {client_id: client.stats() for client_id, client in self.managers["midi"].clients.items()}
+        lanes = {client_id: client.lanes.stats() for client_id, client in self.managers["tcp"].clients.items()
+                 if isinstance(getattr(client, "lanes", None), OutboundLanes)}
+        if lanes:
+            stats["lanes"] = lanes
+        if "osc" in self.managers:
+            stats["osc"] = {client_id: client.stats() for client_id, client in self.managers["osc"].clients.items()}
+        if self.jog:
+            stats["jog"] = dict(self.jog.stats(), enabled=self.jog.enabled)
+        if self.feedback:
+            stats["feedback"] = self.feedback.stats()
+        if self.state_table:
+            stats["state_table"] = self.state_table.stats()
+        if self.validator:
+            stats["validation"] = self.validator.stats()
+        if self.interpolator:
+            stats["interpolation"] = self.interpolator.stats()
+        if self.telemetry:
+            stats["telemetry"] = {client_id: dict(ring, last_10s=self.telemetry.summary(client_id))
+                                  for client_id, ring in self.telemetry.stats().items()}
+        return stats
+
+    def list(self):
+        for manager in self.managers.values():
+            manager.list_clients()
+        self.bus.list_subscriptions()
+        if self.jog:
+            jog = self.jog
+            stats = jog.stats()
+            print(f"[Jog:{jog.client_id}] {'on' if jog.enabled else 'off'}, {stats['sent']} poses, "
+                  f"jitter p99 {stats['jitter_p99_ms']:.2f} ms, latency p99 {stats['latency_p99_ms']:.2f} ms")
+        if self.interpolator:
+            stats = self.interpolator.stats()
+            for client_id, robot in stats["robots"].items():
+                print(f"[Interpolator:{client_id}] {robot['keyframes']} targets in, {robot['sent']} poses out, "
+                      f"input every {robot['input_interval_ms']:.0f} ms, delay {robot['delay_ms']:.0f} ms, {robot['underruns']} underruns")
+        if self.telemetry:
+            for client_id in list(self.telemetry.rings):
+                summary = self.telemetry.summary(client_id)
+                if summary:
+                    error = summary["tracking_error_max_mm"]
+                    print(f"[Telemetry:{client_id}] last 10 s: {summary['rate']['rate_hz']:.0f} Hz, "
+                          f"peak speed {summary['peak_speed']:.1f} mm/s, peak accel {summary['peak_acceleration']:.0f} mm/s^2, "
+                          f"tracking error max {'-' if error is None else f'{error:.2f} mm'}")
+
+    def reload(self):
+        if self.osc_router and self.mapping_path("osc"):
+            self.osc_router.load_mapping(self.mapping_path("osc"))
+        if self.midi_mapping and self.mapping_path("midi"):
+            self.midi_mapping.load_mapping(self.mapping_path("midi"))
+
+    def stop(self):
+        self.stopping.set()
+        for helper in (self.osc_router, self.midi_mapping, self.feedback, self.jog, self.interpolator):
+            if helper:
+                helper.stop()
+        if self.bus:
+            self.bus.stop()
+        # Managers stop their clients in parallel; run the managers in parallel too
+        threads = [threading.Thread(target=manager.stop_all, daemon=True) for manager in self.managers.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.state_table:
+            self.state_thread.join()
+            self.state_table.close()
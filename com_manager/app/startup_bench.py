@@ -0,0 +1,125 @@
+import argparse
+import socket
+import subprocess
+import sys
+import threading
+import time
+from tcp.tcp_client import TCPClient
+from tcp.tcp_client_manager import TCPClientManager
+from .relay import Relay
+
+# Startup benchmark: time from launch until every robot is connected. Run from the com_manager directory:
+#   python -m app.startup_bench [--robots 8] [--repeat 3]
+
+# What the old main.py imported before doing anything, whatever the setup
+EAGER_IMPORTS = ("tcp.tcp_client_manager", "udp.udp_client_manager", "osc.osc_client_manager",
+                 "midi.midi_client_manager", "midi.nanokontrol2_reader", "midi.midi_mapping", "midi.midi_led",
+                 "jog.jog_controller", "bus.event_bus", "bus.adapters", "osc.osc_router", "osc.osc_feedback",
+                 "tcp.robot_state")
+
+def _quiet(message):
+    pass
+
+class _MockController:
+    """Accepts connections like rapid/Server.mod and discards what it receives"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(4)
+        self.port = self.server.getsockname()[1]
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections.append(connection)
+
+    def close(self):
+        self.server.close()
+        for connection in self.connections:
+            connection.close()
+
+class _FixedWaitTCPClient(TCPClient):
+    """The previous TCPClient.start(): always sleeps 0.5 s for the first connect"""
+
+    def start(self):
+        self.connect_thread = threading.Thread(target=self.connect_to_server, daemon=True)
+        self.connect_thread.start()
+        time.sleep(0.5)
+        self.listen_thread = threading.Thread(target=self.listen_for_messages, daemon=True)
+        self.listen_thread.start()
+
+def _all_connected(clients):
+    return all(client.connected for client in clients.values())
+
+def bench_legacy(ports):
+    """One add_client after another, each waiting the fixed 0.5 s"""
+    manager = TCPClientManager()
+    manager.log = _quiet
+    start = time.perf_counter()
+    for i, port in enumerate(ports):
+        manager._add(f"robot{i}", lambda i=i, port=port: _FixedWaitTCPClient(f"robot{i}", "127.0.0.1", port, logger=_quiet), "")
+    while not _all_connected(manager.clients):
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    manager.stop_all()
+    return elapsed
+
+def bench_config(ports):
+    """A robots-only config through Relay: clients start in parallel and return once connected"""
+    config = {"robots": [{"id": f"robot{i}", "host": "127.0.0.1", "port": port} for i, port in enumerate(ports)]}
+    relay = Relay(config)
+    relay.log = _quiet
+    relay.manager("tcp").log = _quiet
+    start = time.perf_counter()
+    relay.start()
+    while not relay.robots_connected():
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    relay.stop()
+    return elapsed
+
+def bench_imports(mode, repeat=3):
+    """Best wall time of a fresh interpreter importing what each startup needs"""
+    if mode == "eager":
+        code = "; ".join(f"import {module}" for module in EAGER_IMPORTS)
+    else:
+        code = "import app.config, app.relay"
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay startup benchmark")
+    parser.add_argument("--robots", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    controllers = [_MockController() for _ in range(args.robots)]
+    ports = [controller.port for controller in controllers]
+    try:
+        print(f"{'startup':<8} {'imports s':>10} {'connect s':>10} {'total s':>8}")
+        results = {}
+        for mode, bench, imports in (("legacy", bench_legacy, "eager"), ("config", bench_config, "lazy")):
+            import_time = bench_imports(imports, args.repeat)
+            connect_time = min(bench(ports) for _ in range(args.repeat))
+            results[mode] = import_time + connect_time
+            print(f"{mode:<8} {import_time:>10.3f} {connect_time:>10.3f} {results[mode]:>8.3f}")
+        print(f"time_to_all_connected_s={results['config']:.3f} (legacy {results['legacy']:.3f}, "
+              f"{results['legacy'] / results['config']:.1f}x faster, {args.robots} robots)")
+    finally:
+        for controller in controllers:
+            controller.close()
+
+if __name__ == "__main__":
+    main()
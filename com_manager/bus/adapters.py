@@ -0,0 +1,69 @@
+from .event_bus import TextMessage, OSCMessage, OSCBundle, MIDIMessage
+
+# Callbacks with each client's on_message signature that publish onto an EventBus,
+# and the TCP sink that turns RobotCommand events into sends.
+
+def udp_publisher(bus, topic="udp/message"):
+    def on_message(client, message, addr):
+        bus.publish(TextMessage(topic, client.client_id, message, addr))
+    return on_message
+
+def tcp_publisher(bus, topic="tcp/message", handled=None):
+    """TCPClient on_message; handled(client, message), e.g. RobotStateStore.on_tcp_message, runs first"""
+    def on_message(client, message):
+        result = handled(client, message) if handled else False
+        bus.publish(TextMessage(topic, client.client_id, message))
+        return result
+    return on_message
+
+def osc_publisher(bus, topic="osc/message"):
+    def on_message(client, address, args):
+        bus.publish(OSCMessage(topic, client.client_id, address, args))
+    return on_message
+
+def osc_bundle_publisher(bus, topic="osc/bundle"):
+    def on_bundle(client, timetag, messages):
+        bus.publish(OSCBundle(topic, client.client_id, timetag, messages))
+    return on_bundle
+
+def midi_publisher(bus, topic="midi/event"):
+    def on_message(client, event, midi_data, timestamp, simple=None):
+        bus.publish(MIDIMessage(topic, client.client_id, event))
+    return on_message
+
+def tcp_sink(tcp_manager, client_id):
+    """
+    Handler for RobotCommand events to one robot, reporting failures through reply. Subscribe one
+    per robot, each on its own queue and with select=targets_robot(client_id), so a robot whose
+    socket stalls only holds up its own commands.
+    """
+    def send_command(event):
+        client = tcp_manager.clients.get(client_id)
+        if not client or not client.connected:
+            error = f"[TCP error: {client_id} is not connected]" if client else f"[TCP error: unknown robot {client_id}]"
+        else:
+            try:
+                if client.send_message(event.command, log=event.log):
+                    return
+                error = f"[TCP error: send to {client_id} failed]"
+            except Exception as e:
+                error = f"[TCP error: {e}]"
+        if event.reply:
+            event.reply(f"{error} {event.command}")
+    return send_command
+
+def targets_robot(client_id):
+    """select for a robot's tcp_sink: commands to it, or to every robot"""
+    def select(event):
+        return not event.targets or client_id in event.targets
+    return select
+
+def unknown_robot_sink(sinks):
+    """Handler for RobotCommand events that replies for targets without a tcp_sink (ids -> subscription)"""
+    def reply_unknown(event):
+        if not event.targets or not event.reply:
+            return
+        for client_id in event.targets:
+            if client_id not in sinks:
+                event.reply(f"[TCP error: unknown robot {client_id}] {event.command}")
+    return reply_unknown
@@ -0,0 +1,130 @@
+import argparse
+import fnmatch
+import queue
+import threading
+import time
+from .event_bus import EventBus, OSCMessage, RobotCommand, _percentile
+
+# Event bus benchmarks. Run from the com_manager directory:
+#   python -m bus.bus_bench [--events 200000]
+
+class _NaiveBus:
+    """Per-publish fnmatch over every subscriber and a queue.Queue per queued subscriber, for comparison"""
+
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, pattern, handler, queue_size=None):
+        if queue_size:
+            q = queue.Queue(maxsize=queue_size)
+
+            def run():
+                while True:
+                    item = q.get()
+                    if item is None:
+                        return
+                    handler(item)
+            threading.Thread(target=run, daemon=True).start()
+            self.subscribers.append((pattern, q.put, q))
+        else:
+            self.subscribers.append((pattern, handler, None))
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for pattern, deliver, _ in subscribers:
+            if fnmatch.fnmatchcase(event.topic, pattern):
+                deliver(event)
+
+    def stop(self):
+        for _, _, q in self.subscribers:
+            if q is not None:
+                q.put(None)
+
+def _setup(bus_type, mode, latencies, done, count):
+    def handler(event):
+        latencies.append(time.perf_counter() - event.created)
+        if len(latencies) == count:
+            done.set()
+
+    if bus_type == "naive":
+        bus = _NaiveBus()
+        for topic in ("udp/message", "tcp/message", "midi/*", "robot/command"):
+            bus.subscribe(topic, lambda event: None)
+        bus.subscribe("osc/*", handler, queue_size=None if mode == "direct" else 1 << 20)
+        return bus
+    bus = EventBus(logger=lambda message: None)
+    for topic in ("udp/message", "tcp/message", "midi/*", "robot/command"):
+        bus.subscribe(topic, lambda event: None)
+    if mode == "direct":
+        bus.subscribe("osc/*", handler)
+    else:
+        bus.subscribe("osc/*", handler, queue_size=1 << 20, queue=mode)
+    return bus
+
+def bench_publish(bus_type, mode, events=200000):
+    """Publish OSC events from one thread to one subscriber among five; throughput and publish -> handler latency"""
+    latencies = []
+    done = threading.Event()
+    bus = _setup(bus_type, mode, latencies, done, events)
+    start = time.perf_counter()
+    for i in range(events):
+        bus.publish(OSCMessage("osc/message", "bench", "/pose", (i,)))
+    publish_time = time.perf_counter() - start
+    done.wait(30)
+    total = time.perf_counter() - start
+    bus.stop()
+    return {
+        "bus": bus_type,
+        "mode": mode,
+        "publish_per_s": events / publish_time,
+        "delivered_per_s": len(latencies) / total,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+    }
+
+def bench_chain(events=20000, rate=2000.0):
+    """OSC input -> relay (direct) -> robot/command (queued sink): latency of each hop at a paced rate"""
+    bus = EventBus(logger=lambda message: None)
+    sink_latency = []
+
+    def relay(event):
+        bus.publish(RobotCommand("robot/command", event.source, f"pose/[[{event.args[0]},0,0],[1,0,0,0]];"))
+
+    def sink(event):
+        sink_latency.append(time.perf_counter() - event.created)
+
+    relay_sub = bus.subscribe("osc/message", relay, name="relay")
+    sink_sub = bus.subscribe("robot/command", sink, name="sink", queue_size=4096)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    for i in range(events):
+        bus.publish(OSCMessage("osc/message", "bench", "/pose", (i,)))
+        ahead = start + (i + 1) * interval - time.perf_counter()
+        if ahead > 0:
+            time.sleep(ahead)
+    time.sleep(0.1)
+    bus.stop()
+    return {"relay": relay_sub.stats(), "sink": sink_sub.stats(), "sink_delivered": len(sink_latency)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Event bus benchmarks")
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--rate", type=float, default=2000.0, help="Paced event rate for the hop latency run")
+    args = parser.parse_args()
+
+    print(f"{'bus':<6} {'mode':<7} {'publish/s':>10} {'delivered/s':>11} {'p50 us':>8} {'p99 us':>9}")
+    for bus_type, mode in (("naive", "direct"), ("bus", "direct"), ("naive", "queued"), ("bus", "mpsc"), ("bus", "spsc")):
+        r = bench_publish(bus_type, mode, events=args.events)
+        print(f"{r['bus']:<6} {r['mode']:<7} {r['publish_per_s']:>10.0f} {r['delivered_per_s']:>11.0f} {r['p50_us']:>8.1f} {r['p99_us']:>9.1f}")
+
+    r = bench_chain(events=min(args.events, 20000), rate=args.rate)
+    print(f"\nOSC -> relay -> queued TCP sink at {args.rate:.0f} events/s ({r['sink_delivered']} delivered):")
+    for hop in ("relay", "sink"):
+        s = r[hop]
+        print(f"  {hop:<6} latency p50 {s['latency_p50_ms'] * 1e3:.1f} us, p99 {s['latency_p99_ms'] * 1e3:.1f} us, "
+              f"queue wait p99 {s['queue_wait_p99_ms'] * 1e3:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import collections
+import threading
+import time
+
+# Typed events. Topics are "<protocol>/<kind>", e.g. "osc/message", "midi/event",
+# "robot/command"; subscribers can use an exact topic, a "prefix/*" pattern or "*".
+
+class BusEvent:
+    __slots__ = ("topic", "source", "created")
+
+    def __init__(self, topic, source):
+        self.topic = topic
+        self.source = source  # client_id of the producer
+        self.created = time.perf_counter()
+
+class TextMessage(BusEvent):
+    """A text message from a UDP or TCP client; addr is the sender (UDP) or None"""
+
+    __slots__ = ("text", "addr")
+
+    def __init__(self, topic, source, text, addr=None):
+        super().__init__(topic, source)
+        self.text = text
+        self.addr = addr
+
+class OSCMessage(BusEvent):
+    __slots__ = ("address", "args")
+
+    def __init__(self, topic, source, address, args):
+        super().__init__(topic, source)
+        self.address = address
+        self.args = args
+
+class OSCBundle(BusEvent):
+    """Every message of a bundle, [(address, args)], kept together"""
+
+    __slots__ = ("timetag", "messages")
+
+    def __init__(self, topic, source, timetag, messages):
+        super().__init__(topic, source)
+        self.timetag = timetag
+        self.messages = messages
+
+class MIDIMessage(BusEvent):
+    """Wraps a decoded midi_event.MIDIEvent"""
+
+    __slots__ = ("event",)
+
+    def __init__(self, topic, source, event):
+        super().__init__(topic, source)
+        self.event = event
+
+class RobotCommand(BusEvent):
+    """
+    RAPID command text for some robots (targets None = every robot); reply(text) reports errors back,
+    log=False for streams. stream=True marks a target the next one supersedes, which an overloaded
+    sink may drop; other commands are never dropped.
+    """
+
+    __slots__ = ("targets", "command", "reply", "log", "stream")
+
+    def __init__(self, topic, source, command, targets=None, reply=None, log=True, stream=False):
+        super().__init__(topic, source)
+        self.command = command
+        self.targets = targets
+        self.reply = reply
+        self.log = log
+        self.stream = stream
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class MPSCQueue:
+    """
+    Bounded queue for any number of producer threads and one consumer; drops the oldest when full.
+    With droppable(item), only the oldest item it accepts is dropped, and if there is none the
+    queue grows past maxlen instead (counted in overflowed).
+    """
+
+    def __init__(self, maxlen=1024, droppable=None):
+        self.maxlen = maxlen
+        self.droppable = droppable
+        self.items = collections.deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.overflowed = 0
+
+    def put(self, item):
+        with self.cond:
+            items = self.items
+            if len(items) >= self.maxlen:
+                if self.droppable is None:
+                    items.popleft()
+                    self.dropped += 1
+                else:
+                    self._drop_one(items)
+            items.append(item)
+            if len(items) == 1:
+                self.cond.notify()
+
+    def _drop_one(self, items):
+        droppable = self.droppable
+        for i, queued in enumerate(items):
+            if droppable(queued):
+                del items[i]
+                self.dropped += 1
+                return
+        self.overflowed += 1
+
+    def get_batch(self, timeout=None):
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            batch = list(self.items)
+            self.items.clear()
+            return batch
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+class SPSCQueue(MPSCQueue):
+    """
+    Bounded queue for exactly one producer thread and one consumer. put()
+    only takes the lock when the consumer is asleep; deque append/popleft are
+    atomic, so the fast path needs none.
+    """
+
+    def __init__(self, maxlen=1024, droppable=None):
+        if droppable is not None:
+            raise ValueError("droppable needs the locked put() of an mpsc queue")
+        super().__init__(maxlen)
+        self.waiting = False
+
+    def put(self, item):
+        items = self.items
+        if len(items) >= self.maxlen:
+            try:
+                items.popleft()
+                self.dropped += 1
+            except IndexError:
+                pass
+        items.append(item)
+        if self.waiting:
+            with self.cond:
+                self.cond.notify()
+
+    def get_batch(self, timeout=None):
+        items = self.items
+        if not items:
+            with self.cond:
+                self.waiting = True
+                # Re-check after announcing: a put() before this saw waiting == False
+                if not items and not self.closed:
+                    self.cond.wait(timeout)
+                self.waiting = False
+        batch = []
+        while items:
+            batch.append(items.popleft())
+        return batch
+
+QUEUE_TYPES = {"mpsc": MPSCQueue, "spsc": SPSCQueue}
+
+class Subscription:
+    """
+    A handler on a topic pattern. Without a queue the handler runs in the
+    publisher's thread; with one, events are queued and a consumer thread
+    drains them in batches, so a slow output never blocks an input.
+    """
+
+    def __init__(self, pattern, handler, name=None, queue_size=None, queue="mpsc", droppable=None, select=None, logger=None,
+                 samples=4096):
+        self.pattern = pattern
+        self.handler = handler
+        self.select = select  # select(event) False skips the event before it is queued
+        self.name = name or getattr(handler, "__name__", repr(handler))
+        self.logger = logger or print
+        self.delivered = 0
+        self.errors = 0
+        self.latency = collections.deque(maxlen=samples)     # publish -> handler start, seconds
+        self.queue_wait = collections.deque(maxlen=samples)  # enqueue -> dequeue, seconds
+        self.queue = None
+        self.thread = None
+        self.running = False
+        if queue_size:
+            if queue not in QUEUE_TYPES:
+                raise ValueError(f"Unknown queue type '{queue}' (expected one of {list(QUEUE_TYPES)})")
+            # Queued items are (event, enqueue time); droppable(event) picks what may be dropped when full
+            self.queue = QUEUE_TYPES[queue](queue_size, droppable=(lambda item: droppable(item[0])) if droppable else None)
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def matches(self, topic):
+        pattern = self.pattern
+        if pattern == "*" or pattern == topic:
+            return True
+        return pattern.endswith("/*") and topic.startswith(pattern[:-1])
+
+    def deliver(self, event):
+        if self.select is not None and not self.select(event):
+            return
+        if self.queue is not None:
+            self.queue.put((event, time.perf_counter()))
+        else:
+            self._handle(event, time.perf_counter())
+
+    def _handle(self, event, now):
+        self.latency.append(now - event.created)
+        try:
+            self.handler(event)
+        except Exception as e:
+            self.errors += 1
+            self.logger(f"[Bus] {self.name} error on {event.topic}: {e}")
+        self.delivered += 1
+
+    def _run(self):
+        queue = self.queue
+        while self.running:
+            batch = queue.get_batch(timeout=0.5)
+            now = time.perf_counter()
+            for event, queued in batch:
+                self.queue_wait.append(now - queued)
+                self._handle(event, now)
+
+    def stats(self):
+        latency = list(self.latency)
+        queue_wait = list(self.queue_wait)
+        return {
+            "pattern": self.pattern,
+            "delivered": self.delivered,
+            "errors": self.errors,
+            "dropped": self.queue.dropped if self.queue is not None else 0,
+            "overflowed": self.queue.overflowed if self.queue is not None else 0,
+            "queued": len(self.queue) if self.queue is not None else 0,
+            "latency_p50_ms": _percentile(latency, 0.50) * 1e3,
+            "latency_p99_ms": _percentile(latency, 0.99) * 1e3,
+            "queue_wait_p99_ms": _percentile(queue_wait, 0.99) * 1e3,
+        }
+
+    def stop(self):
+        self.running = False
+        if self.queue is not None:
+            self.queue.close()
+
+class EventBus:
+    """
+    In-process publish/subscribe between protocol clients.
+
+    The subscribers of each topic are resolved once, the first time the topic
+    is published (or when subscriptions change), and stored as a tuple, so
+    publish() is a dict lookup and a loop with no pattern matching or locking.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger or print
+        self.lock = threading.Lock()
+        self.subscriptions = ()
+        self.routes = {}  # topic -> tuple of Subscriptions
+        self.published = 0
+        self.unrouted = 0
+
+    def subscribe(self, pattern, handler, name=None, queue_size=None, queue="mpsc", droppable=None, select=None):
+        """
+        Subscribe handler(event) to a topic, "prefix/*" or "*"; queue_size runs it on its own thread.
+        A full queue drops its oldest event, or with droppable(event) its oldest event that may be dropped.
+        With select(event), only the events it returns True for reach the handler (or its queue).
+        """
+        subscription = Subscription(pattern, handler, name=name, queue_size=queue_size, queue=queue, droppable=droppable,
+                                    select=select, logger=self.logger)
+        with self.lock:
+            self.subscriptions = self.subscriptions + (subscription,)
+            self._reresolve()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions = tuple(s for s in self.subscriptions if s is not subscription)
+            self._reresolve()
+        subscription.stop()
+
+    def _reresolve(self):
+        # Swap in a new dict so publishers never see one being filled in
+        self.routes = {topic: self._resolve(topic) for topic in self.routes}
+
+    def _resolve(self, topic):
+        return tuple(s for s in self.subscriptions if s.matches(topic))
+
+    def publish(self, event):
+        """Deliver event to its topic's subscribers; returns how many there were"""
+        subscribers = self.routes.get(event.topic)
+        if subscribers is None:
+            with self.lock:
+                subscribers = self._resolve(event.topic)
+                routes = dict(self.routes)
+                routes[event.topic] = subscribers
+                self.routes = routes
+        self.published += 1
+        if not subscribers:
+            self.unrouted += 1
+            return 0
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return len(subscribers)
+
+    def stats(self):
+        return {subscription.name: subscription.stats() for subscription in self.subscriptions}
+
+    def list_subscriptions(self, log=None):
+        log = log or self.logger
+        log(f"Event bus: {self.published} published, {self.unrouted} without subscribers")
+        for name, stats in self.stats().items():
+            log(f"  {name} <- {stats['pattern']}: {stats['delivered']} delivered, {stats['dropped']} dropped, "
+                f"latency p50 {stats['latency_p50_ms']:.3f} ms / p99 {stats['latency_p99_ms']:.3f} ms")
+
+    def stop(self):
+        for subscription in self.subscriptions:
+            subscription.stop()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+class ClientManager:
+    """
+    Client registry shared by the TCP, UDP, OSC and MIDI managers.
+
+    `clients` is never changed in place: add/remove build a new dict under
+    `lock` and swap it in, so lookups, sends and broadcasts read the current
+    snapshot without locking. Client start() and stop() run outside the lock,
+    so a slow connect never holds up other clients' traffic, and several
+    clients can start or stop at the same time.
+    """
+
+    label = "client"  # Used in log lines, e.g. "UDP client"
+
+    def __init__(self):
+        self.clients = {}
+        self.lock = threading.Lock()  # Serialises registry writers only
+
+    def log(self, message):
+        print(f"{time.strftime('%H:%M:%S')} {message}")
+
+    @property
+    def label_title(self):
+        return self.label[0].upper() + self.label[1:]
+
+    def _add(self, client_id, create, description):
+        """Register create() under client_id, then start it outside the lock; if start() fails it is removed again"""
+        with self.lock:
+            if client_id in self.clients:
+                self.log(f"{self.label_title} '{client_id}' already exists!")
+                return False
+            client = create()
+            clients = dict(self.clients)
+            clients[client_id] = client
+            self.clients = clients
+        try:
+            client.start()
+        except Exception as e:
+            with self.lock:
+                if self.clients.get(client_id) is client:
+                    clients = dict(self.clients)
+                    del clients[client_id]
+                    self.clients = clients
+            try:
+                client.stop()
+            except Exception:
+                pass  # Partly started; release what we can
+            self.log(f"Failed to start {self.label} '{client_id}': {e}")
+            return False
+        self.log(f"Added {self.label} '{client_id}' {description}")
+        return True
+
+    def add_clients(self, specs):
+        """Add several clients concurrently; specs is a list of add_client keyword dicts. Returns {client_id: ok}"""
+        results = {}
+
+        def add(spec):
+            try:
+                results[spec["client_id"]] = self.add_client(**spec)
+            except Exception as e:
+                self.log(f"Failed to add {self.label} '{spec['client_id']}': {e}")
+                results[spec["client_id"]] = False
+
+        threads = [threading.Thread(target=add, args=(spec,), daemon=True) for spec in specs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def get(self, client_id, log=True):
+        client = self.clients.get(client_id)
+        if client is None and log:
+            self.log(f"{self.label_title} '{client_id}' not found!")
+        return client
+
+    def set_on_message(self, client_id, callback):
+        client = self.clients.get(client_id)
+        if client:
+            client.on_message = callback
+
+    def remove_client(self, client_id):
+        with self.lock:
+            client = self.clients.get(client_id)
+            if client is None:
+                self.log(f"{self.label_title} '{client_id}' not found!")
+                return False
+            clients = dict(self.clients)
+            del clients[client_id]
+            self.clients = clients
+        client.stop()
+        self.log(f"Removed {self.label} '{client_id}'")
+        return True
+
+    def describe(self, client_id, client):
+        """Lines shown for a client by list_clients"""
+        return [f"  {client_id}"]
+
+    def list_clients(self):
+        clients = self.clients
+        if not clients:
+            self.log(f"No {self.label}s connected")
+            return
+        self.log(f"Connected {self.label}s:")
+        for client_id, client in clients.items():
+            for line in self.describe(client_id, client):
+                self.log(line)
+
+    def stop_all(self):
+        with self.lock:
+            clients = self.clients
+            self.clients = {}
+        threads = [threading.Thread(target=client.stop, daemon=True) for client in clients.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.log(f"All {self.label}s stopped")
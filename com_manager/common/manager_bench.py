@@ -0,0 +1,164 @@
+import argparse
+import threading
+import time
+from .client_manager import ClientManager
+
+# Client manager contention benchmark. Run from the com_manager directory:
+#   python -m common.manager_bench [--clients 32] [--senders 8] [--adds 4] [--seconds 3]
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class _MockClient:
+    """Starts like TCPClient (0.5 s wait for the first connect); sends cost a few microseconds"""
+
+    def __init__(self, client_id, start_delay=0.5):
+        self.client_id = client_id
+        self.start_delay = start_delay
+        self.sent = 0
+
+    def start(self):
+        time.sleep(self.start_delay)
+
+    def stop(self):
+        time.sleep(self.start_delay / 10)
+
+    def send_message(self, message, log=True):
+        self.sent += 1
+        return True
+
+class _LockedManager:
+    """The previous managers: one lock around every operation, start()/stop() included"""
+
+    def __init__(self, start_delay):
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.start_delay = start_delay
+
+    def add_client(self, client_id):
+        with self.lock:
+            if client_id in self.clients:
+                return False
+            client = _MockClient(client_id, self.start_delay)
+            self.clients[client_id] = client
+            client.start()
+            return True
+
+    def send_message(self, client_id, message):
+        with self.lock:
+            if client_id not in self.clients:
+                return False
+            return self.clients[client_id].send_message(message)
+
+    def broadcast_message(self, message):
+        with self.lock:
+            for client in self.clients.values():
+                client.send_message(message)
+
+    def stop_all(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.stop()
+            self.clients.clear()
+
+class _SharedManager(ClientManager):
+    def __init__(self, start_delay):
+        super().__init__()
+        self.start_delay = start_delay
+
+    def log(self, message):
+        pass
+
+    def add_client(self, client_id):
+        return self._add(client_id, lambda: _MockClient(client_id, self.start_delay), "")
+
+    def send_message(self, client_id, message):
+        client = self.get(client_id)
+        if client is None:
+            return False
+        return client.send_message(message)
+
+    def broadcast_message(self, message):
+        for client in self.clients.values():
+            client.send_message(message)
+
+def bench_contention(kind, clients=32, senders=8, adds=4, seconds=3.0, start_delay=0.5):
+    """Senders hammer send/broadcast while new clients are added; send latency and throughput"""
+    manager = _LockedManager(start_delay) if kind == "locked" else _SharedManager(start_delay)
+    if kind == "locked":
+        for i in range(clients):
+            manager.clients[f"robot{i}"] = _MockClient(f"robot{i}", start_delay)
+    else:
+        manager.clients = {f"robot{i}": _MockClient(f"robot{i}", start_delay) for i in range(clients)}
+
+    running = True
+    latencies = [[] for _ in range(senders)]
+    counts = [0] * senders
+
+    def sender(n):
+        i = 0
+        samples = latencies[n]
+        while running:
+            start = time.perf_counter()
+            if i % 50 == 0:
+                manager.broadcast_message("GoHome/;")
+            else:
+                manager.send_message(f"robot{(n + i) % clients}", "pose/[[0,0,0],[1,0,0,0]];")
+            samples.append(time.perf_counter() - start)
+            i += 1
+            if i % 16 == 0:
+                time.sleep(0)  # Let the other senders in, like real I/O-bound relays
+        counts[n] = i
+
+    threads = [threading.Thread(target=sender, args=(n,), daemon=True) for n in range(senders)]
+    for thread in threads:
+        thread.start()
+    # New robots join while traffic flows
+    add_start = time.perf_counter()
+    adders = [threading.Thread(target=manager.add_client, args=(f"new{i}",), daemon=True) for i in range(adds)]
+    for adder in adders:
+        adder.start()
+    for adder in adders:
+        adder.join()
+    add_time = time.perf_counter() - add_start
+    time.sleep(max(0.0, seconds - add_time))
+    running = False
+    for thread in threads:
+        thread.join()
+    stop_start = time.perf_counter()
+    manager.stop_all()
+    stop_time = time.perf_counter() - stop_start
+
+    all_latencies = [latency for samples in latencies for latency in samples]
+    elapsed = max(seconds, add_time)
+    return {
+        "kind": kind,
+        "sends_per_s": sum(counts) / elapsed,
+        "p50_us": _percentile(all_latencies, 0.50) * 1e6,
+        "p99_us": _percentile(all_latencies, 0.99) * 1e6,
+        "max_ms": max(all_latencies) * 1e3 if all_latencies else 0.0,
+        "add_s": add_time,
+        "stop_all_s": stop_time,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Client manager contention benchmark")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--senders", type=int, default=8)
+    parser.add_argument("--adds", type=int, default=4, help="Clients added while the senders run")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--start-delay", type=float, default=0.5, help="Simulated client start() time")
+    args = parser.parse_args()
+
+    print(f"{'manager':<8} {'sends/s':>10} {'p50 us':>8} {'p99 us':>8} {'max ms':>8} {'add s':>6} {'stop_all s':>10}")
+    for kind in ("locked", "shared"):
+        r = bench_contention(kind, clients=args.clients, senders=args.senders, adds=args.adds,
+                             seconds=args.seconds, start_delay=args.start_delay)
+        print(f"{r['kind']:<8} {r['sends_per_s']:>10.0f} {r['p50_us']:>8.2f} {r['p99_us']:>8.2f} {r['max_ms']:>8.1f} "
+              f"{r['add_s']:>6.2f} {r['stop_all_s']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import math
+import time
+import numpy as np
+from .pose_interpolator import PoseInterpolator, interpolate_poses, slerp
+
+# Interpolation benchmark: accuracy of each method against a known smooth path sampled at
+# 10-20 Hz, throughput of the vectorized engine vs a per-sample Python loop, and the cost of a
+# streaming tick for N robots. Run from the com_manager directory:
+#   python -m interpolation.interpolation_bench [--input-hz 15] [--rate 250] [--keyframes 2000]
+
+def truth(t):
+    """A smooth path: a 200 mm circle with a vertical wave, turning about z while tilting about x"""
+    t = np.asarray(t, dtype=float)
+    yaw = 0.8 * t
+    tilt = 0.3 * np.sin(0.5 * t)
+    # q = rz(yaw) * rx(tilt), with q1 the scalar part
+    cy, sy, cx, sx = np.cos(yaw / 2), np.sin(yaw / 2), np.cos(tilt / 2), np.sin(tilt / 2)
+    return np.stack((600 + 200 * np.cos(t), 200 * np.sin(t), 400 + 50 * np.sin(2 * t),
+                     cy * cx, cy * sx, sy * sx, sy * cx), axis=-1)
+
+def _angle(a, b):
+    """Angle between orientations in degrees"""
+    dot = np.abs(np.einsum("ij,ij->i", a, b))
+    return np.degrees(2 * np.arccos(np.clip(dot, 0.0, 1.0)))
+
+def _errors(poses, expected):
+    position = np.linalg.norm(poses[:, :3] - expected[:, :3], axis=1)
+    return position.max(), math.sqrt(np.mean(position ** 2)), _angle(poses[:, 3:], expected[:, 3:]).max()
+
+def bench_accuracy(input_hz, rate, seconds=10.0, jitter=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    key_times = np.arange(0, seconds + 1e-9, 1.0 / input_hz)
+    key_times[1:-1] += rng.uniform(-jitter, jitter, len(key_times) - 2) / input_hz
+    keyframes = truth(key_times)
+    samples = np.arange(0, key_times[-1], 1.0 / rate)
+    expected = truth(samples)
+    results = []
+    held = keyframes[np.searchsorted(key_times, samples, side="right") - 1]
+    results.append(("hold (no interpolation)",) + _errors(held, expected) + (np.linalg.norm(np.diff(held[:, :3], axis=0), axis=1).max(),))
+    for position, orientation in (("linear", "slerp"), ("catmull_rom", "slerp"), ("catmull_rom", "squad")):
+        poses = interpolate_poses(key_times, keyframes, samples, position, orientation)
+        step = np.linalg.norm(np.diff(poses[:, :3], axis=0), axis=1).max()
+        results.append((f"{position} + {orientation}",) + _errors(poses, expected) + (step,))
+    # Keyframes are reproduced exactly, and every output quaternion is a unit quaternion
+    at_keys = interpolate_poses(key_times, keyframes, key_times)
+    through_keys = np.abs(at_keys[:, :3] - keyframes[:, :3]).max() < 1e-9 and _angle(at_keys[:, 3:], keyframes[:, 3:]).max() < 1e-4
+    unit = np.abs(np.linalg.norm(interpolate_poses(key_times, keyframes, samples, "catmull_rom", "squad")[:, 3:], axis=1) - 1).max() < 1e-9
+    return results, through_keys, unit
+
+def check_slerp():
+    """SLERP about one axis turns at a constant rate and takes the shorter arc"""
+    q0 = np.array([1.0, 0.0, 0.0, 0.0])
+    q1 = np.array([math.cos(math.radians(60)), 0.0, 0.0, math.sin(math.radians(60))])  # 120 degrees about z
+    u = np.linspace(0, 1, 101)
+    steps = np.diff(np.degrees(2 * np.arctan2(slerp(q0, q1, u)[:, 3], slerp(q0, q1, u)[:, 0])))
+    constant = np.abs(steps - 1.2).max() < 1e-9
+    shorter = abs(_angle(slerp(q0, -q1, np.array([0.5])), slerp(q0, q1, np.array([0.5])))[0]) < 1e-6
+    return constant, shorter
+
+def _python_interpolate(key_times, keyframes, samples):
+    """Catmull-Rom + SLERP one sample at a time with the math module"""
+    out = []
+    n = len(key_times)
+    k = 0
+    for t in samples:
+        while k < n - 2 and key_times[k + 1] <= t:
+            k += 1
+        t1, t2 = key_times[k], key_times[k + 1]
+        h = t2 - t1
+        u = min(1.0, max(0.0, (t - t1) / h))
+        p0 = keyframes[k - 1] if k > 0 else keyframes[k]
+        p1, p2 = keyframes[k], keyframes[k + 1]
+        p3 = keyframes[k + 2] if k + 2 < n else p2
+        t0 = key_times[k - 1] if k > 0 else t1
+        t3 = key_times[k + 2] if k + 2 < n else t2
+        u2, u3 = u * u, u * u * u
+        pose = []
+        for a in range(3):
+            m1 = (p2[a] - p0[a]) / (t2 - t0)
+            m2 = (p3[a] - p1[a]) / (t3 - t1)
+            pose.append((2 * u3 - 3 * u2 + 1) * p1[a] + (u3 - 2 * u2 + u) * h * m1 + (3 * u2 - 2 * u3) * p2[a] + (u3 - u2) * h * m2)
+        qa, qb = p1[3:], p2[3:]
+        dot = sum(x * y for x, y in zip(qa, qb))
+        if dot < 0:
+            qb, dot = [-x for x in qb], -dot
+        theta = math.acos(min(1.0, dot))
+        if theta < 1e-6:
+            q = [x + u * (y - x) for x, y in zip(qa, qb)]
+        else:
+            w0, w1 = math.sin((1 - u) * theta) / math.sin(theta), math.sin(u * theta) / math.sin(theta)
+            q = [w0 * x + w1 * y for x, y in zip(qa, qb)]
+        norm = math.sqrt(sum(x * x for x in q))
+        out.append(pose + [x / norm for x in q])
+    return out
+
+def bench_throughput(keyframes, input_hz, rate, repeat=3):
+    key_times = np.arange(keyframes) / input_hz
+    poses = truth(key_times)
+    samples = np.arange(0, key_times[-1], 1.0 / rate)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dense = interpolate_poses(key_times, poses, samples)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    pose_list = poses.tolist()
+    start = time.perf_counter()
+    python = _python_interpolate(key_times.tolist(), pose_list, samples.tolist())
+    python_time = time.perf_counter() - start
+    agree = np.abs(np.array(python) - dense).max() < 1e-9
+    return len(samples), best, python_time, agree
+
+def bench_streaming(robots, input_hz, rate, seconds=5.0):
+    """Simulated clock: keyframes arrive at input_hz with 20% jitter, ticks at rate; returns tick cost, smoothness and path error"""
+    rng = np.random.default_rng(1)
+    interpolator = PoseInterpolator(lambda client_id, command: None, rate_hz=rate)
+    names = [f"robot{i}" for i in range(robots)]
+    period = 1.0 / rate
+    next_key = 0.0
+    outputs = []
+    cost = []
+    now = 0.0
+    while now < seconds:
+        if now >= next_key:
+            for i, name in enumerate(names):
+                interpolator.on_target(name, truth(next_key + i)[:7].tolist(), now=now)
+            next_key += (1 + rng.uniform(-0.2, 0.2)) / input_hz
+        start = time.perf_counter()
+        poses = interpolator.tick(now, period)
+        cost.append(time.perf_counter() - start)
+        if names[0] in poses:
+            outputs.append((now, poses[names[0]]))
+        now += period
+    times = np.array([t for t, _ in outputs])
+    positions = np.array([pose[:3] for _, pose in outputs])
+    delay = interpolator.delay_for(interpolator.streams[names[0]])
+    # Distance from the true path (nearest point in the last half second), apart from the playback delay
+    path = truth(np.arange(-0.5, seconds, 0.001))[:, :3]
+    error = np.array([np.linalg.norm(path[int(t * 1000):int(t * 1000) + 500] - p, axis=1).min() for t, p in zip(times, positions)])
+    steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    stats = interpolator.stats()["robots"][names[0]]
+    return {
+        "tick_us": np.median(cost) * 1e6, "tick_p99_us": np.percentile(cost, 99) * 1e6,
+        "max_step_mm": steps.max(), "keyframe_step_mm": np.linalg.norm(np.diff(truth(np.arange(0, seconds, 1 / input_hz))[:, :3], axis=0), axis=1).max(),
+        "error_mm": np.median(error[len(error) // 10:]), "delay_ms": delay * 1e3, "underruns": stats["underruns"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Pose interpolation benchmark")
+    parser.add_argument("--input-hz", type=float, default=15.0, help="Rate of the sparse /pose input")
+    parser.add_argument("--rate", type=float, default=250.0, help="Dense output rate")
+    parser.add_argument("--keyframes", type=int, default=2000, help="Keyframes for the throughput test")
+    parser.add_argument("--robots", default="1,8,32", help="Robot counts for the streaming tick")
+    args = parser.parse_args()
+
+    constant, shorter = check_slerp()
+    print(f"slerp: constant angular rate {constant}, shorter arc {shorter}")
+    for jitter in (0.0, 0.3):
+        results, through_keys, unit = bench_accuracy(args.input_hz, args.rate, jitter=jitter)
+        print(f"accuracy, {args.input_hz:g} Hz keyframes{f' with {jitter:.0%} timing jitter' if jitter else ''} -> {args.rate:g} Hz "
+              f"(passes through keyframes: {through_keys}, unit quaternions: {unit})")
+        print(f"  {'method':<24} {'max mm':>8} {'rms mm':>8} {'max deg':>8} {'max step mm':>12}")
+        for name, max_error, rms_error, angle, step in results:
+            print(f"  {name:<24} {max_error:>8.3f} {rms_error:>8.3f} {angle:>8.3f} {step:>12.2f}")
+    samples, numpy_time, python_time, agree = bench_throughput(args.keyframes, args.input_hz, args.rate)
+    print(f"throughput, {args.keyframes:,} keyframes -> {samples:,} poses: NumPy {samples / numpy_time:,.0f} poses/s, "
+          f"Python loop {samples / python_time:,.0f} poses/s ({python_time / numpy_time:.0f}x), results agree: {agree}")
+    for robots in (int(n) for n in args.robots.split(",")):
+        result = bench_streaming(robots, args.input_hz, args.rate)
+        print(f"streaming {robots:>2} robots: tick {result['tick_us']:.0f} us (p99 {result['tick_p99_us']:.0f} us), "
+              f"max step {result['max_step_mm']:.2f} mm vs {result['keyframe_step_mm']:.2f} mm between keyframes, "
+              f"median distance from path {result['error_mm']:.2f} mm, playback {result['delay_ms']:.0f} ms delay, {result['underruns']} underruns")
+
+if __name__ == "__main__":
+    main()
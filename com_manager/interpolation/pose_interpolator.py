@@ -0,0 +1,348 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from jog.jog_controller import POSE_COMMAND
+from shard.state_table import parse_pose_command
+
+# Poses are x y z (mm) q1..q4 as in RAPID, with q1 the scalar part. Every function below works on
+# whole batches: leading axes are samples (or robots), the last axis is the vector.
+
+def _normalize(q):
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+def align_quaternions(q):
+    """Flip signs along a sequence (N x 4) so each quaternion is in the same hemisphere as the one before"""
+    q = np.array(q, dtype=float).reshape(-1, 4)
+    flips = np.where(np.einsum("ij,ij->i", q[1:], q[:-1]) < 0, -1.0, 1.0)
+    return q * np.r_[1.0, np.cumprod(flips)][:, None]
+
+def quat_multiply(a, b):
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=float), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=float), -1, 0)
+    return np.stack((aw * bw - ax * bx - ay * by - az * bz,
+                     aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw), axis=-1)
+
+def _conjugate(q):
+    return q * np.array([1.0, -1.0, -1.0, -1.0])
+
+def _log(q):
+    v = q[..., 1:]
+    n = np.linalg.norm(v, axis=-1, keepdims=True)
+    theta = np.arctan2(n, q[..., :1])
+    return v * np.where(n > 1e-12, theta / np.where(n > 1e-12, n, 1.0), 1.0)
+
+def _exp(v):
+    theta = np.linalg.norm(v, axis=-1, keepdims=True)
+    scale = np.where(theta > 1e-12, np.sin(theta) / np.where(theta > 1e-12, theta, 1.0), 1.0)
+    return np.concatenate((np.cos(theta), v * scale), axis=-1)
+
+def slerp(q0, q1, u):
+    """Spherical linear interpolation from q0 to q1 (..., 4) at u (...) in 0..1, along the shorter arc"""
+    q0 = np.asarray(q0, dtype=float)
+    q1 = np.asarray(q1, dtype=float)
+    u = np.asarray(u, dtype=float)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0, -q1, q1)
+    theta = np.arccos(np.clip(np.abs(dot), 0.0, 1.0))
+    sin = np.sin(theta)
+    near = sin < 1e-6  # Nearly the same orientation: plain lerp
+    sin = np.where(near, 1.0, sin)
+    w0 = np.where(near, 1.0 - u, np.sin((1.0 - u) * theta) / sin)
+    w1 = np.where(near, u, np.sin(u * theta) / sin)
+    return _normalize(w0 * q0 + w1 * q1)
+
+def squad_controls(q_prev, q, q_next):
+    """SQUAD inner control point of each q, given its neighbours (all in the same hemisphere); the end keyframes are their own"""
+    inverse = _conjugate(q)
+    return quat_multiply(q, _exp(-(_log(quat_multiply(inverse, q_next)) + _log(quat_multiply(inverse, q_prev))) / 4))
+
+def squad(q1, q2, s1, s2, u):
+    """Spherical cubic from q1 to q2 with control points s1, s2: continuous angular velocity across keyframes"""
+    u = np.asarray(u, dtype=float)
+    return slerp(slerp(q1, q2, u), slerp(s1, s2, u), 2 * u * (1 - u))
+
+def hermite(p1, p2, m1, m2, h, u):
+    """Cubic Hermite segment from p1 to p2 (..., 3) with tangents m1, m2 (per second), lasting h seconds, at u in 0..1"""
+    u = np.asarray(u, dtype=float)[..., None]
+    h = np.asarray(h, dtype=float)[..., None]
+    u2 = u * u
+    u3 = u2 * u
+    return (2 * u3 - 3 * u2 + 1) * p1 + (u3 - 2 * u2 + u) * h * m1 + (3 * u2 - 2 * u3) * p2 + (u3 - u2) * h * m2
+
+def catmull_rom_tangents(times, positions):
+    """Tangent at each keyframe: central difference over its neighbours' times (non-uniform Catmull-Rom), one-sided at the ends"""
+    times = np.asarray(times, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    tangents = np.zeros_like(positions)
+    if len(times) < 2:
+        return tangents
+    tangents[1:-1] = (positions[2:] - positions[:-2]) / (times[2:] - times[:-2])[:, None]
+    tangents[0] = (positions[1] - positions[0]) / (times[1] - times[0])
+    tangents[-1] = (positions[-1] - positions[-2]) / (times[-1] - times[-2])
+    return tangents
+
+def interpolate_poses(times, poses, sample_times, position="catmull_rom", orientation="slerp"):
+    """
+    Poses (M x 7) at sample_times from keyframes (N x 7) at increasing times, in one pass.
+    Position is "catmull_rom" (passes through every keyframe, continuous velocity) or "linear";
+    orientation is "slerp" or "squad". Samples outside the keyframes hold the first or last one.
+    """
+    times = np.asarray(times, dtype=float)
+    poses = np.asarray(poses, dtype=float).reshape(-1, 7)
+    samples = np.asarray(sample_times, dtype=float)
+    if len(times) == 1:
+        return np.repeat(poses, len(samples), axis=0)
+    k = np.clip(np.searchsorted(times, samples, side="right") - 1, 0, len(times) - 2)
+    h = times[k + 1] - times[k]
+    u = np.clip((samples - times[k]) / h, 0.0, 1.0)
+    p = poses[:, :3]
+    if position == "linear":
+        positions = p[k] + u[:, None] * (p[k + 1] - p[k])
+    else:
+        m = catmull_rom_tangents(times, p)
+        positions = hermite(p[k], p[k + 1], m[k], m[k + 1], h, u)
+    q = align_quaternions(_normalize(poses[:, 3:]))
+    if orientation == "squad":
+        s = np.vstack((q[:1], squad_controls(q[:-2], q[1:-1], q[2:]), q[-1:]))
+        rotations = squad(q[k], q[k + 1], s[k], s[k + 1], u)
+    else:
+        rotations = slerp(q[k], q[k + 1], u)
+    return np.hstack((positions, rotations))
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class _Stream:
+    """Keyframes of one robot and the segment being played"""
+
+    __slots__ = ("keyframes", "playhead", "interval", "last_arrival", "segment", "done", "keyframes_in", "sent", "underruns")
+
+    def __init__(self, interval):
+        self.keyframes = deque(maxlen=32)  # (arrival time, position, quaternion)
+        self.playhead = None
+        self.interval = interval  # Smoothed time between keyframes
+        self.last_arrival = None
+        self.segment = None       # (t1, t2, p1, p2, m1, m2, q1, q2, s1, s2), fixed once playback enters it
+        self.done = False         # Last keyframe reached and sent
+        self.keyframes_in = 0
+        self.sent = 0
+        self.underruns = 0
+
+class PoseInterpolator:
+    """
+    Turns sparse pose targets (e.g. /pose from TouchOSC or Grasshopper at 10-20 Hz) into a
+    dense stream at rate_hz per robot: Catmull-Rom position and SLERP (or SQUAD) orientation
+    between the keyframes.
+
+    Playback runs `delay` seconds behind the input (default: `lookahead` times the measured
+    keyframe interval, at most max_delay), so the next keyframe has usually arrived by the
+    time it is needed. A segment's tangents are fixed when playback enters it, so a late
+    keyframe never moves a pose that is already being played. If the input stalls, playback
+    holds at the last keyframe (an underrun) and then catches up slightly faster than real
+    time. After `reset_after` seconds without input a stream starts again from where it
+    stopped. The first target of a robot starts from its reported pose (state_store) if
+    known, else it is sent as is.
+
+    The timer thread uses absolute deadlines like JogController; each tick evaluates every
+    moving robot in one batched NumPy call and sends through send(client_id, command).
+    """
+
+    def __init__(self, send, rate_hz=100.0, position="catmull_rom", orientation="slerp", delay=None, lookahead=1.5,
+                 max_delay=0.25, reset_after=0.5, catch_up=1.25, state_store=None, logger=None):
+        self.send = send
+        self.rate_hz = rate_hz
+        self.position = position
+        self.orientation = orientation
+        self.delay = delay
+        self.lookahead = lookahead
+        self.max_delay = max_delay
+        self.reset_after = reset_after
+        self.catch_up = catch_up
+        self.state_store = state_store
+        self.logger = logger or print
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.ticks = 0
+        self.tick_cost = []  # Seconds spent evaluating and sending per tick
+        self.max_samples = 10000
+
+    def on_target(self, client_id, pose, now=None):
+        """Feed a keyframe (x, y, z, q1..q4) for a robot"""
+        now = time.perf_counter() if now is None else now
+        position = np.array(pose[:3], dtype=float)
+        rotation = _normalize(np.array(pose[3:7], dtype=float))
+        with self.lock:
+            stream = self.streams.get(client_id)
+            if stream is None:
+                stream = self.streams[client_id] = _Stream(1.0 / 20)
+            if not stream.keyframes:
+                state = self.state_store.get(client_id) if self.state_store else None
+                if state and state.pose:
+                    self._restart(stream, state.pose, now)
+            elif now - stream.last_arrival > self.reset_after:
+                _, last_position, last_rotation = stream.keyframes[-1]
+                self._restart(stream, tuple(last_position) + tuple(last_rotation), now)
+            else:
+                gap = now - stream.last_arrival
+                stream.interval += 0.2 * (gap - stream.interval)
+                if len(stream.keyframes) > 1 and stream.playhead >= stream.keyframes[-1][0]:
+                    stream.underruns += 1
+            if stream.keyframes and np.dot(rotation, stream.keyframes[-1][2]) < 0:
+                rotation = -rotation
+            if stream.keyframes and now <= stream.keyframes[-1][0]:
+                now = stream.keyframes[-1][0] + 1e-6
+            stream.keyframes.append((now, position, rotation))
+            if stream.playhead is None:
+                stream.playhead = now
+            stream.last_arrival = now
+            stream.keyframes_in += 1
+            stream.done = False
+
+    def on_command(self, client_id, command):
+        """Takes a command with a single pose target as a keyframe (True); any other command stops the robot's stream (False)"""
+        pose = parse_pose_command(command) if command.startswith("pose/") and command.count(";") == 1 else None
+        if pose is None:
+            self.reset(client_id)
+            return False
+        self.on_target(client_id, pose)
+        return True
+
+    def _restart(self, stream, pose, now):
+        """Begin a new run of keyframes from pose, as if it had been reached one interval ago"""
+        start = now - stream.interval
+        stream.keyframes.clear()
+        stream.keyframes.append((start, np.array(pose[:3], dtype=float), _normalize(np.array(pose[3:7], dtype=float))))
+        stream.playhead = start
+        stream.segment = None
+
+    def reset(self, client_id):
+        """Stop streaming to a robot, e.g. when another command (GoHome, a joint move) is sent to it"""
+        with self.lock:
+            stream = self.streams.get(client_id)
+            if stream is not None:
+                stream.keyframes.clear()
+                stream.playhead = None
+                stream.segment = None
+                stream.done = True
+
+    def delay_for(self, stream):
+        if self.delay is not None:
+            return self.delay
+        return min(self.lookahead * stream.interval, self.max_delay)
+
+    def _segment(self, stream):
+        """The segment around the playhead, reusing the previous segment's end tangent for continuity"""
+        keyframes = stream.keyframes
+        playhead = stream.playhead
+        i = len(keyframes) - 2
+        while i > 0 and keyframes[i][0] > playhead:
+            i -= 1
+        t1, p1, q1 = keyframes[i]
+        t2, p2, q2 = keyframes[i + 1]
+        previous = stream.segment
+        if previous is not None and previous[0] == t1 and previous[1] == t2:
+            return previous
+        chord = (p2 - p1) / (t2 - t1)
+        squad = self.orientation == "squad"
+        if previous is not None and previous[1] == t1:
+            m1, s1 = previous[5], previous[9]
+        elif i > 0:
+            m1 = (p2 - keyframes[i - 1][1]) / (t2 - keyframes[i - 1][0])
+            s1 = squad_controls(keyframes[i - 1][2], q1, q2) if squad else q1
+        else:
+            m1, s1 = chord, q1
+        if i + 2 < len(keyframes):
+            t3, p3, q3 = keyframes[i + 2]
+            m2 = (p3 - p1) / (t3 - t1)
+            s2 = squad_controls(q1, q2, q3) if squad else q2
+        else:
+            m2, s2 = chord, q2
+        if self.position == "linear":
+            m1 = m2 = chord
+        stream.segment = (t1, t2, p1, p2, m1, m2, q1, q2, s1, s2)
+        return stream.segment
+
+    def tick(self, now, dt):
+        """Advance every stream by dt and return {client_id: (x, y, z, q1..q4)} for the robots with a new pose"""
+        batch = []
+        with self.lock:
+            for client_id, stream in self.streams.items():
+                if stream.done or stream.playhead is None:
+                    continue
+                last = stream.keyframes[-1][0]
+                behind = stream.playhead < now - self.delay_for(stream)
+                stream.playhead = min(stream.playhead + dt * (self.catch_up if behind else 1.0), last)
+                if len(stream.keyframes) == 1 or stream.playhead >= last:
+                    stream.done = True
+                    _, position, rotation = stream.keyframes[-1]
+                    batch.append((client_id, None, position, rotation))
+                    continue
+                batch.append((client_id, self._segment(stream), stream.playhead, None))
+        if not batch:
+            return {}
+        poses = {client_id: tuple(position) + tuple(rotation) for client_id, segment, position, rotation in batch if segment is None}
+        moving = [(client_id, segment, playhead) for client_id, segment, playhead, _ in batch if segment is not None]
+        if moving:
+            ids = [client_id for client_id, _, _ in moving]
+            t1, t2, p1, p2, m1, m2, q1, q2, s1, s2 = (np.array(values) for values in zip(*(segment for _, segment, _ in moving)))
+            h = t2 - t1
+            u = np.clip((np.array([playhead for _, _, playhead in moving]) - t1) / h, 0.0, 1.0)
+            positions = hermite(p1, p2, m1, m2, h, u)
+            rotations = squad(q1, q2, s1, s2, u) if self.orientation == "squad" else slerp(q1, q2, u)
+            for client_id, pose in zip(ids, np.hstack((positions, rotations)).tolist()):
+                poses[client_id] = pose
+        return poses
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.logger(f"[Interpolator] Running at {self.rate_hz} Hz ({self.position}, {self.orientation})")
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        last_tick = time.perf_counter()
+        next_tick = last_tick + period
+        while self.running:
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            dt = min(now - last_tick, 2 * period)
+            last_tick = now
+            try:
+                for client_id, pose in self.tick(now, dt).items():
+                    self.send(client_id, POSE_COMMAND.format(*pose))
+                    stream = self.streams.get(client_id)
+                    if stream:
+                        stream.sent += 1
+            except Exception as e:
+                self.logger(f"[Interpolator] Tick error: {e}")
+            self.ticks += 1
+            self.tick_cost.append(time.perf_counter() - now)
+            if len(self.tick_cost) > self.max_samples:
+                del self.tick_cost[:len(self.tick_cost) // 2]
+            next_tick += period
+            if next_tick < now:
+                next_tick = now + period
+
+    def stats(self):
+        with self.lock:
+            robots = {client_id: {"keyframes": stream.keyframes_in, "sent": stream.sent, "underruns": stream.underruns,
+                                  "input_interval_ms": stream.interval * 1e3, "delay_ms": self.delay_for(stream) * 1e3}
+                      for client_id, stream in self.streams.items()}
+        return {"ticks": self.ticks, "tick_p50_ms": _percentile(self.tick_cost, 0.50) * 1e3,
+                "tick_p99_ms": _percentile(self.tick_cost, 0.99) * 1e3, "robots": robots}
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,84 @@
+import math
+import numpy as np
+from interpolation.interpolation_bench import truth, _python_interpolate
+from interpolation.pose_interpolator import PoseInterpolator, interpolate_poses, slerp
+
+# Accuracy tests for the interpolation engine. Run from the com_manager directory:
+#   python -m pytest -q interpolation
+
+def _angle(a, b):
+    """Angle between orientations (N x 4) in degrees"""
+    dot = np.abs(np.einsum("ij,ij->i", np.atleast_2d(a), np.atleast_2d(b)))
+    return np.degrees(2 * np.arccos(np.clip(dot, 0.0, 1.0)))
+
+def _keyframes(input_hz=15.0, seconds=4.0, jitter=0.0):
+    rng = np.random.default_rng(0)
+    times = np.arange(0, seconds + 1e-9, 1.0 / input_hz)
+    times[1:-1] += rng.uniform(-jitter, jitter, len(times) - 2) / input_hz
+    return times, truth(times)
+
+def test_keyframes_reproduced():
+    for jitter in (0.0, 0.3):
+        times, keyframes = _keyframes(jitter=jitter)
+        for position in ("catmull_rom", "linear"):
+            for orientation in ("slerp", "squad"):
+                poses = interpolate_poses(times, keyframes, times, position, orientation)
+                assert np.abs(poses[:, :3] - keyframes[:, :3]).max() < 1e-9
+                assert _angle(poses[:, 3:], keyframes[:, 3:]).max() < 1e-4
+
+def test_unit_quaternions():
+    times, keyframes = _keyframes(jitter=0.3)
+    samples = np.linspace(times[0], times[-1], 2000)
+    for orientation in ("slerp", "squad"):
+        rotations = interpolate_poses(times, keyframes, samples, orientation=orientation)[:, 3:]
+        assert np.abs(np.linalg.norm(rotations, axis=1) - 1.0).max() < 1e-9
+
+def test_slerp_constant_rate():
+    q0 = np.array([1.0, 0.0, 0.0, 0.0])
+    q1 = np.array([math.cos(math.radians(60)), 0.0, 0.0, math.sin(math.radians(60))])  # 120 degrees about z
+    rotations = slerp(q0, q1, np.linspace(0, 1, 101))
+    angles = np.degrees(2 * np.arctan2(rotations[:, 3], rotations[:, 0]))
+    assert np.abs(np.diff(angles) - 1.2).max() < 1e-9
+
+def test_slerp_shorter_arc():
+    q0 = np.array([1.0, 0.0, 0.0, 0.0])
+    q1 = np.array([math.cos(math.radians(60)), 0.0, 0.0, math.sin(math.radians(60))])
+    # -q1 is the same orientation; the halfway point is 60 degrees from q0 either way, not 120
+    for target in (q1, -q1):
+        halfway = slerp(q0, target, np.array([0.5]))
+        assert abs(_angle(halfway, q0[None])[0] - 60.0) < 1e-6
+    assert _angle(slerp(q0, -q1, np.array([0.5])), slerp(q0, q1, np.array([0.5])))[0] < 1e-6
+
+def test_vectorized_matches_python_loop():
+    times = np.arange(200) / 15.0
+    keyframes = truth(times)
+    samples = np.arange(0, times[-1], 1.0 / 250)
+    dense = interpolate_poses(times, keyframes, samples)
+    python = np.array(_python_interpolate(times.tolist(), keyframes.tolist(), samples.tolist()))
+    assert np.abs(python - dense).max() < 1e-9
+
+def test_upsampling_beats_holding():
+    times, keyframes = _keyframes()
+    samples = np.arange(0, times[-1], 1.0 / 250)
+    expected = truth(samples)
+    poses = interpolate_poses(times, keyframes, samples)
+    held = keyframes[np.searchsorted(times, samples, side="right") - 1]
+    error = np.linalg.norm(poses[:, :3] - expected[:, :3], axis=1).max()
+    assert error < 0.5
+    assert error < np.linalg.norm(held[:, :3] - expected[:, :3], axis=1).max() / 10
+
+def test_stream_ends_on_last_keyframe():
+    interpolator = PoseInterpolator(lambda client_id, command: None, rate_hz=100, logger=lambda message: None)
+    times, keyframes = _keyframes(input_hz=10.0, seconds=1.0)
+    last = None
+    now = 0.0
+    for t, pose in zip(times, keyframes):
+        while now < t:
+            last = interpolator.tick(now, 0.01).get("robot", last)
+            now += 0.01
+        interpolator.on_target("robot", pose.tolist(), now=now)
+    for _ in range(100):
+        last = interpolator.tick(now, 0.01).get("robot", last)
+        now += 0.01
+    assert np.abs(np.array(last[:3]) - keyframes[-1, :3]).max() < 1e-9
+    assert _angle(np.array(last[3:])[None], keyframes[-1:, 3:])[0] < 1e-4
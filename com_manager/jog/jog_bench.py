@@ -0,0 +1,88 @@
+import argparse
+import threading
+import time
+from midi.midi_event import MIDIEvent, CC
+from .jog_controller import JogController
+
+# Jog timer benchmark. Run from the com_manager directory:
+#   python -m jog.jog_bench [--rate 50] [--seconds 3] [--spin 0.001]
+
+def _quiet(message):
+    pass
+
+class _SleepLoopJog(JogController):
+    """A plain sleep(period) loop integrating with the nominal period, for comparison"""
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.perf_counter() + period
+        last_input = None
+        while self.running:
+            time.sleep(period)
+            now = time.perf_counter()
+            self._sample(self.jitter, now - next_tick)
+            next_tick += period
+            input_time = self.input_time
+            command = self.step(period)
+            if command is not None:
+                self.send(command)
+                self.sent += 1
+                if input_time != last_input:
+                    self._sample(self.latency, time.time() - input_time)
+                    last_input = input_time
+            self.ticks += 1
+
+def bench_jog(mode, rate=50.0, seconds=3.0, spin=0.0, input_hz=200.0):
+    """Jog +x at full speed from a simulated knob, and compare the distance travelled with speed * time"""
+    sent = []
+    cls = _SleepLoopJog if mode == "sleep" else JogController
+    jog = cls("bench", None, axes={16: "x"}, rate_hz=rate, max_speed=100.0, deadzone=0.0,
+              workspace=((-1e9, 1e9), (-1e9, 1e9), (-1e9, 1e9)), start_pose=(0, 0, 0, 1, 0, 0, 0),
+              send=lambda command: sent.append(time.perf_counter()), logger=_quiet, spin=spin)
+    jog.start()
+    jog.enable()
+    running = True
+
+    def knob():
+        # Knob held at the top, re-sent at input_hz like a conditioned MIDI stream
+        while running:
+            jog.on_midi(MIDIEvent(CC, 1, 16, 127, time.time(), 0xB0))
+            time.sleep(1.0 / input_hz)
+
+    knob_thread = threading.Thread(target=knob, daemon=True)
+    knob_thread.start()
+    time.sleep(0.2)
+    start_x, start_t = jog.pose[0], time.perf_counter()
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    end_x, end_t = jog.pose[0], time.perf_counter()
+    cpu = (time.process_time() - cpu_start) / seconds
+    running = False
+    jog.stop()
+    expected = jog.max_speed * (end_t - start_t)
+    stats = jog.stats()
+    return {
+        "mode": mode if not spin else f"{mode}+spin",
+        "ticks_per_s": len([t for t in sent if start_t <= t <= end_t]) / (end_t - start_t),
+        "jitter_p99_ms": stats["jitter_p99_ms"],
+        "jitter_max_ms": stats["jitter_max_ms"],
+        "latency_p99_ms": stats["latency_p99_ms"],
+        "distance_error_pct": (end_x - start_x - expected) / expected * 100,
+        "cpu_pct": cpu * 100,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Jog timer benchmark")
+    parser.add_argument("--rate", type=float, default=50.0, help="Jog control rate in Hz")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--spin", type=float, default=0.001, help="Busy-wait before each deadline for the spin run")
+    args = parser.parse_args()
+
+    print(f"{'mode':<15} {'ticks/s':>8} {'jitter p99 ms':>13} {'max ms':>7} {'latency p99 ms':>14} {'distance err %':>14} {'cpu %':>6}")
+    for mode, spin in (("sleep", 0.0), ("deadline", 0.0), ("deadline", args.spin)):
+        r = bench_jog(mode, rate=args.rate, seconds=args.seconds, spin=spin)
+        print(f"{r['mode']:<15} {r['ticks_per_s']:>8.2f} {r['jitter_p99_ms']:>13.3f} {r['jitter_max_ms']:>7.3f} "
+              f"{r['latency_p99_ms']:>14.3f} {r['distance_error_pct']:>14.2f} {r['cpu_pct']:>6.1f}")
+
+if __name__ == "__main__":
+    main()
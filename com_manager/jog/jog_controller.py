@@ -0,0 +1,181 @@
+import threading
+import time
+from midi.midi_event import CC, CC14, NRPN, RPN, PITCH_BEND
+
+AXES = ("x", "y", "z")
+# Full-scale input per event kind, so 7-bit and 14-bit controls both map to -1..1
+KIND_FULL_SCALE = {CC: 127, CC14: 16383, NRPN: 16383, RPN: 16383, PITCH_BEND: 16383}
+POSE_COMMAND = "pose/[[{0:.2f},{1:.2f},{2:.2f}],[{3:.6f},{4:.6f},{5:.6f},{6:.6f}]];"
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class JogController:
+    """
+    Velocity-mode jogging: MIDI controls set a velocity per axis, which is
+    integrated into a target pose at a fixed rate and streamed to one robot.
+
+    axes maps a MIDI controller number on `channel` (None for any) to an axis
+    ("x", "y" or "z"). A centred control (64 of 127) means stand still; the
+    ends mean +-max_speed mm/s, with `deadzone` (fraction of full scale) around
+    the centre. on_midi() only stores the latest value; the timer thread reads
+    it each tick. While jogging is disabled the controls are left to others.
+
+    Jogging starts from the robot's reported pose, so enable() refuses until the
+    robot has reported one (or start_pose is given). The timer uses absolute
+    deadlines and integrates with the measured tick interval, so late ticks do
+    not slow the robot down. Targets are clamped to `workspace` ((xmin, xmax),
+    (ymin, ymax), (zmin, zmax)) in mm. Ticks are only sent while a velocity is
+    non-zero. If send(command) returns False (refused by validation, or not
+    connected) the target is rolled back, so jogging holds at the last target
+    that went out instead of running ahead of the robot.
+    """
+
+    def __init__(self, client_id, tcp_manager, axes=None, channel=1, rate_hz=50.0, max_speed=100.0, deadzone=0.05,
+                 workspace=((-1000.0, 1000.0), (-1000.0, 1000.0), (0.0, 1500.0)), state_store=None,
+                 start_pose=None, send=None, logger=None, spin=0.0):
+        self.client_id = client_id
+        self.tcp_manager = tcp_manager
+        self.axes = dict(axes) if axes else {16: "x", 17: "y", 18: "z"}
+        self.channel = channel
+        self.rate_hz = rate_hz
+        self.max_speed = max_speed
+        self.deadzone = deadzone
+        self.workspace = workspace
+        self.state_store = state_store
+        self.start_pose = list(start_pose) if start_pose else None  # Used only if the robot has not reported a pose
+        self.send = send or self._send_tcp
+        self.logger = logger or print
+        self.spin = spin  # Busy-wait this long before each deadline for tighter timing, at the cost of CPU
+        self.velocity = [0.0, 0.0, 0.0]  # -1..1 per axis, written by on_midi
+        self.input_time = 0.0             # Timestamp of the MIDI event behind the current velocity
+        self.pose = None
+        self.enabled = False
+        self.running = False
+        self.thread = None
+        self.ticks = 0
+        self.sent = 0
+        self.clamped = 0
+        self.refused = 0
+        self.jitter = []    # Tick start - deadline, seconds
+        self.latency = []   # MIDI event -> first pose sent with it, seconds
+        self.max_samples = 10000
+
+    def on_midi(self, event):
+        """Feed a MIDI event; returns True if it drives an axis (only while jogging is enabled)"""
+        if not self.enabled or (self.channel is not None and event.channel != self.channel):
+            return False
+        axis = self.axes.get(event.controller)
+        full_scale = KIND_FULL_SCALE.get(event.kind)
+        if axis is None or full_scale is None:
+            return False
+        centred = (event.value - full_scale / 2) / (full_scale / 2)
+        if abs(centred) < self.deadzone:
+            centred = 0.0
+        self.velocity[AXES.index(axis)] = max(-1.0, min(1.0, centred))
+        self.input_time = event.timestamp
+        return True
+
+    def enable(self, enabled=True):
+        """
+        Start from the robot's reported pose (or start_pose) each time jogging is enabled;
+        returns False, and stays disabled, if there is no pose to start from
+        """
+        if enabled and not self.enabled:
+            state = self.state_store.get(self.client_id) if self.state_store else None
+            pose = state.pose if state else None
+            if pose is None and self.start_pose is None:
+                self.logger(f"[Jog:{self.client_id}] No reported pose yet; not enabling")
+                return False
+            self.pose = list(pose) if pose else list(self.start_pose)
+            self.velocity = [0.0, 0.0, 0.0]
+        self.enabled = enabled
+        self.logger(f"[Jog:{self.client_id}] {'Enabled' if enabled else 'Disabled'}")
+        return True
+
+    def _send_tcp(self, message):
+        return self.tcp_manager.send_message(self.client_id, message, log=False)
+
+    def step(self, dt):
+        """Integrate one tick of dt seconds; returns the command to send or None"""
+        velocity = self.velocity
+        if not self.enabled or self.pose is None or not any(velocity):
+            return None
+        pose = self.pose
+        for i, (low, high) in enumerate(self.workspace):
+            value = pose[i] + velocity[i] * self.max_speed * dt
+            if value < low or value > high:
+                value = min(high, max(low, value))
+                self.clamped += 1
+            pose[i] = value
+        return POSE_COMMAND.format(*pose)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.logger(f"[Jog:{self.client_id}] Running at {self.rate_hz} Hz")
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        last_tick = time.perf_counter()
+        next_tick = last_tick + period
+        last_input = None
+        while self.running:
+            delay = next_tick - time.perf_counter() - self.spin
+            if delay > 0:
+                time.sleep(delay)
+            while time.perf_counter() < next_tick:
+                pass
+            now = time.perf_counter()
+            self._sample(self.jitter, now - next_tick)
+            # Integrate over the time that actually passed, capped so a stall does not jump the robot
+            dt = min(now - last_tick, 2 * period)
+            last_tick = now
+            try:
+                previous = list(self.pose) if self.pose is not None else None
+                command = self.step(dt)
+                if command is not None:
+                    input_time = self.input_time
+                    if self.send(command) is False:
+                        self.pose = previous
+                        self.refused += 1
+                    else:
+                        self.sent += 1
+                        if input_time != last_input:
+                            self._sample(self.latency, time.time() - input_time)
+                            last_input = input_time
+            except Exception as e:
+                self.logger(f"[Jog:{self.client_id}] Tick error: {e}")
+            self.ticks += 1
+            # Absolute deadlines; if we fell more than a period behind, skip ahead instead of bursting
+            next_tick += period
+            if next_tick < now:
+                next_tick = now + period
+
+    def _sample(self, samples, value):
+        samples.append(value)
+        if len(samples) > self.max_samples:
+            del samples[:len(samples) // 2]
+
+    def stats(self):
+        jitter = [abs(j) for j in self.jitter]
+        return {
+            "ticks": self.ticks,
+            "sent": self.sent,
+            "clamped": self.clamped,
+            "refused": self.refused,
+            "jitter_p50_ms": _percentile(jitter, 0.50) * 1e3,
+            "jitter_p99_ms": _percentile(jitter, 0.99) * 1e3,
+            "jitter_max_ms": max(jitter) * 1e3 if jitter else 0.0,
+            "latency_p50_ms": _percentile(self.latency, 0.50) * 1e3,
+            "latency_p99_ms": _percentile(self.latency, 0.99) * 1e3,
+        }
+
+    def stop(self):
+        self.running = False
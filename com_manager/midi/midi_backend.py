@@ -0,0 +1,97 @@
+import importlib
+import os
+import sys
+
+# Backend name -> (module, class). Modules are only imported when the backend is
+# requested, so hosts without MIDI never touch winmm or rtmidi.
+BACKENDS = {
+    "winmm": (".winmm_backend", "WinMMBackend"),
+    "rtmidi": (".rtmidi_backend", "RtMidiBackend"),
+    "virtual": (".virtual_backend", "VirtualBackend"),
+}
+
+class MIDIBackendError(Exception):
+    pass
+
+class MIDIBackend:
+    """
+    Interface for MIDI backends.
+
+    open_input() registers callback(midi_data, timestamp), where midi_data is a
+    short message packed like a winmm DWORD: status | data1 << 8 | data2 << 16.
+    send() takes a list of messages packed the same way, written in one call.
+    """
+
+    name = "base"
+
+    def list_devices(self):
+        """[(device_index, device_name)] of the available input devices"""
+        raise NotImplementedError
+
+    def open_input(self, device_index, callback):
+        """Open an input device and start delivering messages; returns a handle or None on failure"""
+        raise NotImplementedError
+
+    def close_input(self, handle):
+        raise NotImplementedError
+
+    def list_output_devices(self):
+        """[(device_index, device_name)] of the available output devices"""
+        raise NotImplementedError
+
+    def open_output(self, device_index):
+        """Open an output device; returns a handle or None on failure"""
+        raise NotImplementedError
+
+    def send(self, handle, messages):
+        """Write a batch of packed short messages to an open output"""
+        raise NotImplementedError
+
+    def close_output(self, handle):
+        raise NotImplementedError
+
+def pack_message(status, data1=0, data2=0):
+    return status | (data1 << 8) | (data2 << 16)
+
+# Bytes in a short message by status byte: program change, channel pressure, MTC quarter
+# frame and song select carry one data byte; tune request and real-time messages none
+MESSAGE_LENGTH = tuple(2 if 0xC0 <= status <= 0xDF or status in (0xF1, 0xF3)
+                       else 1 if status == 0xF6 or status >= 0xF8
+                       else 3 for status in range(256))
+
+def unpack_message(midi_data):
+    """Bytes of a packed short message, sized from its status byte"""
+    message = [midi_data & 0xFF, (midi_data >> 8) & 0x7F, (midi_data >> 16) & 0x7F]
+    return message[:MESSAGE_LENGTH[message[0]]]
+
+def _default_backend_names():
+    if sys.platform == "win32":
+        return ["winmm"]
+    return ["rtmidi"]
+
+_instances = {}
+
+def get_backend(name=None, logger=None):
+    """
+    Backend by name ("winmm", "rtmidi", "virtual"). Without a name, uses the
+    MIDI_BACKEND environment variable or the platform default. Returns None if
+    no backend can be loaded.
+    """
+    logger = logger or print
+    name = name or os.environ.get("MIDI_BACKEND")
+    names = [name] if name else _default_backend_names()
+    for backend_name in names:
+        if backend_name in _instances:
+            return _instances[backend_name]
+        if backend_name not in BACKENDS:
+            raise MIDIBackendError(f"Unknown MIDI backend '{backend_name}' (expected one of {list(BACKENDS)})")
+        module_name, class_name = BACKENDS[backend_name]
+        try:
+            module = importlib.import_module(module_name, __package__)
+            backend = getattr(module, class_name)()
+        except (ImportError, OSError, AttributeError) as e:
+            logger(f"[MIDI] Backend '{backend_name}' unavailable: {e}")
+            continue
+        _instances[backend_name] = backend
+        return backend
+    return None
@@ -0,0 +1,276 @@
+import argparse
+import random
+import threading
+import time
+from .midi_backend import get_backend, pack_message
+from .midi_client import MIDIClient
+from .midi_event import decode, CC
+from .midi_conditioning import CCConditioner
+from .midi_hires import HighResDecoder
+
+# MIDI benchmarks on the virtual loopback backend. Run from the com_manager directory:
+#   python -m midi.midi_bench queue [--events 2000] [--rate 500]
+#   python -m midi.midi_bench decode [--messages 200000]
+#   python -m midi.midi_bench conditioning [--rate 1000] [--seconds 2]
+#   python -m midi.midi_bench hires [--messages 200000] [--rate 1000] [--seconds 2]
+
+def _quiet(message):
+    pass
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class _PollingListener:
+    """The previous MIDIClient.listen: plain list, pop(0) and a 1 ms sleep loop"""
+
+    def __init__(self, device, on_event):
+        self.messages = []
+        self.on_event = on_event
+        self.running = True
+        self.handle = device
+        device.callbacks = device.callbacks + [self._callback]
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _callback(self, midi_data, timestamp):
+        self.messages.append((midi_data, timestamp))
+
+    def _run(self):
+        while self.running:
+            if self.messages:
+                while self.messages:
+                    midi_data, timestamp = self.messages.pop(0)
+                    self.on_event(midi_data, timestamp)
+            time.sleep(0.001)
+
+    def stop(self):
+        self.running = False
+        self.handle.callbacks = [cb for cb in self.handle.callbacks if cb != self._callback]
+
+def _start_listener(mode, device_index, on_event):
+    if mode == "polling":
+        device = get_backend("virtual").device(device_index)
+        return _PollingListener(device, on_event)
+    client = MIDIClient("bench", device_index=device_index, logger=_quiet, backend="virtual",
+                        on_message=lambda client, parsed, midi_data, timestamp, simple: on_event(midi_data, timestamp))
+    client.start()
+    return client
+
+def bench_queue(mode, events=2000, rate=500.0, idle_s=2.0):
+    """Delivery latency from a synthetic CC source, and CPU burnt while no MIDI arrives"""
+    backend = get_backend("virtual")
+    device = backend.add_device(f"bench-{mode}")
+    device_index = len(backend.devices) - 1
+    latencies = []
+
+    def on_event(midi_data, timestamp):
+        latencies.append(time.time() - timestamp)
+
+    listener = _start_listener(mode, device_index, on_event)
+
+    # Idle: nothing is sent, measure CPU used by the process
+    cpu_start = time.process_time()
+    time.sleep(idle_s)
+    idle_cpu = (time.process_time() - cpu_start) / idle_s
+
+    # Active: sweep a fader so every value differs from the last
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    for i in range(events):
+        device.control_change(i % 8, i % 128)
+        ahead = start + (i + 1) * interval - time.perf_counter()
+        if ahead > 0:
+            time.sleep(ahead)
+    time.sleep(0.1)
+    listener.stop()
+    return {
+        "mode": mode,
+        "delivered": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "max_ms": max(latencies) * 1e3 if latencies else 0.0,
+        "idle_cpu_pct": idle_cpu * 100,
+    }
+
+def _legacy_parse(midi_data):
+    # The previous path: parse_midi_message formatted CC as "%3d,%3d",
+    # then main.py split, stripped and int()-ed it back
+    status = midi_data & 0xFF
+    data1 = (midi_data >> 8) & 0xFF
+    data2 = (midi_data >> 16) & 0xFF
+    channel = (status & 0x0F) + 1
+    if 0x90 <= status <= 0x9F:
+        return f"Note ON  - Ch:{channel:2d} Note:{data1:3d} Vel:{data2:3d}"
+    elif 0xB0 <= status <= 0xBF:
+        parsed = f"{data1:3d},{data2:3d}"
+        key, value = parsed.split(",")
+        return int(key.strip()), int(value.strip())
+    return f"Other    - Status:{status:02X} Data1:{data1:02X} Data2:{data2:02X}"
+
+def _typed_decode(midi_data):
+    event = decode(midi_data, 0.0)
+    if event.kind == CC:
+        return event.controller, event.value
+    return event
+
+def bench_decode(messages=200000):
+    """Decode throughput for a nanoKONTROL2-like mix (mostly CC, some buttons)"""
+    data = [pack_message(0xB0, i % 24, i % 128) if i % 10 else pack_message(0x90, 36 + i % 8, 127)
+            for i in range(messages)]
+    results = {}
+    for name, fn in (("string format + split", _legacy_parse), ("typed decode", _typed_decode)):
+        start = time.perf_counter()
+        for midi_data in data:
+            fn(midi_data)
+        results[name] = messages / (time.perf_counter() - start)
+    return results
+
+CONDITIONING_SETTINGS = (
+    ("raw (dedupe only)", None),
+    ("30 Hz", {"rate_hz": 30}),
+    ("30 Hz, deadband 2", {"rate_hz": 30, "deadband": 2}),
+    ("ema, 30 Hz, deadband 1", {"smoothing": "ema", "alpha": 0.3, "rate_hz": 30, "deadband": 1}),
+    ("one_euro, 30 Hz, deadband 1", {"smoothing": "one_euro", "rate_hz": 30, "deadband": 1}),
+)
+
+def bench_conditioning(rate=1000.0, seconds=2.0, noise=2, seed=1):
+    """Messages sent downstream for a fader swept up and back with +-noise jitter, in simulated time"""
+    rng = random.Random(seed)
+    count = int(rate * seconds)
+    stream = []
+    for i in range(count):
+        phase = i / count
+        target = 127 * (2 * phase if phase < 0.5 else 2 - 2 * phase)
+        value = min(127, max(0, round(target) + rng.randint(-noise, noise)))
+        stream.append((i / rate, pack_message(0xB0, 0, value)))
+    final = 42
+    stream.append((seconds, pack_message(0xB0, 0, final)))
+
+    results = []
+    for name, settings in CONDITIONING_SETTINGS:
+        conditioner = CCConditioner(**settings) if settings is not None else None
+        last = None
+        sent = []
+        for timestamp, midi_data in stream:
+            data2 = midi_data >> 16
+            if data2 == last:
+                continue
+            last = data2
+            event = decode(midi_data, timestamp)
+            if conditioner:
+                sent.extend(conditioner.feed(event, timestamp))
+                sent.extend(conditioner.poll(timestamp))
+            else:
+                sent.append(event)
+        if conditioner:
+            # Let the control settle and flush what is held back
+            sent.extend(conditioner.poll(seconds + 1.0))
+        results.append({
+            "setting": name,
+            "received": len(stream),
+            "sent": len(sent),
+            "per_s": len(sent) / seconds,
+            "final_ok": bool(sent) and sent[-1].value == final,
+        })
+    return results
+
+def _hires_values(count, controls):
+    # Each control walks through 14-bit values in steps that often keep the LSB
+    # (or the MSB) unchanged, which a 7-bit dedupe would drop
+    return [(i % controls, (i * 128 + (i // 3) * 7) % 16384) for i in range(count)]
+
+def _hires_messages(mode, control, value, channel=1):
+    status = 0xB0 | (channel - 1)
+    msb, lsb = value >> 7, value & 0x7F
+    if mode == "cc14":
+        return [pack_message(status, control, msb), pack_message(status, control + 32, lsb)]
+    return [pack_message(status, 99, 0), pack_message(status, 98, control),
+            pack_message(status, 6, msb), pack_message(status, 38, lsb)]
+
+def _hires_config(mode, controls):
+    if mode == "cc14":
+        return {"cc14": range(controls)}
+    return {"nrpn": True}
+
+def bench_hires_decode(messages=200000, controls=8):
+    """HighResDecoder throughput in raw MIDI messages per second"""
+    results = {}
+    for mode in ("cc14", "nrpn"):
+        data = []
+        for control, value in _hires_values(messages // (2 if mode == "cc14" else 4), controls):
+            data.extend(decode(m, 0.0) for m in _hires_messages(mode, control, value))
+        decoder = HighResDecoder(**_hires_config(mode, controls))
+        start = time.perf_counter()
+        for event in data:
+            decoder.feed(event, 0.0)
+        results[mode] = len(data) / (time.perf_counter() - start)
+    return results
+
+def bench_hires_live(mode, rate=1000.0, seconds=2.0, controls=8):
+    """Send `rate` 14-bit values/s through a MIDIClient on a virtual device; check none are lost"""
+    backend = get_backend("virtual")
+    device = backend.add_device(f"bench-hires-{mode}")
+    device_index = len(backend.devices) - 1
+    received = []
+
+    def on_message(client, event, midi_data, timestamp, simple):
+        received.append((event.controller, event.value, time.time() - timestamp))
+
+    client = MIDIClient("bench", device_index=device_index, logger=_quiet, backend="virtual",
+                        on_message=on_message, high_res=_hires_config(mode, controls))
+    client.start()
+    values = _hires_values(int(rate * seconds), controls)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    for i, (control, value) in enumerate(values):
+        for midi_data in _hires_messages(mode, control, value):
+            device.send_packed(midi_data)
+        ahead = start + (i + 1) * interval - time.perf_counter()
+        if ahead > 0:
+            time.sleep(ahead)
+    time.sleep(0.1)
+    client.stop()
+    latencies = [latency for _, _, latency in received]
+    return {
+        "mode": mode,
+        "sent": len(values),
+        "midi_per_s": len(values) * len(_hires_messages(mode, 0, 0)) / seconds,
+        "received": len(received),
+        "exact": [(c, v) for c, v, _ in received] == values,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDI benchmarks")
+    parser.add_argument("bench", choices=["queue", "decode", "conditioning", "hires"])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=None, help="Synthetic MIDI events per second (queue: 500, conditioning: 1000)")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.bench == "queue":
+        print(f"{'mode':<8} {'delivered':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'idle cpu %':>10}")
+        for mode in ("polling", "queue"):
+            r = bench_queue(mode, events=args.events, rate=args.rate or 500.0)
+            print(f"{r['mode']:<8} {r['delivered']:>9} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms']:>8.3f} {r['idle_cpu_pct']:>10.2f}")
+    elif args.bench == "decode":
+        for name, rate in bench_decode(messages=args.messages).items():
+            print(f"{name:<22} {rate / 1e6:>6.2f} M msgs/s")
+    elif args.bench == "conditioning":
+        print(f"{'setting':<28} {'received':>8} {'sent':>6} {'sent/s':>7} {'final ok':>8}")
+        for r in bench_conditioning(rate=args.rate or 1000.0, seconds=args.seconds):
+            print(f"{r['setting']:<28} {r['received']:>8} {r['sent']:>6} {r['per_s']:>7.1f} {str(r['final_ok']):>8}")
+    elif args.bench == "hires":
+        for mode, rate in bench_hires_decode(messages=args.messages).items():
+            print(f"{mode:<6} decode {rate / 1e6:>6.2f} M MIDI msgs/s")
+        print(f"{'mode':<6} {'values':>7} {'msgs/s':>7} {'received':>8} {'exact':>6} {'p99 ms':>7}")
+        for mode in ("cc14", "nrpn"):
+            r = bench_hires_live(mode, rate=args.rate or 1000.0, seconds=args.seconds)
+            print(f"{r['mode']:<6} {r['sent']:>7} {r['midi_per_s']:>7.0f} {r['received']:>8} {str(r['exact']):>6} {r['p99_ms']:>7.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,148 @@
 import threading
 import time
 from .nanokontrol2_reader import KorgNanoKONTROL2Reader
+from .midi_event import decode
+from .midi_backend import pack_message, MIDIBackendError
+from .midi_conditioning import CCConditioner
+from .midi_led import LEDController
+from .midi_hires import HighResDecoder
 
 class MIDIClient:
-    def __init__(self, client_id, device_index=0, logger=None, on_message=None):
+    def __init__(self, client_id, device_index=0, logger=None, on_message=None, backend=None, conditioning=None,
+                 output_device_index=None, high_res=None):
         self.client_id = client_id
         self.device_index = device_index
+        self.output_device_index = output_device_index  # None: input only
+        self.backend = backend
         self.logger = logger or print
         self.on_message = on_message
         self.running = False
         self.listen_thread = None
         self.reader = None
+        self.output = None
+        self.send_lock = threading.Lock()
+        self.leds = None
+        # conditioning: CCConditioner keyword args (smoothing, rate_hz, deadband, ...) or None to pass CC through
+        self.conditioner = CCConditioner(**conditioning) if conditioning is not None else None
+        # high_res: HighResDecoder keyword args, e.g. {"cc14": [0, 1], "nrpn": True}, or None for 7-bit only
+        self.high_res = HighResDecoder(**high_res) if high_res is not None else None
 
     def start(self):
+        # Raises if the device cannot be opened, so the manager does not keep a dead client
         if KorgNanoKONTROL2Reader is None:
-            self.logger(f"[MIDI:{self.client_id}] nanokontrol2_reader not found!")
-            return
-        self.reader = KorgNanoKONTROL2Reader()
+            raise MIDIBackendError("nanokontrol2_reader not found")
+        self.reader = KorgNanoKONTROL2Reader(backend=self.backend)
         if not self.reader.connect(self.device_index):
-            self.logger(f"[MIDI:{self.client_id}] Failed to connect to device {self.device_index}")
-            return
+            raise MIDIBackendError(f"failed to connect to device {self.device_index}")
         self.running = True
         self.listen_thread = threading.Thread(target=self.listen, daemon=True)
         self.listen_thread.start()
         self.logger(f"[MIDI:{self.client_id}] Started on device {self.device_index}")
+        if self.output_device_index is not None:
+            self.open_output()
+
+    def open_output(self):
+        backend = self.reader.backend
+        try:
+            self.output = backend.open_output(self.output_device_index)
+        except NotImplementedError:
+            self.output = None
+        if self.output is None:
+            self.logger(f"[MIDI:{self.client_id}] Failed to open output device {self.output_device_index}")
+            return False
+        self.leds = LEDController(self.send_messages, logger=self.logger)
+        self.leds.start()
+        self.logger(f"[MIDI:{self.client_id}] Output on device {self.output_device_index}")
+        return True
+
+    def send_messages(self, messages):
+        """Write packed short messages to the output in one backend call"""
+        if self.output is None:
+            raise RuntimeError("no MIDI output open")
+        with self.send_lock:
+            self.reader.backend.send(self.output, messages)
+
+    def send_message(self, status, data1=0, data2=0):
+        self.send_messages([pack_message(status, data1, data2)])
 
     def listen(self):
         try:
-            last_values = {}  # (status, data1) -> data2
+            last_values = {}  # status | data1 << 8 -> data2
+            queue = self.reader.messages
+            conditioner = self.conditioner
+            high_res = self.high_res
             while self.running:
-                if self.reader.messages:
-                    while self.reader.messages:
-                        midi_data, timestamp = self.reader.messages.pop(0)
-                        # Extract bytes
-                        byte1 = midi_data & 0xFF
-                        byte2 = (midi_data >> 8) & 0xFF
-                        byte3 = (midi_data >> 16) & 0xFF
-                        status = byte1
-                        data1 = byte2
-                        data2 = byte3
-                        key = (status, data1)
-                        prev_val = last_values.get(key)
-                        if prev_val == data2:
-                            continue  # Skip if value did not change
-                        last_values[key] = data2
-                        parsed = self.reader.parse_midi_message(midi_data, timestamp)
-                        simple = None  # No simple parser in generic version
-                        if parsed:
-                            # self.logger(f"[MIDI:{self.client_id}] {parsed}")
-                            pass
-                        if self.on_message:
-                            self.on_message(self, parsed, midi_data, timestamp, simple)
-                time.sleep(0.001)
+                # Blocks until the backend callback queues something (or a held-back
+                # CC value or unpaired MSB falls due); drains it all at once
+                timeout = 0.5
+                for stage in (conditioner, high_res):
+                    deadline = stage.next_deadline() if stage else None
+                    if deadline is not None:
+                        timeout = min(timeout, max(0.0, deadline - time.time()))
+                for midi_data, timestamp in queue.get_batch(timeout=timeout):
+                    if high_res and high_res.consumes(midi_data):
+                        # Not deduplicated: an unchanged LSB still completes a new MSB
+                        for event in high_res.feed(decode(midi_data, timestamp), time.time()):
+                            self.condition(event)
+                        continue
+                    # (status, data1) packed in the low 16 bits, data2 above
+                    key = midi_data & 0xFFFF
+                    data2 = (midi_data >> 16) & 0xFF
+                    if last_values.get(key) == data2:
+                        continue  # Skip if value did not change
+                    last_values[key] = data2
+                    event = decode(midi_data, timestamp)
+                    if conditioner:
+                        self.condition(event)
+                    else:
+                        self.dispatch(event, midi_data)
+                if high_res:
+                    for event in high_res.poll(time.time()):
+                        self.condition(event)
+                if conditioner:
+                    for event in conditioner.poll(time.time()):
+                        self.dispatch(event)
         except Exception as e:
             self.logger(f"[MIDI:{self.client_id}] Listen error: {e}")
 
+    def condition(self, event):
+        if self.conditioner:
+            for event in self.conditioner.feed(event, time.time()):
+                self.dispatch(event)
+        else:
+            self.dispatch(event)
+
+    def dispatch(self, event, midi_data=None):
+        if midi_data is None:
+            # Conditioned or 14-bit events: the low 7 bits, packed like the original message
+            midi_data = event.status | (event.controller & 0x7F) << 8 | (event.value & 0x7F) << 16
+        simple = None  # No simple parser in generic version
+        # self.logger(f"[MIDI:{self.client_id}] {event.format()}")
+        if self.on_message:
+            self.on_message(self, event, midi_data, event.timestamp, simple)
+
+    def stats(self):
+        queue = self.reader.messages if self.reader else None
+        return {
+            "received": queue.received if queue is not None else 0,
+            "overflows": queue.overflows if queue is not None else 0,
+            "queued": len(queue) if queue is not None else 0,
+            "conditioning": self.conditioner.stats() if self.conditioner else {},
+            "leds": self.leds.stats() if self.leds else None,
+            "high_res": self.high_res.stats() if self.high_res else None,
+        }
+
     def stop(self):
         self.running = False
+        if self.leds:
+            self.leds.stop()
+            self.leds.all_off()
+            self.leds.flush()
+        if self.output is not None:
+            self.reader.backend.close_output(self.output)
+            self.output = None
         if self.reader:
             self.reader.disconnect()
         self.logger(f"[MIDI:{self.client_id}] Stopped.")
 
-# Note: Requires nanokontrol2_reader.py in the same directory and python-osc for full integration. 
\ No newline at end of file
+# Note: Uses the MIDI backend from midi_backend.get_backend (winmm on Windows, python-rtmidi elsewhere, or "virtual"). 
\ No newline at end of file
@@ -1,54 +1,52 @@
 from .midi_client import MIDIClient
-import threading
-import time
+from common.client_manager import ClientManager
 
-class MIDIClientManager:
-    def __init__(self):
-        self.clients = {}
-        self.lock = threading.Lock()
+class MIDIClientManager(ClientManager):
+    label = "MIDI client"
 
-    def log(self, message):
-        print(f"{time.strftime('%H:%M:%S')} {message}")
+    def add_client(self, client_id, device_index=0, on_message=None, backend=None, conditioning=None,
+                   output_device_index=None, high_res=None):
+        return self._add(client_id,
+                         lambda: MIDIClient(client_id, device_index=device_index, logger=self.log, on_message=on_message,
+                                            backend=backend, conditioning=conditioning,
+                                            output_device_index=output_device_index, high_res=high_res),
+                         f"on device {device_index}")
 
-    def add_client(self, client_id, device_index=0, on_message=None):
-        with self.lock:
-            if client_id in self.clients:
-                self.log(f"MIDI client '{client_id}' already exists!")
-                return False
-            client = MIDIClient(client_id, device_index=device_index, logger=self.log, on_message=on_message)
-            self.clients[client_id] = client
-            client.start()
-            self.log(f"Added MIDI client '{client_id}' on device {device_index}")
-            return True
+    def set_led_source(self, client_id, on_tick):
+        """on_tick(leds) runs before every LED tick to set the desired LED state"""
+        client = self.clients.get(client_id)
+        if client and client.leds:
+            client.leds.on_tick = on_tick
 
-    def set_on_message(self, client_id, callback):
-        with self.lock:
-            if client_id in self.clients:
-                self.clients[client_id].on_message = callback
+    def set_led(self, client_id, cc, on=True):
+        client = self.clients.get(client_id)
+        if not client or not client.leds:
+            self.log(f"MIDI client '{client_id}' has no output!")
+            return False
+        client.leds.set(cc, on)
+        return True
 
-    def remove_client(self, client_id):
-        with self.lock:
-            if client_id not in self.clients:
-                self.log(f"MIDI client '{client_id}' not found!")
-                return False
-            client = self.clients[client_id]
-            client.stop()
-            del self.clients[client_id]
-            self.log(f"Removed MIDI client '{client_id}'")
+    def send_message(self, client_id, status, data1=0, data2=0):
+        client = self.clients.get(client_id)
+        if not client or client.output is None:
+            self.log(f"MIDI client '{client_id}' has no output!")
+            return False
+        try:
+            client.send_message(status, data1, data2)
             return True
+        except Exception as e:
+            self.log(f"[MIDI:{client_id}] Send error: {e}")
+            return False
 
-    def list_clients(self):
-        with self.lock:
-            if not self.clients:
-                self.log("No MIDI clients connected")
-                return
-            self.log("Connected MIDI clients:")
-            for client_id, client in self.clients.items():
-                self.log(f"  {client_id}: device {client.device_index}")
-
-    def stop_all(self):
-        with self.lock:
-            for client in self.clients.values():
-                client.stop()
-            self.clients.clear()
-            self.log("All MIDI clients stopped") 
\ No newline at end of file
+    def describe(self, client_id, client):
+        stats = client.stats()
+        lines = [f"  {client_id}: device {client.device_index} (received {stats['received']}, overflows {stats['overflows']})"]
+        if stats['high_res']:
+            high_res = stats['high_res']
+            lines.append(f"    14-bit: {high_res['emitted']} values ({high_res['msb_only']} MSB only)")
+        if stats['leds']:
+            leds = stats['leds']
+            lines.append(f"    LEDs: {leds['updates']} updates, {leds['messages_sent']} sent in {leds['writes']} writes")
+        for (kind, channel, controller), (received, sent, ratio) in sorted(stats['conditioning'].items()):
+            lines.append(f"    {kind} ch {channel} #{controller}: {received} in, {sent} out ({ratio:.1f}:1)")
+        return lines
@@ -0,0 +1,165 @@
+import math
+from .midi_event import MIDIEvent, CC, CC14, NRPN, RPN
+
+CONDITIONED_KINDS = (CC, CC14, NRPN, RPN)
+
+class ExponentialSmoother:
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.value = None
+
+    def reset(self, value):
+        self.value = value
+
+    def filter(self, x, t):
+        if self.value is None:
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+class OneEuroFilter:
+    """One-euro filter (Casiez et al. 2012): heavy smoothing when still, little lag when moving fast"""
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = 0.0
+        self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self, value):
+        self.value = value
+        self.derivative = 0.0
+
+    def filter(self, x, t):
+        if self.value is None or self.t is None or t <= self.t:
+            self.value = float(x) if self.value is None else self.value
+            self.t = t
+            return self.value
+        dt = t - self.t
+        self.t = t
+        dx = (x - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (dx - self.derivative)
+        cutoff = self.min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff, dt) * (x - self.value)
+        return self.value
+
+class _ControlState:
+    __slots__ = ("smoother", "deadband", "last_event", "raw", "smoothed", "output", "next_emit", "last_input", "dirty",
+                 "received", "sent")
+
+    def __init__(self, smoother, deadband):
+        self.smoother = smoother
+        self.deadband = deadband
+        self.last_event = None
+        self.raw = None
+        self.smoothed = None
+        self.output = None
+        self.next_emit = 0.0
+        self.last_input = 0.0
+        self.dirty = False
+        self.received = 0
+        self.sent = 0
+
+class CCConditioner:
+    """
+    Per-controller conditioning of CC streams before they reach the relay.
+
+    Each (kind, channel, controller) is smoothed (smoothing="ema" or "one_euro"),
+    held back unless it moved at least `deadband` CC steps (`deadband_hires`
+    steps for 14-bit CC14/NRPN/RPN values), and emitted at most
+    `rate_hz` times per second. When a control stops moving for `settle`
+    seconds its last raw value is flushed, so the resting position is always
+    delivered exactly.
+    """
+
+    def __init__(self, smoothing=None, rate_hz=30.0, deadband=0.0, settle=None,
+                 alpha=0.5, min_cutoff=1.0, beta=0.05, deadband_hires=0.0):
+        if smoothing not in (None, "ema", "one_euro"):
+            raise ValueError(f"Unknown CC smoothing '{smoothing}' (expected None, 'ema' or 'one_euro')")
+        self.smoothing = smoothing
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.deadband = max(deadband, 1)
+        self.deadband_hires = max(deadband_hires, 1)
+        self.settle = settle if settle is not None else max(self.period, 0.02)
+        self.alpha = alpha
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.controls = {}  # (kind, channel, controller) -> _ControlState
+
+    def _new_smoother(self):
+        if self.smoothing == "ema":
+            return ExponentialSmoother(self.alpha)
+        if self.smoothing == "one_euro":
+            return OneEuroFilter(self.min_cutoff, self.beta)
+        return None
+
+    def _emit(self, state, value, now):
+        state.output = value
+        state.next_emit = now + self.period
+        state.sent += 1
+        e = state.last_event
+        return MIDIEvent(e.kind, e.channel, e.controller, value, e.timestamp, e.status)
+
+    def feed(self, event, now=None):
+        """Condition one CC event; returns the events to send right away (zero or one)"""
+        if event.kind not in CONDITIONED_KINDS:
+            return [event]
+        now = event.timestamp if now is None else now
+        key = (event.kind, event.channel, event.controller)
+        state = self.controls.get(key)
+        if state is None:
+            deadband = self.deadband if event.kind == CC else self.deadband_hires
+            state = self.controls[key] = _ControlState(self._new_smoother(), deadband)
+        state.received += 1
+        state.last_event = event
+        state.raw = event.value
+        state.last_input = now
+        state.smoothed = state.smoother.filter(event.value, now) if state.smoother else event.value
+        state.dirty = True
+        if now >= state.next_emit:
+            value = round(state.smoothed)
+            if state.output is None or abs(value - state.output) >= state.deadband:
+                return [self._emit(state, value, now)]
+        return []
+
+    def poll(self, now):
+        """Events due by now: rate-limited updates and final-value flushes"""
+        out = []
+        for state in self.controls.values():
+            if not state.dirty:
+                continue
+            if now - state.last_input >= self.settle:
+                # Control came to rest: deliver the exact final value
+                state.dirty = False
+                if state.smoother:
+                    state.smoother.reset(float(state.raw))
+                if state.raw != state.output:
+                    out.append(self._emit(state, state.raw, now))
+            elif now >= state.next_emit:
+                value = round(state.smoothed)
+                if abs(value - state.output) >= state.deadband:
+                    out.append(self._emit(state, value, now))
+        return out
+
+    def next_deadline(self):
+        """Earliest time poll() may have something to emit, or None if every control is at rest"""
+        deadline = None
+        for state in self.controls.values():
+            if state.dirty:
+                due = min(state.next_emit, state.last_input + self.settle)
+                if deadline is None or due < deadline:
+                    deadline = due
+        return deadline
+
+    def stats(self):
+        """{(kind, channel, controller): (received, sent, reduction ratio)}"""
+        return {key: (s.received, s.sent, s.received / s.sent if s.sent else 0.0)
+                for key, s in self.controls.items()}
@@ -0,0 +1,91 @@
+# Typed MIDI events decoded from winmm-style packed short messages
+# (status | data1 << 8 | data2 << 16)
+
+NOTE_OFF = "note_off"
+NOTE_ON = "note_on"
+POLY_PRESSURE = "poly_pressure"
+CC = "cc"
+PROGRAM = "program"
+CHANNEL_PRESSURE = "channel_pressure"
+PITCH_BEND = "pitch_bend"
+OTHER = "other"
+# 14-bit values assembled from several CC messages (see midi_hires.py)
+CC14 = "cc14"
+NRPN = "nrpn"
+RPN = "rpn"
+
+_CLASS_KINDS = {0x80: NOTE_OFF, 0x90: NOTE_ON, 0xA0: POLY_PRESSURE, 0xB0: CC,
+                0xC0: PROGRAM, 0xD0: CHANNEL_PRESSURE, 0xE0: PITCH_BEND}
+
+# Lookup tables indexed by status byte
+STATUS_KIND = tuple(_CLASS_KINDS.get(status & 0xF0, OTHER) if status >= 0x80 else OTHER for status in range(256))
+STATUS_CHANNEL = tuple((status & 0x0F) + 1 if 0x80 <= status < 0xF0 else 0 for status in range(256))
+STATUS_INFO = tuple(zip(STATUS_KIND, STATUS_CHANNEL))
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+def note_to_name(note_number):
+    """Convert MIDI note number to note name"""
+    if note_number < 0 or note_number > 127:
+        return "???"
+    return f"{NOTE_NAMES[note_number % 12]}{(note_number // 12) - 1}"
+
+class MIDIEvent:
+    """
+    One decoded MIDI message. `controller` is the CC number or note, `value`
+    the CC value, velocity, program number, pressure or 14-bit pitch bend.
+    For CC14 `controller` is the MSB controller number, for NRPN/RPN the
+    14-bit parameter number, and `value` is 14-bit.
+    """
+
+    __slots__ = ("kind", "channel", "controller", "value", "timestamp", "status")
+
+    def __init__(self, kind, channel, controller, value, timestamp, status):
+        self.kind = kind
+        self.channel = channel
+        self.controller = controller
+        self.value = value
+        self.timestamp = timestamp
+        self.status = status
+
+    def format(self):
+        """Human-readable form, only built when something logs it"""
+        kind = self.kind
+        channel = self.channel
+        if kind == NOTE_ON or kind == NOTE_OFF:
+            label = "Note ON " if kind == NOTE_ON else "Note OFF"
+            return f"{label} - Ch:{channel:2d} Note:{self.controller:3d}({note_to_name(self.controller):>3}) Vel:{self.value:3d}"
+        if kind == CC:
+            return f"CC       - Ch:{channel:2d} Ctrl:{self.controller:3d} Val:{self.value:3d}"
+        if kind == PROGRAM:
+            return f"Program  - Ch:{channel:2d} Prog:{self.value:3d}"
+        if kind == PITCH_BEND:
+            return f"PitchBnd - Ch:{channel:2d} Val:{self.value:5d}"
+        if kind == CC14:
+            return f"CC14     - Ch:{channel:2d} Ctrl:{self.controller:3d} Val:{self.value:5d}"
+        if kind == NRPN or kind == RPN:
+            return f"{kind.upper():<8} - Ch:{channel:2d} Param:{self.controller:5d} Val:{self.value:5d}"
+        if kind == POLY_PRESSURE:
+            return f"PolyPres - Ch:{channel:2d} Note:{self.controller:3d} Val:{self.value:3d}"
+        if kind == CHANNEL_PRESSURE:
+            return f"ChanPres - Ch:{channel:2d} Val:{self.value:3d}"
+        return f"Other    - Status:{self.status:02X} Data1:{self.controller:02X} Data2:{self.value:02X}"
+
+    def __repr__(self):
+        return f"MIDIEvent({self.format()})"
+
+def decode(midi_data, timestamp=0.0):
+    status = midi_data & 0xFF
+    kind, channel = STATUS_INFO[status]
+    data1 = (midi_data >> 8) & 0xFF
+    data2 = (midi_data >> 16) & 0xFF
+    if kind is CC:
+        return MIDIEvent(CC, channel, data1, data2, timestamp, status)
+    if kind is NOTE_ON:
+        # Note On with velocity 0 is a Note Off
+        return MIDIEvent(NOTE_ON if data2 else NOTE_OFF, channel, data1, data2, timestamp, status)
+    if kind is PITCH_BEND:
+        return MIDIEvent(kind, channel, 0, (data2 << 7) | data1, timestamp, status)
+    if kind is PROGRAM or kind is CHANNEL_PRESSURE:
+        return MIDIEvent(kind, channel, 0, data1, timestamp, status)
+    return MIDIEvent(kind, channel, data1, data2, timestamp, status)
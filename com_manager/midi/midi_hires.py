@@ -0,0 +1,159 @@
+from .midi_event import MIDIEvent, CC14, NRPN, RPN
+
+# Controller numbers used by (N)RPN
+NRPN_MSB, NRPN_LSB = 99, 98
+RPN_MSB, RPN_LSB = 101, 100
+DATA_MSB, DATA_LSB = 6, 38
+DATA_INCREMENT, DATA_DECREMENT = 96, 97
+PARAMETER_CCS = (NRPN_MSB, NRPN_LSB, RPN_MSB, RPN_LSB, DATA_MSB, DATA_LSB, DATA_INCREMENT, DATA_DECREMENT)
+NULL_PARAMETER = 0x3FFF
+
+class _ChannelState:
+    __slots__ = ("msb", "msb_time", "last_msb", "param_kind", "param_msb", "param_lsb", "values", "pending_event")
+
+    def __init__(self):
+        self.msb = {}        # MSB controller -> MSB waiting for its LSB
+        self.msb_time = {}   # MSB controller -> time it arrived
+        self.last_msb = {}   # MSB controller (or DATA_MSB) -> last assembled MSB
+        self.param_kind = None
+        self.param_msb = 0x7F
+        self.param_lsb = 0x7F
+        self.values = {}     # (kind, parameter) -> last 14-bit value, for increment/decrement
+        self.pending_event = {}  # MSB controller -> CC event that carried it
+
+class HighResDecoder:
+    """
+    Per-channel state machine assembling 14-bit values from 7-bit CC pairs.
+
+    cc14: MSB controller numbers (0-31) whose LSB is sent on controller + 32.
+    nrpn: also decode NRPN/RPN (99/98 or 101/100 select, 6/38 data entry, 96/97 increment).
+
+    An MSB followed by its LSB gives msb << 7 | lsb. A lone LSB updates the low
+    bits of the last MSB, so fine moves that only change the LSB are kept. An
+    MSB whose LSB does not arrive within pair_timeout is emitted as msb << 7
+    by poll() (receiving an MSB resets the LSB to 0, as the MIDI spec requires).
+    """
+
+    def __init__(self, cc14=(), nrpn=False, pair_timeout=0.005):
+        self.cc14 = frozenset(cc14)
+        if any(not 0 <= cc < 32 for cc in self.cc14):
+            raise ValueError("14-bit CC MSB controllers must be 0-31")
+        if nrpn and DATA_MSB in self.cc14:
+            raise ValueError(f"CC {DATA_MSB}/{DATA_LSB} is (N)RPN data entry and cannot also be a 14-bit pair")
+        self.nrpn = nrpn
+        self.pair_timeout = pair_timeout
+        self.channels = [_ChannelState() for _ in range(16)]
+        # data1 values handled here; everything else passes through untouched
+        consumed = set(self.cc14) | {cc + 32 for cc in self.cc14}
+        if nrpn:
+            consumed |= set(PARAMETER_CCS)
+        self.consumed = tuple(data1 in consumed for data1 in range(128))
+        self.pending = 0
+        self.emitted = 0
+        self.msb_only = 0
+
+    def consumes(self, midi_data):
+        """True for CC messages that belong to a 14-bit pair or (N)RPN"""
+        return (midi_data & 0xF0) == 0xB0 and self.consumed[(midi_data >> 8) & 0x7F]
+
+    def feed(self, event, now):
+        """Feed one consumed CC event; returns the completed 14-bit events"""
+        state = self.channels[event.channel - 1]
+        cc = event.controller
+        value = event.value
+        out = []
+        if cc in self.cc14:
+            if cc in state.msb:
+                out.append(self._flush_msb(state, cc))
+            state.msb[cc] = value
+            state.msb_time[cc] = now
+            state.pending_event[cc] = event
+            self.pending += 1
+            return out
+        if cc - 32 in self.cc14:
+            msb_cc = cc - 32
+            msb = self._take_msb(state, msb_cc)
+            if msb is None:
+                msb = state.last_msb.get(msb_cc, 0)
+            state.last_msb[msb_cc] = msb
+            out.append(self._emit(CC14, event, msb_cc, msb << 7 | value))
+            return out
+        return self._feed_parameter(state, event, cc, value, now)
+
+    def _feed_parameter(self, state, event, cc, value, now):
+        out = []
+        if cc in (NRPN_MSB, NRPN_LSB, RPN_MSB, RPN_LSB) and DATA_MSB in state.msb:
+            # Data MSB for the previous parameter that never got its LSB
+            out.append(self._flush_msb(state, DATA_MSB))
+        if cc == NRPN_MSB or cc == RPN_MSB:
+            state.param_kind = NRPN if cc == NRPN_MSB else RPN
+            state.param_msb = value
+        elif cc == NRPN_LSB or cc == RPN_LSB:
+            state.param_kind = NRPN if cc == NRPN_LSB else RPN
+            state.param_lsb = value
+        elif state.param_kind is None or self._parameter(state) == NULL_PARAMETER:
+            return out  # Data entry without a selected parameter
+        elif cc == DATA_MSB:
+            if DATA_MSB in state.msb:
+                out.append(self._flush_msb(state, DATA_MSB))
+            state.msb[DATA_MSB] = value
+            state.msb_time[DATA_MSB] = now
+            state.pending_event[DATA_MSB] = event
+            self.pending += 1
+        elif cc == DATA_LSB:
+            msb = self._take_msb(state, DATA_MSB)
+            if msb is None:
+                msb = state.values.get((state.param_kind, self._parameter(state)), 0) >> 7
+            out.append(self._emit(state.param_kind, event, self._parameter(state), msb << 7 | value, state))
+        elif cc == DATA_INCREMENT or cc == DATA_DECREMENT:
+            key = (state.param_kind, self._parameter(state))
+            step = 1 if cc == DATA_INCREMENT else -1
+            new_value = min(0x3FFF, max(0, state.values.get(key, 0) + step))
+            out.append(self._emit(state.param_kind, event, key[1], new_value, state))
+        return out
+
+    @staticmethod
+    def _parameter(state):
+        return state.param_msb << 7 | state.param_lsb
+
+    def _emit(self, kind, event, controller, value, state=None):
+        if state is not None:
+            state.values[(kind, controller)] = value
+        self.emitted += 1
+        return MIDIEvent(kind, event.channel, controller, value, event.timestamp, event.status)
+
+    def _take_msb(self, state, cc):
+        msb = state.msb.pop(cc, None)
+        if msb is not None:
+            del state.msb_time[cc]
+            self.pending -= 1
+        return msb
+
+    def _flush_msb(self, state, cc):
+        # MSB without an LSB: the LSB is reset to 0
+        event = state.pending_event[cc]
+        msb = self._take_msb(state, cc)
+        self.msb_only += 1
+        if cc == DATA_MSB:
+            return self._emit(state.param_kind, event, self._parameter(state), msb << 7, state)
+        state.last_msb[cc] = msb
+        return self._emit(CC14, event, cc, msb << 7)
+
+    def poll(self, now):
+        """MSBs whose LSB did not arrive within pair_timeout"""
+        if not self.pending:
+            return []
+        out = []
+        for state in self.channels:
+            for cc, arrived in list(state.msb_time.items()):
+                if now - arrived >= self.pair_timeout:
+                    out.append(self._flush_msb(state, cc))
+        return out
+
+    def next_deadline(self):
+        if not self.pending:
+            return None
+        return min(arrived for state in self.channels for arrived in state.msb_time.values()) + self.pair_timeout
+
+    def stats(self):
+        return {"emitted": self.emitted, "msb_only": self.msb_only, "pending": self.pending}
@@ -0,0 +1,115 @@
+import threading
+import time
+from .midi_backend import pack_message
+
+# nanoKONTROL2 button CCs (factory scene, LED mode "External" in the Korg Kontrol Editor)
+SOLO = tuple(range(32, 40))
+MUTE = tuple(range(48, 56))
+RECORD = tuple(range(64, 72))
+PLAY, STOP, REWIND, FORWARD, REC, CYCLE = 41, 42, 43, 44, 45, 46
+LED_ON = 127
+LED_OFF = 0
+
+class LEDController:
+    """
+    Desired-state shadow of controller LEDs, driven by CC on/off messages.
+
+    set() only records what an LED should show. Once per tick the desired
+    state is compared with what was last sent and only the differences go
+    out, in one write, so flipping many buttons at once (or flipping one back
+    and forth within a tick) does not flood the device. on_tick(leds), if
+    given, runs before each diff to pull state from elsewhere.
+    """
+
+    def __init__(self, send, rate_hz=30.0, channel=1, on_tick=None, logger=None):
+        self.send = send  # send(messages) with messages packed status | data1 << 8 | data2 << 16
+        self.rate_hz = rate_hz
+        self.channel = channel
+        self.on_tick = on_tick
+        self.logger = logger or print
+        self.lock = threading.Lock()
+        self.desired = {}  # cc -> value
+        self.sent = {}     # cc -> value last written to the device
+        self.running = False
+        self.thread = None
+        self.ticks = 0
+        self.writes = 0
+        self.messages_sent = 0
+        self.updates = 0
+
+    def set(self, cc, on=True):
+        value = LED_ON if on is True else LED_OFF if on is False else on
+        with self.lock:
+            self.desired[cc] = value
+            self.updates += 1
+
+    def set_many(self, states):
+        """{cc: on} applied together"""
+        with self.lock:
+            for cc, on in states.items():
+                self.desired[cc] = LED_ON if on is True else LED_OFF if on is False else on
+            self.updates += len(states)
+
+    def all_off(self):
+        with self.lock:
+            for cc in set(self.desired) | set(self.sent):
+                self.desired[cc] = LED_OFF
+
+    def resync(self):
+        """Forget what the device shows, so every desired LED is sent again (e.g. after a reconnect)"""
+        with self.lock:
+            self.sent.clear()
+
+    def flush(self):
+        """Send the LEDs that differ from the device; returns the number of messages written"""
+        status = 0xB0 | (self.channel - 1)
+        with self.lock:
+            changes = [(cc, value) for cc, value in self.desired.items() if self.sent.get(cc) != value]
+            if not changes:
+                return 0
+            for cc, value in changes:
+                self.sent[cc] = value
+        try:
+            self.send([pack_message(status, cc, value) for cc, value in changes])
+        except Exception as e:
+            # Leave them unsent so the next tick retries
+            with self.lock:
+                for cc, _value in changes:
+                    self.sent.pop(cc, None)
+            self.logger(f"[LED] Send error: {e}")
+            return 0
+        self.writes += 1
+        self.messages_sent += len(changes)
+        return len(changes)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while self.running:
+            try:
+                if self.on_tick:
+                    self.on_tick(self)
+                self.flush()
+            except Exception as e:
+                self.logger(f"[LED] Tick error: {e}")
+            self.ticks += 1
+            # Absolute deadlines so the rate does not drift with flush time
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stats(self):
+        return {"updates": self.updates, "messages_sent": self.messages_sent, "writes": self.writes, "ticks": self.ticks}
+
+    def stop(self):
+        self.running = False
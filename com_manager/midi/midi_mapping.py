@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from .midi_event import NOTE_OFF, NOTE_ON, POLY_PRESSURE, CC, PROGRAM, CHANNEL_PRESSURE, PITCH_BEND, CC14, NRPN, RPN
+
+# Mapping entry "type" -> status class and the input range used for "scale"
+KIND_STATUS = {NOTE_OFF: 0x80, NOTE_ON: 0x90, POLY_PRESSURE: 0xA0, CC: 0xB0,
+               PROGRAM: 0xC0, CHANNEL_PRESSURE: 0xD0, PITCH_BEND: 0xE0}
+# 14-bit values assembled by HighResDecoder; their numbers do not fit the flat table
+HIGH_RES_KINDS = (CC14, NRPN, RPN)
+KIND_RANGE = {PITCH_BEND: (0, 16383), CC14: (0, 16383), NRPN: (0, 16383), RPN: (0, 16383)}
+TRIGGERS = (None, "press", "release")
+
+TABLE_SIZE = 256 << 7
+
+def table_index(status, data1):
+    return status << 7 | data1
+
+class MIDIBinding:
+    """One mapping entry: a control -> RAPID command template, with optional value scaling"""
+
+    __slots__ = ("name", "kind", "channel", "number", "command", "scale", "in_range", "trigger", "targets", "source")
+
+    def __init__(self, kind, number, command, channel=None, scale=None, in_range=None, trigger=None,
+                 targets=None, name=None, source=None):
+        if kind not in KIND_STATUS and kind not in HIGH_RES_KINDS:
+            raise ValueError(f"Unknown MIDI mapping type '{kind}'")
+        if trigger not in TRIGGERS:
+            raise ValueError(f"Unknown trigger '{trigger}' (expected 'press' or 'release')")
+        if kind == NOTE_OFF and trigger == "press":
+            raise ValueError("A note_off binding cannot have trigger 'press'")
+        self.kind = kind
+        self.channel = channel  # 1-16, None for any channel
+        self.number = number
+        self.command = command
+        self.scale = tuple(scale) if scale else None
+        self.in_range = tuple(in_range) if in_range else KIND_RANGE.get(kind, (0, 127))
+        self.trigger = trigger
+        self.targets = targets
+        self.name = name or f"{kind}:{number}"
+        self.source = source
+
+    def format(self, event):
+        """RAPID command for this event, or None if the trigger does not fire"""
+        raw = event.value
+        # A Note Off is a release whatever its release velocity
+        released = raw == 0 or event.kind is NOTE_OFF
+        if self.trigger == "press" and released:
+            return None
+        if self.trigger == "release" and not released:
+            return None
+        value = raw
+        if self.scale:
+            lo, hi = self.in_range
+            out_lo, out_hi = self.scale
+            value = out_lo + (raw - lo) * (out_hi - out_lo) / (hi - lo)
+        return self.command.format(value=value, raw=raw, channel=event.channel, number=event.controller, name=self.name)
+
+    def __repr__(self):
+        channel = self.channel or "*"
+        return f"MIDIBinding({self.name} ch {channel} -> {self.command!r}, targets={self.targets or 'all'})"
+
+class MIDIMapping:
+    """
+    MIDI controls -> RAPID commands, loaded from a JSON mapping file.
+
+    Bindings are compiled into a flat table indexed by status << 7 | data1,
+    so dispatching an event is one list lookup (14-bit CC14/NRPN/RPN bindings
+    go in a dict keyed by (kind, channel, number)). Reloading builds a new table
+    and swaps it in; the MIDI device and robot connections stay up.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger or print
+        self.lock = threading.Lock()
+        self.bindings = []
+        self.table = [None] * TABLE_SIZE
+        self.high_res = {}
+        self.mapping_path = None
+        self.mapping_mtime = None
+        self.watching = False
+        self.watch_thread = None
+
+    def _compile(self, bindings):
+        table = [None] * TABLE_SIZE
+        high_res = {}
+        for binding in bindings:
+            channels = [binding.channel] if binding.channel else range(1, 17)
+            if binding.kind in HIGH_RES_KINDS:
+                for channel in channels:
+                    key = (binding.kind, channel, binding.number)
+                    high_res[key] = high_res.get(key, ()) + (binding,)
+                continue
+            # Releases of a note arrive as note_off events, so a note_on "release" binding listens there
+            kind = NOTE_OFF if binding.kind == NOTE_ON and binding.trigger == "release" else binding.kind
+            base = KIND_STATUS[kind]
+            number = binding.number if binding.kind not in (PROGRAM, CHANNEL_PRESSURE, PITCH_BEND) else 0
+            for channel in channels:
+                index = table_index(base | (channel - 1), number)
+                table[index] = (table[index] or ()) + (binding,)
+        return table, high_res
+
+    def lookup(self, event):
+        if event.kind in HIGH_RES_KINDS:
+            return self.high_res.get((event.kind, event.channel, event.controller))
+        status = event.status
+        if event.kind is NOTE_OFF:
+            status = 0x80 | (status & 0x0F)  # Note On with velocity 0
+        return self.table[status << 7 | (event.controller & 0x7F)]
+
+    def dispatch(self, event):
+        """[(binding, command)] for every binding that fires on this event"""
+        bindings = self.lookup(event)
+        if not bindings:
+            return []
+        results = []
+        for binding in bindings:
+            command = binding.format(event)
+            if command is not None:
+                results.append((binding, command))
+        return results
+
+    def load_mapping(self, path):
+        """
+        Load bindings from a JSON mapping file:
+            {"bindings": [{"type": "cc", "number": 0, "channel": 1, "command": "slider1/{value};",
+                           "scale": [0, 1], "trigger": "press", "targets": ["Filemona"]}]}
+        Types: note_on, note_off, poly_pressure, cc, program, channel_pressure, pitch_bend,
+        and the 14-bit cc14 (number = MSB controller), nrpn and rpn (number = parameter).
+        Templates can use {value} (scaled), {raw}, {channel}, {number} and {name}.
+        A note_on binding with trigger "release" fires on the Note Off of that note.
+        On error the previous bindings are kept.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path) as f:
+                mapping = json.load(f)
+            bindings = []
+            for entry in mapping.get("bindings", []):
+                bindings.append(MIDIBinding(entry["type"], entry.get("number", 0), entry["command"],
+                                            channel=entry.get("channel"), scale=entry.get("scale"),
+                                            in_range=entry.get("range"), trigger=entry.get("trigger"),
+                                            targets=entry.get("targets"), name=entry.get("name"), source=path))
+            table, high_res = self._compile(bindings)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger(f"[MIDI] Failed to load mapping {path}: {e}")
+            return False
+        with self.lock:
+            self.bindings = bindings
+            self.table = table
+            self.high_res = high_res
+            self.mapping_path = path
+            self.mapping_mtime = mtime
+        self.logger(f"[MIDI] Loaded {len(bindings)} bindings from {path}")
+        return True
+
+    def reload_if_changed(self):
+        if not self.mapping_path:
+            return False
+        try:
+            mtime = os.stat(self.mapping_path).st_mtime
+        except OSError:
+            return False
+        if mtime == self.mapping_mtime:
+            return False
+        return self.load_mapping(self.mapping_path)
+
+    def watch(self, interval=1.0):
+        """Poll the mapping file and hot-reload it when it changes"""
+        if self.watching:
+            return
+        self.watching = True
+
+        def run():
+            while self.watching:
+                time.sleep(interval)
+                self.reload_if_changed()
+
+        self.watch_thread = threading.Thread(target=run, daemon=True)
+        self.watch_thread.start()
+
+    def stop(self):
+        self.watching = False
+
+    def list_bindings(self):
+        return list(self.bindings)
@@ -0,0 +1,55 @@
+import collections
+import threading
+
+class MIDIEventQueue:
+    """
+    Bounded queue between the MIDI backend callback and the listener thread.
+
+    The consumer sleeps on a condition until data arrives and takes everything
+    queued in one call. When full, the oldest event is dropped (the newest
+    fader position is the one that matters) and counted in overflows.
+    """
+
+    def __init__(self, maxlen=4096):
+        self.maxlen = maxlen
+        self.events = collections.deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.overflows = 0
+        self.received = 0
+
+    def put(self, midi_data, timestamp):
+        with self.cond:
+            events = self.events
+            if len(events) >= self.maxlen:
+                events.popleft()
+                self.overflows += 1
+            events.append((midi_data, timestamp))
+            self.received += 1
+            # A waiting consumer can only be waiting on an empty queue
+            if len(events) == 1:
+                self.cond.notify()
+
+    # Kept so code that appended to the old plain list keeps working
+    def append(self, event):
+        self.put(*event)
+
+    def get_batch(self, timeout=None):
+        """Every queued (midi_data, timestamp), waiting up to timeout for the first one"""
+        with self.cond:
+            if not self.events and not self.closed:
+                self.cond.wait(timeout)
+            batch = list(self.events)
+            self.events.clear()
+            return batch
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.events)
+
+    def __bool__(self):
+        return bool(self.events)
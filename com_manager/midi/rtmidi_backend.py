@@ -0,0 +1,84 @@
+import time
+import rtmidi
+from .midi_backend import MIDIBackend, pack_message, unpack_message
+
+class RtMidiBackend(MIDIBackend):
+    """
+    python-rtmidi input and output (ALSA sequencer on Linux, CoreMIDI on macOS), callback driven.
+    Requires python-rtmidi: pip install python-rtmidi
+    """
+
+    name = "rtmidi"
+
+    def list_devices(self):
+        midi_in = rtmidi.MidiIn()
+        try:
+            ports = midi_in.get_ports()
+        finally:
+            midi_in.delete()
+        print(f"Found {len(ports)} MIDI input devices:")
+        for i, port_name in enumerate(ports):
+            print(f"  {i}: {port_name}")
+        return list(enumerate(ports))
+
+    def open_input(self, device_index, callback):
+        midi_in = rtmidi.MidiIn()
+        ports = midi_in.get_ports()
+        if device_index < 0 or device_index >= len(ports):
+            print(f"Invalid device index {device_index}. Available devices: {len(ports)}")
+            midi_in.delete()
+            return None
+
+        def on_rtmidi(event, data=None):
+            message, _delta = event
+            # Short messages only, packed the same way winmm delivers them
+            if 1 <= len(message) <= 3:
+                callback(pack_message(*message), time.time())
+
+        try:
+            midi_in.open_port(device_index)
+        except rtmidi.RtMidiError as e:
+            print(f"Failed to open MIDI device {device_index}: {e}")
+            midi_in.delete()
+            return None
+        midi_in.ignore_types(sysex=True, timing=True, active_sense=True)
+        midi_in.set_callback(on_rtmidi)
+        print(f"Connected to: {ports[device_index]}")
+        return midi_in
+
+    def close_input(self, midi_in):
+        midi_in.cancel_callback()
+        midi_in.close_port()
+        midi_in.delete()
+
+    def list_output_devices(self):
+        midi_out = rtmidi.MidiOut()
+        try:
+            ports = midi_out.get_ports()
+        finally:
+            midi_out.delete()
+        return list(enumerate(ports))
+
+    def open_output(self, device_index):
+        midi_out = rtmidi.MidiOut()
+        ports = midi_out.get_ports()
+        if device_index < 0 or device_index >= len(ports):
+            print(f"Invalid output device index {device_index}. Available devices: {len(ports)}")
+            midi_out.delete()
+            return None
+        try:
+            midi_out.open_port(device_index)
+        except rtmidi.RtMidiError as e:
+            print(f"Failed to open MIDI output {device_index}: {e}")
+            midi_out.delete()
+            return None
+        print(f"Connected output to: {ports[device_index]}")
+        return midi_out
+
+    def send(self, midi_out, messages):
+        for midi_data in messages:
+            midi_out.send_message(unpack_message(midi_data))
+
+    def close_output(self, midi_out):
+        midi_out.close_port()
+        midi_out.delete()
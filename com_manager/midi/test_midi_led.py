@@ -0,0 +1,62 @@
+from midi.midi_backend import pack_message
+from midi.midi_led import LEDController, SOLO, RECORD, CYCLE, LED_ON, LED_OFF
+from midi.virtual_backend import VirtualBackend
+
+# LED diffing and batching against the virtual backend's output side. Run from the
+# com_manager directory:
+#   python -m pytest -q midi
+
+def _leds():
+    backend = VirtualBackend()
+    device = backend.open_output(0)
+    leds = LEDController(lambda messages: backend.send(device, messages), logger=lambda message: None)
+    return leds, device
+
+def _cc(cc, value, channel=1):
+    return pack_message(0xB0 | (channel - 1), cc, value)
+
+def test_changes_go_out_in_one_write():
+    leds, device = _leds()
+    leds.set_many({cc: True for cc in SOLO})
+    assert leds.flush() == len(SOLO)
+    assert device.output_writes == 1
+    assert list(device.output) == [_cc(cc, LED_ON) for cc in SOLO]
+
+def test_unchanged_leds_send_nothing():
+    leds, device = _leds()
+    leds.set(CYCLE)
+    leds.flush()
+    leds.set(CYCLE)  # Same value again
+    assert leds.flush() == 0
+    leds.set(CYCLE, False)
+    leds.set(CYCLE, True)  # Flipped back within one tick
+    assert leds.flush() == 0
+    assert device.output_writes == 1
+    assert list(device.output) == [_cc(CYCLE, LED_ON)]
+
+def test_one_message_per_change():
+    leds, device = _leds()
+    leds.set_many({cc: True for cc in SOLO + RECORD})
+    leds.flush()
+    leds.set(SOLO[2], False)
+    leds.set(RECORD[5], False)
+    assert leds.flush() == 2
+    assert device.output_writes == 2
+    assert list(device.output)[-2:] == [_cc(SOLO[2], LED_OFF), _cc(RECORD[5], LED_OFF)]
+    assert leds.stats()["messages_sent"] == len(SOLO + RECORD) + 2
+
+def test_resync_and_failed_send_resend():
+    leds, device = _leds()
+    leds.set_many({SOLO[0]: True, SOLO[1]: True})
+    leds.flush()
+    leds.resync()
+    assert leds.flush() == 2
+    sends = leds.send
+    def fail(messages):
+        raise OSError("device gone")
+    leds.send = fail
+    leds.set(SOLO[0], False)
+    assert leds.flush() == 0
+    leds.send = sends
+    assert leds.flush() == 1  # Retried on the next tick
+    assert device.output_writes == 3
@@ -0,0 +1,91 @@
+import collections
+import threading
+import time
+from .midi_backend import MIDIBackend, pack_message
+
+class VirtualMIDIDevice:
+    """
+    In-process loopback device: whatever is sent to it is delivered to the inputs opened on it.
+    Messages written to its output side are kept in `output` (newest last) and
+    each batch counts as one write, like a single USB transfer to the device.
+    """
+
+    def __init__(self, name, output_size=4096):
+        self.name = name
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.output = collections.deque(maxlen=output_size)
+        self.output_writes = 0
+
+    def receive_output(self, messages):
+        with self.lock:
+            self.output.extend(messages)
+            self.output_writes += 1
+
+    def send(self, status, data1=0, data2=0, timestamp=None):
+        self.send_packed(pack_message(status, data1, data2), timestamp)
+
+    def send_packed(self, midi_data, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for callback in self.callbacks:
+            callback(midi_data, timestamp)
+
+    def control_change(self, controller, value, channel=1):
+        self.send(0xB0 | (channel - 1), controller, value)
+
+    def note_on(self, note, velocity=127, channel=1):
+        self.send(0x90 | (channel - 1), note, velocity)
+
+    def note_off(self, note, channel=1):
+        self.send(0x80 | (channel - 1), note, 0)
+
+class VirtualBackend(MIDIBackend):
+    """Virtual MIDI devices for tests and benchmarks; one loopback device exists by default"""
+
+    name = "virtual"
+
+    def __init__(self):
+        self.devices = [VirtualMIDIDevice("Virtual nanoKONTROL2")]
+        self.lock = threading.Lock()
+
+    def add_device(self, name):
+        with self.lock:
+            device = VirtualMIDIDevice(name)
+            self.devices.append(device)
+            return device
+
+    def device(self, device_index=0):
+        return self.devices[device_index]
+
+    def list_devices(self):
+        return [(i, device.name) for i, device in enumerate(self.devices)]
+
+    def open_input(self, device_index, callback):
+        if device_index < 0 or device_index >= len(self.devices):
+            print(f"Invalid device index {device_index}. Available devices: 0-{len(self.devices)-1}")
+            return None
+        device = self.devices[device_index]
+        with device.lock:
+            # Copy-on-write so send() can iterate without taking the lock
+            device.callbacks = device.callbacks + [callback]
+        return (device, callback)
+
+    def close_input(self, handle):
+        device, callback = handle
+        with device.lock:
+            device.callbacks = [cb for cb in device.callbacks if cb is not callback]
+
+    def list_output_devices(self):
+        return self.list_devices()
+
+    def open_output(self, device_index):
+        if device_index < 0 or device_index >= len(self.devices):
+            print(f"Invalid output device index {device_index}. Available devices: 0-{len(self.devices)-1}")
+            return None
+        return self.devices[device_index]
+
+    def send(self, device, messages):
+        device.receive_output(messages)
+
+    def close_output(self, device):
+        pass
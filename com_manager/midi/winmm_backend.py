@@ -0,0 +1,166 @@
+import ctypes
+import ctypes.wintypes
+import time
+from .midi_backend import MIDIBackend
+
+# Windows MIDI API constants
+MMSYSERR_NOERROR = 0
+CALLBACK_FUNCTION = 0x30000
+MIM_OPEN = 0x3C1
+MIM_CLOSE = 0x3C2
+MIM_DATA = 0x3C3
+MIM_LONGDATA = 0x3C4
+MIM_ERROR = 0x3C5
+MIM_LONGERROR = 0x3C6
+CALLBACK_NULL = 0
+
+# Define callback function type
+MIDI_CALLBACK = ctypes.WINFUNCTYPE(None, ctypes.wintypes.HANDLE, ctypes.wintypes.UINT,
+                                  ctypes.wintypes.DWORD, ctypes.wintypes.DWORD, ctypes.wintypes.DWORD)
+
+class MIDIINCAPS(ctypes.Structure):
+    _fields_ = [
+        ("wMid", ctypes.wintypes.WORD),
+        ("wPid", ctypes.wintypes.WORD),
+        ("vDriverVersion", ctypes.wintypes.DWORD),
+        ("szPname", ctypes.c_char * 32),
+        ("dwSupport", ctypes.wintypes.DWORD)
+    ]
+
+class MIDIOUTCAPS(ctypes.Structure):
+    _fields_ = [
+        ("wMid", ctypes.wintypes.WORD),
+        ("wPid", ctypes.wintypes.WORD),
+        ("vDriverVersion", ctypes.wintypes.DWORD),
+        ("szPname", ctypes.c_char * 32),
+        ("wTechnology", ctypes.wintypes.WORD),
+        ("wVoices", ctypes.wintypes.WORD),
+        ("wNotes", ctypes.wintypes.WORD),
+        ("wChannelMask", ctypes.wintypes.WORD),
+        ("dwSupport", ctypes.wintypes.DWORD)
+    ]
+
+class _WinMMInput:
+    def __init__(self, handle, callback):
+        self.handle = handle
+        self.callback = callback  # Keeps the ctypes callback alive while the device is open
+
+class WinMMBackend(MIDIBackend):
+    """Windows multimedia (winmm) MIDI input (callback driven) and output"""
+
+    name = "winmm"
+
+    def __init__(self):
+        # Load Windows multimedia library
+        self.winmm = ctypes.windll.winmm
+
+    def device_name(self, device_index):
+        caps = MIDIINCAPS()
+        result = self.winmm.midiInGetDevCapsA(device_index, ctypes.byref(caps), ctypes.sizeof(caps))
+        if result != MMSYSERR_NOERROR:
+            return None
+        return caps.szPname.decode('ascii', errors='ignore').rstrip('\x00')
+
+    def list_devices(self):
+        """List all available MIDI input devices"""
+        num_devices = self.winmm.midiInGetNumDevs()
+        print(f"Found {num_devices} MIDI input devices:")
+
+        devices = []
+        for i in range(num_devices):
+            device_name = self.device_name(i)
+            if device_name is not None:
+                print(f"  {i}: {device_name}")
+                devices.append((i, device_name))
+            else:
+                print(f"  {i}: Error getting device info")
+
+        return devices
+
+    def open_input(self, device_index, callback):
+        """Connect to a MIDI input device"""
+        num_devices = self.winmm.midiInGetNumDevs()
+
+        if num_devices == 0:
+            print("No MIDI input devices found!")
+            return None
+
+        if device_index >= num_devices or device_index < 0:
+            print(f"Invalid device index {device_index}. Available devices: 0-{num_devices-1}")
+            return None
+
+        def midi_callback(handle, msg, instance, param1, param2):
+            if msg == MIM_DATA:
+                callback(param1, time.time())
+
+        # Create callback
+        c_callback = MIDI_CALLBACK(midi_callback)
+
+        # Open MIDI input
+        handle = ctypes.wintypes.HANDLE()
+        result = self.winmm.midiInOpen(
+            ctypes.byref(handle),
+            device_index,
+            c_callback,
+            0,  # callback instance data
+            CALLBACK_FUNCTION
+        )
+
+        if result != MMSYSERR_NOERROR:
+            print(f"Failed to open MIDI device {device_index} (error code: {result})")
+            return None
+
+        print(f"Connected to: {self.device_name(device_index)}")
+
+        # Start MIDI input
+        port = _WinMMInput(handle, c_callback)
+        result = self.winmm.midiInStart(handle)
+        if result != MMSYSERR_NOERROR:
+            print(f"Failed to start MIDI input (error code: {result})")
+            self.close_input(port)
+            return None
+
+        return port
+
+    def close_input(self, port):
+        # Stop, reset and close MIDI input
+        self.winmm.midiInStop(port.handle)
+        self.winmm.midiInReset(port.handle)
+        self.winmm.midiInClose(port.handle)
+
+    def output_device_name(self, device_index):
+        caps = MIDIOUTCAPS()
+        result = self.winmm.midiOutGetDevCapsA(device_index, ctypes.byref(caps), ctypes.sizeof(caps))
+        if result != MMSYSERR_NOERROR:
+            return None
+        return caps.szPname.decode('ascii', errors='ignore').rstrip('\x00')
+
+    def list_output_devices(self):
+        devices = []
+        for i in range(self.winmm.midiOutGetNumDevs()):
+            device_name = self.output_device_name(i)
+            if device_name is not None:
+                devices.append((i, device_name))
+        return devices
+
+    def open_output(self, device_index):
+        num_devices = self.winmm.midiOutGetNumDevs()
+        if device_index >= num_devices or device_index < 0:
+            print(f"Invalid output device index {device_index}. Available devices: 0-{num_devices-1}")
+            return None
+        handle = ctypes.wintypes.HANDLE()
+        result = self.winmm.midiOutOpen(ctypes.byref(handle), device_index, 0, 0, CALLBACK_NULL)
+        if result != MMSYSERR_NOERROR:
+            print(f"Failed to open MIDI output {device_index} (error code: {result})")
+            return None
+        print(f"Connected output to: {self.output_device_name(device_index)}")
+        return handle
+
+    def send(self, handle, messages):
+        # Short messages are already packed the way midiOutShortMsg expects
+        for midi_data in messages:
+            self.winmm.midiOutShortMsg(handle, midi_data)
+
+    def close_output(self, handle):
+        self.winmm.midiOutReset(handle)
+        self.winmm.midiOutClose(handle)
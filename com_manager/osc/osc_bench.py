@@ -0,0 +1,229 @@
+import argparse
+import math
+import random
+import socket
+import threading
+import time
+from pythonosc import udp_client
+from pythonosc.osc_message_builder import OscMessageBuilder
+from .osc_client import OSCClient, DISPATCH_MODES
+from .osc_encoder import OSCEncoderCache
+from .osc_router import OSCRouter
+from .osc_change_filter import ChangeFilter
+
+# OSC benchmarks. Run from the com_manager directory:
+#   python -m osc.osc_bench dispatch [--packets 20000]
+#   python -m osc.osc_bench router [--routes 1000]
+#   python -m osc.osc_bench encoder [--messages 100000]
+#   python -m osc.osc_bench filter [--rate 60] [--seconds 30]
+
+def _quiet(message):
+    pass
+
+def _pose_dgram(seq):
+    builder = OscMessageBuilder(address="/pose")
+    builder.add_arg(seq)
+    for value in (500.0, -1000.0, 2000.0, 0.5, 0.5, 0.5, -0.5):
+        builder.add_arg(value)
+    return builder.build().dgram
+
+def bench_dispatch(mode, packets=20000, port=9101, rate=None):
+    """Blast numbered /pose packets at an OSCClient and measure packets/s, CPU and order violations"""
+    received = []
+    last_receive = [0.0]
+    done = threading.Event()
+
+    def on_message(client, address, args):
+        received.append(args[0])
+        last_receive[0] = time.perf_counter()
+        if len(received) >= packets:
+            done.set()
+
+    client = OSCClient("bench", "127.0.0.1", port + 1, listen_port=port, logger=_quiet,
+                       on_message=on_message, dispatch=mode)
+    client.start()
+    time.sleep(0.2)
+
+    dgrams = [_pose_dgram(i) for i in range(packets)]
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+    interval = 1.0 / rate if rate else 0.0
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i, dgram in enumerate(dgrams):
+        sender.sendto(dgram, ("127.0.0.1", port))
+        if interval:
+            # Pace the sender so the comparison reflects a realistic streaming rate
+            ahead = wall_start + (i + 1) * interval - time.perf_counter()
+            if ahead > 0:
+                time.sleep(ahead)
+    done.wait(timeout=2.0)
+    cpu = time.process_time() - cpu_start
+    wall = (last_receive[0] or time.perf_counter()) - wall_start
+    client.stop()
+    sender.close()
+
+    seqs = list(received)
+    violations = sum(1 for a, b in zip(seqs, seqs[1:]) if b < a)
+    return {
+        "mode": mode,
+        "sent": packets,
+        "received": len(seqs),
+        "packets_per_s": len(seqs) / wall if wall else 0.0,
+        "cpu_s": cpu,
+        "order_violations": violations,
+    }
+
+def bench_router(routes=1000, lookups=200000, cache_size=4096):
+    """Dispatch cost with `routes` registered addresses (90% exact, 10% wildcard patterns) vs an if/elif chain"""
+    router = OSCRouter(logger=_quiet, cache_size=cache_size)
+    n_wild = routes // 10
+    exact = [f"/robot{i % 8}/control{i}" for i in range(routes - n_wild)]
+    for address in exact:
+        router.add_route(address, lambda address, args: address)
+    for j in range(n_wild):
+        router.add_route(f"/bank{j}/*/fader[0-9]", lambda address, args: address)
+
+    rng = random.Random(0)
+    exact_hits = [rng.choice(exact) for _ in range(lookups)]
+    wild_hits = [f"/bank{rng.randrange(n_wild)}/page{rng.randrange(4)}/fader{rng.randrange(10)}" for _ in range(lookups)]
+    misses = [f"/unknown/{rng.randrange(1000)}" for _ in range(lookups)]
+
+    def if_chain(address):
+        # What the hard-coded relay does: compare against every address in turn
+        for candidate in exact:
+            if address == candidate:
+                return candidate
+        return None
+
+    results = {}
+    for name, addresses, fn in (("exact", exact_hits, router.dispatch),
+                                ("wildcard", wild_hits, router.dispatch),
+                                ("miss", misses, router.dispatch),
+                                ("if/elif exact", exact_hits[:lookups // 100], lambda a, args: if_chain(a))):
+        start = time.perf_counter()
+        for address in addresses:
+            fn(address, ())
+        results[name] = (time.perf_counter() - start) / len(addresses) * 1e9
+    return results
+
+def _build_message(address, values):
+    # What SimpleUDPClient.send_message does for every call
+    builder = OscMessageBuilder(address=address)
+    for value in values:
+        builder.add_arg(value)
+    return builder.build().dgram
+
+def bench_encoder(messages=100000, port=9105):
+    """Encode and encode+send cost of the cached encoders vs the OscMessageBuilder path"""
+    pose = [512.25, -1000.0, 1850.5, 0.5, 0.5, 0.5, -0.5]
+    joints = [-90.0, -58.57, 54.13, 180.0, -4.43, -180.0]
+    workload = [("/robot/Filemona/pose", pose), ("/robot/Filemona/joints", joints),
+                ("/robot/Mortadela/pose", pose), ("/robot/Mortadela/joints", joints)]
+    cache = OSCEncoderCache()
+    for address, values in workload:
+        assert bytes(cache.encode(address, values)) == _build_message(address, values)
+
+    def run(fn):
+        start = time.perf_counter()
+        for i in range(messages):
+            address, values = workload[i & 3]
+            fn(address, values)
+        return (time.perf_counter() - start) / messages * 1e9
+
+    results = {
+        "build (OscMessageBuilder)": run(_build_message),
+        "encode (cached)": run(cache.encode),
+    }
+    simple = udp_client.SimpleUDPClient("127.0.0.1", port)
+    client = OSCClient("bench", "127.0.0.1", port, logger=_quiet)
+    results["send (SimpleUDPClient)"] = run(simple.send_message)
+    results["send (OSCClient cached)"] = run(lambda address, values: client.send_message(address, values, log=False))
+    client.stop()
+    return results
+
+def _slider_stream(rate, seconds, seed=1):
+    """
+    A Grasshopper /pose stream in simulated time: each third of the run is a still slider
+    (exact repeats), a still slider with float jitter (+-0.02 mm, tiny rotation noise),
+    then a slow sweep with a turn. Returns (t, true pose, sent args) per message.
+    """
+    rng = random.Random(seed)
+    stream = []
+    count = int(rate * seconds)
+    for i in range(count):
+        t = i / rate
+        phase = 3 * i // count
+        moving = max(0.0, t - 2 * seconds / 3)
+        angle = math.radians(10 * moving)
+        pose = (500.0 + 20 * moving, 100.0, 400.0, math.cos(angle / 2), 0.0, 0.0, math.sin(angle / 2))
+        if phase == 0:
+            args = pose
+        else:
+            noisy = [v + rng.uniform(-0.02, 0.02) for v in pose[:3]] + [v + rng.uniform(-1e-5, 1e-5) for v in pose[3:]]
+            args = tuple(noisy)
+        stream.append((t, pose, args))
+    return stream
+
+def bench_filter(rate=60.0, seconds=30.0):
+    """Messages passed on and the worst gap between the robot's last target and the true pose, per setting"""
+    stream = _slider_stream(rate, seconds)
+    settings = [
+        ("raw", None),
+        ("exact repeats", {"/pose": {}}),
+        ("0.1 mm / 0.05 deg", {"/pose": {"position": 0.1, "orientation": 0.05}}),
+        ("0.5 mm / 0.2 deg", {"/pose": {"position": 0.5, "orientation": 0.2}}),
+        ("0.5 mm, no keepalive", {"/pose": {"position": 0.5, "orientation": 0.2, "keepalive": 0}}),
+    ]
+    results = []
+    for label, streams in settings:
+        change_filter = ChangeFilter(streams) if streams else None
+        sent = 0
+        last = None
+        worst = 0.0
+        phases = [0, 0, 0]
+        start = time.perf_counter()
+        for i, (t, pose, args) in enumerate(stream):
+            if change_filter is None or change_filter.accept("/pose", args, t):
+                sent += 1
+                phases[3 * i // len(stream)] += 1
+                last = args
+            worst = max(worst, math.dist(last[:3], pose[:3]))
+        elapsed = time.perf_counter() - start
+        results.append({"setting": label, "received": len(stream), "sent": sent, "phases": phases,
+                        "suppressed": 1 - sent / len(stream), "worst_mm": worst, "ns": elapsed / len(stream) * 1e9})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="OSC benchmarks")
+    parser.add_argument("bench", choices=["dispatch", "router", "encoder", "filter"])
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=None, help="Sender rate in packets/s (default: as fast as possible)")
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.bench == "dispatch":
+        print(f"{'mode':<10} {'sent':>7} {'recv':>7} {'pkts/s':>10} {'cpu s':>7} {'order viol':>10}")
+        for i, mode in enumerate(DISPATCH_MODES):
+            r = bench_dispatch(mode, packets=args.packets, port=args.port + 2 * i, rate=args.rate)
+            print(f"{r['mode']:<10} {r['sent']:>7} {r['received']:>7} {r['packets_per_s']:>10.0f} {r['cpu_s']:>7.2f} {r['order_violations']:>10}")
+    elif args.bench == "router":
+        for label, cache_size in (("cached", 4096), ("uncached", 0)):
+            results = bench_router(routes=args.routes, cache_size=cache_size)
+            print(f"{args.routes} routes ({label}): " + ", ".join(f"{name} {ns:.0f} ns" for name, ns in results.items()))
+    elif args.bench == "encoder":
+        for name, ns in bench_encoder(messages=args.messages).items():
+            print(f"{name:<26} {ns:>8.0f} ns/msg")
+    elif args.bench == "filter":
+        print(f"{'setting':<22} {'in':>6} {'out':>6} {'still/jitter/moving':>20} {'suppressed':>10} {'worst mm':>9} {'ns/msg':>7}")
+        for r in bench_filter(rate=args.rate or 60.0, seconds=args.seconds):
+            phases = "/".join(str(n) for n in r["phases"])
+            print(f"{r['setting']:<22} {r['received']:>6} {r['sent']:>6} {phases:>20} {r['suppressed']:>10.1%} "
+                  f"{r['worst_mm']:>9.3f} {r['ns']:>7.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import math
+import threading
+
+# Stream layouts, picked from the keys of a stream's settings
+POSE = "pose"      # x y z (mm) q1..q4: "position" (mm) and "orientation" (degrees) deadbands
+JOINTS = "joints"  # j1..j6 (degrees), any extra args compared exactly: "joints" deadband
+VALUES = "values"  # Any numeric args: "values" deadband on each
+
+class _Stream:
+    __slots__ = ("layout", "position", "orientation", "joints", "values", "keepalive", "sent_args", "sent_time",
+                 "received", "sent", "keepalives")
+
+    def __init__(self, layout, position, orientation, joints, values, keepalive):
+        self.layout = layout
+        self.position = position
+        self.orientation = orientation
+        self.joints = joints
+        self.values = values
+        self.keepalive = keepalive
+        self.sent_args = None
+        self.sent_time = 0.0
+        self.received = 0
+        self.sent = 0
+        self.keepalives = 0
+
+    def changed(self, last, args):
+        """True if args moved past the deadband from the last value passed on"""
+        if len(last) != len(args):
+            return True
+        try:
+            if self.layout == POSE and len(args) == 7:
+                if math.dist(last[:3], args[:3]) > self.position:
+                    return True
+                dot = sum(a * b for a, b in zip(last[3:], args[3:]))
+                norms = math.sqrt(sum(a * a for a in last[3:]) * sum(b * b for b in args[3:]))
+                return math.degrees(2 * math.acos(min(1.0, abs(dot) / norms))) > self.orientation if norms else True
+            if self.layout == JOINTS and len(args) >= 6:
+                return any(abs(a - b) > self.joints for a, b in zip(last[:6], args[:6])) or last[6:] != args[6:]
+            return any(abs(a - b) > self.values for a, b in zip(last, args))
+        except TypeError:
+            # Strings, blobs or a mix: only an exact repeat counts as unchanged
+            return True
+
+class ChangeFilter:
+    """
+    Drops incoming OSC messages that repeat the last value passed on, per address.
+
+    streams maps an address to its deadbands: {"position": mm, "orientation": degrees}
+    for /pose-style args, {"joints": degrees} for /joints-style args, or {"values": x}
+    for any numeric args. A message passes when it moved more than the deadband from
+    the last message passed on (not the last received, so slow drift still gets
+    through), or when `keepalive` seconds have gone by since then, so a held value
+    is refreshed now and then. Addresses not listed (/home, cues) always pass.
+    """
+
+    def __init__(self, streams, keepalive=1.0):
+        self.keepalive = keepalive
+        self.streams = {address: self._stream(dict(settings)) for address, settings in streams.items()}
+        self.lock = threading.Lock()  # Threading dispatch calls accept() from several threads
+
+    def _stream(self, settings):
+        keepalive = settings.pop("keepalive", self.keepalive)
+        if "joints" in settings:
+            layout = JOINTS
+        elif "position" in settings or "orientation" in settings:
+            layout = POSE
+        else:
+            layout = VALUES
+        stream = _Stream(layout, settings.pop("position", 0.0), settings.pop("orientation", 0.0),
+                         settings.pop("joints", 0.0), settings.pop("values", 0.0), keepalive)
+        if settings:
+            raise ValueError(f"Unknown change filter settings {sorted(settings)} "
+                             "(expected position, orientation, joints, values or keepalive)")
+        return stream
+
+    def accept(self, address, args, now):
+        """True if the message should be passed on"""
+        stream = self.streams.get(address)
+        if stream is None:
+            return True
+        with self.lock:
+            stream.received += 1
+            last = stream.sent_args
+            if last is None or (args != last and stream.changed(last, args)):
+                pass
+            elif stream.keepalive and now - stream.sent_time >= stream.keepalive:
+                stream.keepalives += 1
+            else:
+                return False
+            stream.sent_args = args
+            stream.sent_time = now
+            stream.sent += 1
+            return True
+
+    def stats(self):
+        """{address: (received, sent, keepalives, fraction suppressed)}"""
+        return {address: (s.received, s.sent, s.keepalives, 1.0 - s.sent / s.received if s.received else 0.0)
+                for address, s in self.streams.items()}
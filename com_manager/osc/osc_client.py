@@ -1,22 +1,100 @@
-from pythonosc import udp_client, dispatcher, osc_server
+from pythonosc import dispatcher, osc_server, osc_bundle, osc_message
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.parsing import osc_types
+from .osc_scheduler import OSCScheduler
+from .osc_encoder import OSCEncoderCache
+from .osc_slip import SLIPTransport
+from .osc_change_filter import ChangeFilter
+import select
+import socket
 import threading
 import time
 
+# Dispatch modes for incoming OSC:
+#   "threading" - pythonosc ThreadingOSCUDPServer, one thread per packet (no ordering guarantee)
+#   "batched"   - one socket and one reader thread that drains every waiting datagram per
+#                 wakeup and calls on_message in arrival order. Bundles are delivered whole to
+#                 on_bundle, and bundles with a future timetag are held until that time.
+# Without a dispatch mode, a client with on_bundle is batched (threading splits bundles up).
+DISPATCH_MODES = ("threading", "batched")
+
+# Transports:
+#   "udp" - datagrams to send_host:send_port, received on listen_port
+#   "tcp" - OSC 1.1 SLIP-framed stream over one persistent connection to send_host:send_port,
+#           plus incoming connections on listen_port. Nothing is lost silently, so use it for
+#           one-shot cues (/home, /PosA) and keep high-rate streams on UDP.
+TRANSPORTS = ("udp", "tcp")
+
 class OSCClient:
-    def __init__(self, client_id: str, send_host: str, send_port: int, listen_port: int = None, logger=None, on_message=None):
+    def __init__(self, client_id: str, send_host: str, send_port: int, listen_port: int = None, logger=None, on_message=None,
+                 dispatch: str = None, max_batch: int = 256, on_bundle=None, transport: str = "udp", change_filter=None):
         self.client_id = client_id
         self.send_host = send_host
         self.send_port = send_port
         self.listen_port = listen_port
         self.logger = logger or print
-        self.osc_client = udp_client.SimpleUDPClient(self.send_host, self.send_port)
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown OSC transport '{transport}' (expected one of {TRANSPORTS})")
+        self.transport = transport
+        # Fast path for fixed-shape numeric messages: pre-encoded address/type tags
+        self.encoders = OSCEncoderCache()
+        self.send_lock = threading.Lock()
+        if transport == "tcp":
+            self.send_sock = None
+            self.slip = SLIPTransport(client_id, send_host, send_port, listen_port=listen_port,
+                                      on_packet=self._handle_datagram, logger=self.logger)
+        else:
+            self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.slip = None
         self.server = None
         self.server_thread = None
         self.running = False
         self.on_message = on_message
+        self.on_bundle = on_bundle
+        if dispatch is None:
+            dispatch = "batched" if on_bundle else "threading"
+        if dispatch not in DISPATCH_MODES:
+            raise ValueError(f"Unknown OSC dispatch mode '{dispatch}' (expected one of {DISPATCH_MODES})")
+        if dispatch == "threading" and on_bundle and transport == "udp" and listen_port:
+            self.logger(f"[OSC:{client_id}] on_bundle is never called with dispatch \"threading\": "
+                        "bundles arrive as separate, unordered messages. Use dispatch \"batched\".")
+        self.dispatch = dispatch
+        self.max_batch = max_batch
+        self.sock = None
+        self.scheduler = None
+        self.packets_received = 0
+        self.bundles_received = 0
+        self.parse_errors = 0
+        # change_filter: {address: deadbands} (see osc_change_filter.py), optionally with "keepalive"; None passes everything
+        if change_filter is not None:
+            change_filter = dict(change_filter)
+            keepalive = change_filter.pop("keepalive", 1.0)
+            self.change_filter = ChangeFilter(change_filter, keepalive=keepalive)
+        else:
+            self.change_filter = None
     
     def start(self):
-        if self.listen_port:
+        if self.slip:
+            # Each TCP connection has a single reader, so messages arrive in order as in batched mode
+            self.scheduler = OSCScheduler(logger=self.logger)
+            self.scheduler.start()
+            self.running = True
+            self.slip.start()
+            self.logger(f"[OSC:{self.client_id}] OSC over TCP to {self.send_host}:{self.send_port}"
+                        + (f", listening on port {self.listen_port}" if self.listen_port else ""))
+        elif self.listen_port and self.dispatch == "batched":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Room for a full burst while the reader is busy calling on_message
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self.sock.bind(("0.0.0.0", self.listen_port))
+            self.sock.setblocking(False)
+            self.scheduler = OSCScheduler(logger=self.logger)
+            self.scheduler.start()
+            self.running = True
+            self.server_thread = threading.Thread(target=self._run_batched, daemon=True)
+            self.server_thread.start()
+            self.logger(f"[OSC:{self.client_id}] Listening for OSC on port {self.listen_port} (batched)")
+        elif self.listen_port:
             disp = dispatcher.Dispatcher()
             disp.set_default_handler(self._osc_handler)
             self.server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", self.listen_port), disp)
@@ -35,29 +113,148 @@ class OSCClient:
                 self.logger(f"[OSC:{self.client_id}] Server error: {e}")
                 break
     
+    def _run_batched(self):
+        sock = self.sock
+        while self.running:
+            try:
+                ready, _, _ = select.select([sock], [], [], 0.5)
+            except (OSError, ValueError):
+                break  # Socket closed by stop()
+            if not ready:
+                continue
+            # Drain everything already queued on the socket before parsing,
+            # so a burst costs one wakeup instead of one per datagram
+            batch = []
+            error = None
+            try:
+                for _ in range(self.max_batch):
+                    batch.append(sock.recv(65535))
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                error = e
+            # Datagrams read before an error are still delivered
+            for dgram in batch:
+                try:
+                    self._handle_datagram(dgram)
+                except Exception as e:
+                    self.logger(f"[OSC:{self.client_id}] Error handling packet: {e}")
+            if error is not None:
+                if self.running:
+                    self.logger(f"[OSC:{self.client_id}] Server error: {error}")
+                break
+
+    def _handle_datagram(self, dgram):
+        self.packets_received += 1
+        try:
+            if osc_bundle.OscBundle.dgram_is_bundle(dgram):
+                packet = osc_bundle.OscBundle(dgram)
+            else:
+                packet = osc_message.OscMessage(dgram)
+        except (osc_bundle.ParseError, osc_message.ParseError) as e:
+            self.parse_errors += 1
+            self.logger(f"[OSC:{self.client_id}] Dropped malformed packet: {e}")
+            return
+        if isinstance(packet, osc_bundle.OscBundle):
+            self._handle_bundle(packet)
+        else:
+            self._osc_handler(packet.address, *packet.params)
+
+    def _handle_bundle(self, bundle):
+        # The messages directly inside a bundle form one event; nested bundles
+        # carry their own timetag and become their own events
+        messages = []
+        for content in bundle:
+            if isinstance(content, osc_bundle.OscBundle):
+                self._handle_bundle(content)
+            else:
+                messages.append((content.address, tuple(content.params)))
+        if not messages:
+            return
+        timetag = bundle.timestamp
+        if timetag != osc_types.IMMEDIATELY and timetag > time.time():
+            self.scheduler.schedule(timetag, self._bundle_handler, timetag, messages)
+        else:
+            self._bundle_handler(timetag, messages)
+
+    def _bundle_handler(self, timetag, messages):
+        self.bundles_received += 1
+        if self.change_filter:
+            # Bundled streams get the same deadband as single messages
+            now = time.perf_counter()
+            messages = [(address, args) for address, args in messages if self.change_filter.accept(address, args, now)]
+            if not messages:
+                return
+        self.logger(f"[OSC:{self.client_id}] Received bundle: {[address for address, _ in messages]}")
+        if self.on_bundle:
+            self.on_bundle(self, timetag, messages)
+        else:
+            for address, args in messages:
+                self._deliver(address, args)
+
     def _osc_handler(self, address, *args):
+        if self.change_filter and not self.change_filter.accept(address, args, time.perf_counter()):
+            return
+        self._deliver(address, args)
+
+    def _deliver(self, address, args):
         self.logger(f"[OSC:{self.client_id}] Received: {address} {args}")
         if self.on_message:
             self.on_message(self, address, args)
     
-    def send_message(self, address: str = '/test', value=None):
+    def send_message(self, address: str = '/test', value=None, log: bool = True):
         try:
-            if value is not None:
-                self.osc_client.send_message(address, value)
-                self.logger(f"[OSC:{self.client_id}] Sent: {address} {value}")
+            if value is None:
+                values = []
+            elif isinstance(value, (list, tuple)):
+                values = value
             else:
-                self.osc_client.send_message(address, [])
-                self.logger(f"[OSC:{self.client_id}] Sent: {address} []")
+                values = [value]
+            with self.send_lock:
+                dgram = self.encoders.encode(address, values)
+                if dgram is None:
+                    builder = OscMessageBuilder(address=address)
+                    for v in values:
+                        builder.add_arg(v)
+                    dgram = builder.build().dgram
+                self._send_dgram(dgram)
+            if log:
+                self.logger(f"[OSC:{self.client_id}] Sent: {address} {value if value is not None else []}")
             return True
         except Exception as e:
             self.logger(f"[OSC:{self.client_id}] Failed to send message: {e}")
             return False
     
+    def stats(self):
+        return {
+            "packets": self.packets_received,
+            "bundles": self.bundles_received,
+            "parse_errors": self.parse_errors,
+            "scheduler_dropped": self.scheduler.dropped if self.scheduler else 0,
+            "change_filter": self.change_filter.stats() if self.change_filter else {},
+        }
+
+    def _send_dgram(self, dgram):
+        if self.slip:
+            self.slip.send(dgram)
+        else:
+            self.send_sock.sendto(dgram, (self.send_host, self.send_port))
+
     def stop(self):
         self.running = False
         if self.server:
             self.server.server_close()
             self.server = None
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+        if self.slip:
+            self.slip.stop()
+        if self.send_sock:
+            self.send_sock.close()
         self.logger(f"[OSC:{self.client_id}] Stopped.")
 
 # Note: Requires python-osc. Install with: pip install python-osc 
\ No newline at end of file
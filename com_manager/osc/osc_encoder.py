@@ -0,0 +1,87 @@
+import struct
+import threading
+
+# OSC type tag -> struct format for fixed-size argument types
+_TAG_FORMATS = {"i": "i", "h": "q", "f": "f", "d": "d"}
+
+# Python type -> OSC type tag, matching what pythonosc's OscMessageBuilder infers
+_TAG_BY_TYPE = {int: "i", float: "f"}
+
+def osc_string(value: str) -> bytes:
+    """Null-terminate and pad to a multiple of 4 bytes"""
+    data = value.encode("utf-8") + b"\x00"
+    return data + b"\x00" * (-len(data) % 4)
+
+class OSCMessageEncoder:
+    """
+    Encoder for one fixed-shape OSC message: the padded address and type-tag
+    string are encoded once, and each call only packs the arguments into a
+    reusable buffer with struct.pack_into. Not thread-safe on its own; the
+    returned buffer is overwritten by the next encode().
+    """
+
+    __slots__ = ("address", "typetags", "header_len", "packer", "buffer")
+
+    def __init__(self, address: str, typetags: str):
+        fmt = []
+        for tag in typetags:
+            if tag not in _TAG_FORMATS:
+                raise ValueError(f"Unsupported OSC type tag '{tag}' for a fixed-shape encoder")
+            fmt.append(_TAG_FORMATS[tag])
+        header = osc_string(address) + osc_string("," + typetags)
+        self.address = address
+        self.typetags = typetags
+        self.header_len = len(header)
+        self.packer = struct.Struct(">" + "".join(fmt))
+        self.buffer = bytearray(self.header_len + self.packer.size)
+        self.buffer[:self.header_len] = header
+
+    def encode(self, values):
+        self.packer.pack_into(self.buffer, self.header_len, *values)
+        return self.buffer
+
+class OSCEncoderCache:
+    """Encoders keyed by (address, type signature), built on first use"""
+
+    def __init__(self, max_encoders=1024):
+        self.max_encoders = max_encoders
+        self.encoders = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def signature(self, values):
+        # None if any value has no fixed-size OSC type (strings, blobs, bools, ...)
+        try:
+            return "".join([_TAG_BY_TYPE[type(v)] for v in values])
+        except KeyError:
+            return None
+
+    def get(self, address, typetags):
+        key = (address, typetags)
+        encoder = self.encoders.get(key)
+        if encoder is not None:
+            self.hits += 1
+            return encoder
+        self.misses += 1
+        encoder = OSCMessageEncoder(address, typetags)
+        with self.lock:
+            if len(self.encoders) >= self.max_encoders:
+                self.encoders.clear()
+            self.encoders[key] = encoder
+        return encoder
+
+    def encode(self, address, values):
+        """
+        Encoded datagram for address + values, or None if the values need the
+        generic OscMessageBuilder path (non-numeric args, ints beyond 32 bits).
+        The result is the encoder's shared buffer: send it before the next encode
+        of the same address and signature.
+        """
+        typetags = self.signature(values)
+        if typetags is None:
+            return None
+        try:
+            return self.get(address, typetags).encode(values)
+        except struct.error:
+            return None
@@ -0,0 +1,72 @@
+import threading
+import time
+
+class FeedbackPublisher:
+    """
+    Publishes the latest robot state to OSC at a fixed rate:
+        /robot/<name>/pose    x y z qw qx qy qz
+        /robot/<name>/joints  j1 j2 j3 j4 j5 j6
+    Only values that changed since the last tick are sent, so the output
+    rate is bounded by rate_hz no matter how often the controllers report.
+    """
+
+    def __init__(self, state_store, osc_manager, rate_hz=30.0, osc_client_ids=None, logger=None):
+        self.state_store = state_store
+        self.osc_manager = osc_manager
+        self.rate_hz = rate_hz
+        self.osc_client_ids = osc_client_ids  # None means broadcast to every OSC client
+        self.logger = logger or print
+        self.running = False
+        self.thread = None
+        self.sent_versions = {}  # client_id -> (pose_version, joints_version)
+        self.messages_sent = 0
+        self.ticks = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.logger(f"[Feedback] Publishing robot state at {self.rate_hz} Hz")
+
+    def _send(self, address, values):
+        if self.osc_client_ids is None:
+            self.osc_manager.broadcast_message(address, values, log=False)
+        else:
+            for osc_client_id in self.osc_client_ids:
+                self.osc_manager.send_message(osc_client_id, address, values, log=False)
+        self.messages_sent += 1
+
+    def publish(self):
+        for client_id, pose_version, pose, joints_version, joints in self.state_store.snapshot():
+            sent_pose, sent_joints = self.sent_versions.get(client_id, (0, 0))
+            if pose is not None and pose_version != sent_pose:
+                self._send(f"/robot/{client_id}/pose", pose)
+            if joints is not None and joints_version != sent_joints:
+                self._send(f"/robot/{client_id}/joints", joints)
+            self.sent_versions[client_id] = (pose_version, joints_version)
+        self.ticks += 1
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while self.running:
+            try:
+                self.publish()
+            except Exception as e:
+                self.logger(f"[Feedback] Publish error: {e}")
+            # Absolute deadlines so the rate does not drift with publish time
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stats(self):
+        reports = sum(s.reports for s in self.state_store.states.values())
+        return {"reports": reports, "messages_sent": self.messages_sent, "ticks": self.ticks}
+
+    def stop(self):
+        self.running = False
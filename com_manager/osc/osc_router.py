@@ -0,0 +1,270 @@
+import json
+import os
+import re
+import threading
+import time
+
+# OSC 1.0 address pattern characters
+_WILDCARD_RE = re.compile(r"[*?\[\]{}]")
+
+def is_pattern(address):
+    return _WILDCARD_RE.search(address) is not None
+
+def compile_segment(segment):
+    """
+    Translate one OSC address-pattern segment (between slashes) into a compiled regex.
+    An unclosed "[" or "{" matches itself; an invalid range like "[z-a]" raises ValueError.
+    """
+    out = []
+    i = 0
+    while i < len(segment):
+        c = segment[i]
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and segment.find("]", i + 1) != -1:
+            end = segment.index("]", i + 1)
+            body = segment[i + 1:end]
+            negate = body.startswith("!")
+            if negate:
+                body = body[1:]
+            # Keep "-" ranges, escape everything else
+            body = "".join(ch if ch == "-" else re.escape(ch) for ch in body)
+            out.append(f"[{'^' if negate else ''}{body}]")
+            i = end
+        elif c == "{" and segment.find("}", i + 1) != -1:
+            end = segment.index("}", i + 1)
+            options = segment[i + 1:end].split(",")
+            out.append("(?:" + "|".join(re.escape(o) for o in options) + ")")
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    try:
+        return re.compile("".join(out) + r"\Z")
+    except re.error as e:
+        raise ValueError(f"Invalid OSC address pattern segment '{segment}': {e}") from None
+
+class Route:
+    __slots__ = ("pattern", "handler", "targets", "source")
+
+    def __init__(self, pattern, handler, targets=None, source=None):
+        self.pattern = pattern
+        self.handler = handler
+        self.targets = targets  # Robot ids to send to, None means all
+        self.source = source    # Mapping file the route came from, None if registered in code
+
+    def __repr__(self):
+        return f"Route({self.pattern!r}, targets={self.targets})"
+
+class _Node:
+    __slots__ = ("literal", "wild", "routes")
+
+    def __init__(self):
+        self.literal = {}  # segment -> _Node
+        self.wild = []     # [(compiled regex, _Node)]
+        self.routes = []
+
+def command_handler(template):
+    """Handler that formats OSC args into a RAPID command, e.g. "pose/[[{0},{1},{2}],[{3},{4},{5},{6}]];" """
+    def handler(address, args):
+        return template.format(*args, address=address)
+    return handler
+
+class OSCRouter:
+    """
+    Routing table for incoming OSC addresses.
+
+    Routes are registered per OSC address pattern and compiled into an
+    exact-match dict plus a per-segment trie for wildcard patterns. Lookups
+    never take a lock: every change builds a new table and swaps it in, so
+    the mapping file can be reloaded while clients stay connected.
+    """
+
+    def __init__(self, logger=None, cache_size=4096):
+        self.logger = logger or print
+        self.cache_size = cache_size  # Addresses whose matches are memoized until the next change
+        self.lock = threading.Lock()  # Serializes writers only
+        self.code_routes = []
+        self.file_routes = []
+        self.mapping_path = None
+        self.mapping_mtime = None
+        self.watch_thread = None
+        self.watching = False
+        self._exact = {}
+        self._trie = _Node()
+        self._wild_depths = frozenset()
+        self._cache = {}
+
+    def add_route(self, pattern, handler, targets=None):
+        """Register a route; raises ValueError for an invalid pattern and leaves the table unchanged"""
+        with self.lock:
+            code_routes = self.code_routes + [Route(pattern, handler, targets)]
+            self._install(self._compile(code_routes, self.file_routes))
+            self.code_routes = code_routes
+
+    def remove_route(self, pattern):
+        with self.lock:
+            before = len(self.code_routes)
+            code_routes = [r for r in self.code_routes if r.pattern != pattern]
+            self._install(self._compile(code_routes, self.file_routes))
+            self.code_routes = code_routes
+            return len(self.code_routes) != before
+
+    def _compile(self, code_routes, file_routes):
+        """Build a new table from the routes; raises ValueError on an invalid pattern"""
+        exact = {}
+        trie = _Node()
+        wild_depths = set()
+        for route in code_routes + file_routes:
+            if not is_pattern(route.pattern):
+                exact.setdefault(route.pattern, []).append(route)
+                continue
+            node = trie
+            segments = route.pattern.strip("/").split("/")
+            wild_depths.add(len(segments))
+            for segment in segments:
+                if is_pattern(segment):
+                    regex = compile_segment(segment)
+                    for existing, child in node.wild:
+                        if existing.pattern == regex.pattern:
+                            break
+                    else:
+                        child = _Node()
+                        node.wild.append((regex, child))
+                else:
+                    child = node.literal.get(segment)
+                    if child is None:
+                        child = node.literal[segment] = _Node()
+                node = child
+            node.routes.append(route)
+        return {k: tuple(v) for k, v in exact.items()}, trie, frozenset(wild_depths)
+
+    def _install(self, table):
+        # Readers pick up the new table in one reference swap each
+        self._exact, self._trie, self._wild_depths = table
+        self._cache = {}
+
+    def match(self, address):
+        """Return the routes whose pattern matches address, exact routes first"""
+        cache = self._cache
+        routes = cache.get(address)
+        if routes is not None:
+            return routes
+        if is_pattern(address):
+            # OSC 1.0 style: the sender's address is the pattern, matched against registered addresses
+            try:
+                routes = self._match_incoming_pattern(address)
+            except ValueError as e:
+                self.logger(f"[OSC] Ignoring {address}: {e}")
+                routes = ()
+            self._remember(cache, address, routes)
+            return routes
+        routes = self._exact.get(address, ())
+        # Only walk the trie if some wildcard route has as many segments as the address
+        if address.count("/") in self._wild_depths:
+            wild = []
+            self._walk(self._trie, address.strip("/").split("/"), 0, wild)
+            if wild:
+                routes = routes + tuple(wild)
+        self._remember(cache, address, routes)
+        return routes
+
+    def _remember(self, cache, address, routes):
+        if not self.cache_size:
+            return
+        if len(cache) >= self.cache_size:
+            cache.clear()  # Crude, but keeps the cache bounded without per-lookup bookkeeping
+        cache[address] = routes
+
+    def _match_incoming_pattern(self, pattern):
+        regexes = [compile_segment(s) for s in pattern.strip("/").split("/")]
+        routes = []
+        for address, exact_routes in self._exact.items():
+            segments = address.strip("/").split("/")
+            if len(segments) == len(regexes) and all(rx.match(s) for rx, s in zip(regexes, segments)):
+                routes.extend(exact_routes)
+        return tuple(routes)
+
+    def _walk(self, node, segments, depth, out):
+        if depth == len(segments):
+            out.extend(node.routes)
+            return
+        segment = segments[depth]
+        child = node.literal.get(segment)
+        if child is not None:
+            self._walk(child, segments, depth + 1, out)
+        for regex, child in node.wild:
+            if regex.match(segment):
+                self._walk(child, segments, depth + 1, out)
+
+    def dispatch(self, address, args):
+        """Call every matching handler and return [(route, result)] for handlers that returned something"""
+        results = []
+        for route in self.match(address):
+            try:
+                result = route.handler(address, args)
+            except (IndexError, KeyError, ValueError) as e:
+                self.logger(f"[OSC] Route {route.pattern} failed for {address} {args}: {e}")
+                continue
+            if result is not None:
+                results.append((route, result))
+        return results
+
+    def load_mapping(self, path):
+        """
+        Load routes from a JSON mapping file:
+            {"routes": [{"address": "/pose", "command": "pose/[[{0},{1},{2}],[{3},{4},{5},{6}]];", "targets": ["Filemona"]}]}
+        On error the previous routes are kept.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path) as f:
+                mapping = json.load(f)
+            routes = []
+            for entry in mapping.get("routes", []):
+                routes.append(Route(entry["address"], command_handler(entry["command"]),
+                                    targets=entry.get("targets"), source=path))
+            with self.lock:
+                table = self._compile(self.code_routes, routes)
+                self._install(table)
+                self.file_routes = routes
+                self.mapping_path = path
+                self.mapping_mtime = mtime
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger(f"[OSC] Failed to load mapping {path}: {e}")
+            return False
+        self.logger(f"[OSC] Loaded {len(routes)} routes from {path}")
+        return True
+
+    def reload_if_changed(self):
+        if not self.mapping_path:
+            return False
+        try:
+            mtime = os.stat(self.mapping_path).st_mtime
+        except OSError:
+            return False
+        if mtime == self.mapping_mtime:
+            return False
+        return self.load_mapping(self.mapping_path)
+
+    def watch(self, interval=1.0):
+        """Poll the mapping file and hot-reload it when it changes"""
+        if self.watching:
+            return
+        self.watching = True
+
+        def run():
+            while self.watching:
+                time.sleep(interval)
+                self.reload_if_changed()
+
+        self.watch_thread = threading.Thread(target=run, daemon=True)
+        self.watch_thread.start()
+
+    def stop(self):
+        self.watching = False
+
+    def list_routes(self):
+        return list(self.code_routes + self.file_routes)
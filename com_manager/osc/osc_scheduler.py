@@ -0,0 +1,89 @@
+import heapq
+import itertools
+import threading
+import time
+
+class OSCScheduler:
+    """
+    Releases callbacks at their OSC timetag (system time in seconds since the epoch).
+
+    At most max_pending callbacks are held. When full, the one due last (the new
+    one or a held one) is dropped, so a flood of far-future timetags cannot grow
+    the queue without limit or push out callbacks that are due soon.
+    """
+
+    def __init__(self, logger=None, max_pending=4096):
+        self.logger = logger or print
+        self.max_pending = max_pending
+        self.queue = []  # heap of (when, seq, callback, args)
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.released = 0
+        self.dropped = 0
+        self.full = False  # Logged once per run of drops
+        self.max_lateness = 0.0
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def schedule(self, when, callback, *args):
+        """Hold callback(*args) until `when`; returns False if it was dropped because the queue is full"""
+        entry = (when, next(self.seq), callback, args)
+        with self.cond:
+            if len(self.queue) >= self.max_pending:
+                self.dropped += 1
+                if not self.full:
+                    self.full = True
+                    self.logger(f"[OSC] Scheduler full ({self.max_pending} pending), dropping the latest timetags")
+                last = max(range(len(self.queue)), key=self.queue.__getitem__)
+                if entry > self.queue[last]:
+                    return False
+                self.queue[last] = entry
+                heapq.heapify(self.queue)
+            else:
+                self.full = False
+                heapq.heappush(self.queue, entry)
+            # Only wake the worker if the new entry is now the earliest deadline
+            if self.queue[0][0] == when:
+                self.cond.notify()
+        return True
+
+    def pending(self):
+        with self.cond:
+            return len(self.queue)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running:
+                    if not self.queue:
+                        self.cond.wait()
+                        continue
+                    delay = self.queue[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self.cond.wait(delay)
+                if not self.running:
+                    return
+                when, _, callback, args = heapq.heappop(self.queue)
+            lateness = time.time() - when
+            self.released += 1
+            if lateness > self.max_lateness:
+                self.max_lateness = lateness
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger(f"[OSC] Scheduled callback error: {e}")
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.queue.clear()
+            self.cond.notify()
@@ -0,0 +1,218 @@
+import collections
+import socket
+import threading
+
+# OSC 1.1 stream framing (RFC 1055 SLIP, double-END variant)
+END = 0xC0
+ESC = 0xDB
+ESC_END = 0xDC
+ESC_ESC = 0xDD
+
+_END_BYTE = bytes([END])
+
+def slip_encode(packet) -> bytes:
+    data = bytes(packet)
+    if END in data or ESC in data:
+        data = data.replace(bytes([ESC]), bytes([ESC, ESC_ESC])).replace(_END_BYTE, bytes([ESC, ESC_END]))
+    return _END_BYTE + data + _END_BYTE
+
+class SLIPDecoder:
+    """Streaming SLIP decoder: feed() arbitrary chunks, get back the complete packets"""
+
+    def __init__(self, max_packet=65536):
+        self.max_packet = max_packet
+        self.buffer = bytearray()
+        self.escaped = False
+        self.overflows = 0
+
+    def feed(self, chunk):
+        packets = []
+        buffer = self.buffer
+        start = 0
+        n = len(chunk)
+        while start < n:
+            end = chunk.find(_END_BYTE, start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if piece:
+                self._append(piece)
+            if end < 0:
+                break
+            # END closes the current packet; back-to-back ENDs delimit nothing
+            if buffer:
+                packets.append(bytes(buffer))
+                buffer.clear()
+            self.escaped = False
+            start = end + 1
+        return packets
+
+    def _append(self, piece):
+        buffer = self.buffer
+        if ESC not in piece and not self.escaped:
+            buffer += piece
+        else:
+            for byte in piece:
+                if self.escaped:
+                    buffer.append(END if byte == ESC_END else ESC if byte == ESC_ESC else byte)
+                    self.escaped = False
+                elif byte == ESC:
+                    self.escaped = True
+                else:
+                    buffer.append(byte)
+        if len(buffer) > self.max_packet:
+            # Lost framing: drop what we have and resync on the next END
+            self.overflows += 1
+            buffer.clear()
+
+class SLIPTransport:
+    """
+    OSC over TCP with SLIP framing.
+
+    Keeps one persistent outbound connection to host:port (reconnecting as
+    needed) and writes every frame queued since the last write in a single
+    sendall(). Frames sent while disconnected stay queued until the
+    connection is back. Packets received on the outbound connection, or on
+    connections accepted on listen_port, are passed to on_packet(dgram).
+    """
+
+    def __init__(self, client_id, host, port, listen_port=None, on_packet=None, logger=None,
+                 max_queue=10000, reconnect_interval=1.0):
+        self.client_id = client_id
+        self.host = host
+        self.port = port
+        self.listen_port = listen_port
+        self.on_packet = on_packet
+        self.logger = logger or print
+        self.max_queue = max_queue
+        self.reconnect_interval = reconnect_interval
+        self.queue = collections.deque()
+        self.cond = threading.Condition()
+        self.sock = None
+        self.server_sock = None
+        self.server_conns = []
+        self.connected = False
+        self.running = False
+        self.frames_sent = 0
+        self.writes = 0
+        self.dropped = 0
+
+    def start(self):
+        self.running = True
+        self._spawn(self._run_writer)
+        if self.listen_port:
+            self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server_sock.bind(("0.0.0.0", self.listen_port))
+            self.server_sock.listen()
+            self._spawn(self._run_server)
+
+    def _spawn(self, target, *args):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    def send(self, dgram):
+        frame = slip_encode(dgram)
+        with self.cond:
+            if len(self.queue) >= self.max_queue:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append(frame)
+            self.cond.notify()
+
+    def _connect(self):
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.reconnect_interval)
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            self.logger(f"[OSC:{self.client_id}] TCP connect to {self.host}:{self.port} failed: {e}")
+            return False
+        self.sock = sock
+        self.connected = True
+        self.logger(f"[OSC:{self.client_id}] TCP connected to {self.host}:{self.port}")
+        self._spawn(self._run_reader, sock)
+        return True
+
+    def _disconnect(self):
+        self.connected = False
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def _run_writer(self):
+        while self.running:
+            if not self.connected and not self._connect():
+                with self.cond:
+                    self.cond.wait(self.reconnect_interval)
+                continue
+            with self.cond:
+                while self.running and self.connected and not self.queue:
+                    self.cond.wait(0.5)
+                frames = list(self.queue)
+                self.queue.clear()
+            if not frames:
+                continue
+            try:
+                self.sock.sendall(b"".join(frames))
+                self.frames_sent += len(frames)
+                self.writes += 1
+            except (OSError, AttributeError) as e:
+                # Put the batch back in front of anything queued since; it is resent after reconnecting
+                with self.cond:
+                    self.queue.extendleft(reversed(frames))
+                if self.running:
+                    self.logger(f"[OSC:{self.client_id}] TCP send failed: {e}. Reconnecting...")
+                self._disconnect()
+
+    def _run_reader(self, sock):
+        decoder = SLIPDecoder()
+        while self.running:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            for packet in decoder.feed(data):
+                if self.on_packet:
+                    try:
+                        self.on_packet(packet)
+                    except Exception as e:
+                        self.logger(f"[OSC:{self.client_id}] Error handling packet: {e}")
+        if sock is self.sock:
+            self._disconnect()
+            with self.cond:
+                self.cond.notify()
+        elif sock in self.server_conns:
+            # An accepted connection that ended (peer closed or reconnected)
+            try:
+                self.server_conns.remove(sock)
+            except ValueError:
+                pass  # Removed by stop() meanwhile
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _run_server(self):
+        while self.running:
+            try:
+                conn, addr = self.server_sock.accept()
+            except OSError:
+                break
+            self.logger(f"[OSC:{self.client_id}] TCP connection from {addr[0]}:{addr[1]}")
+            self.server_conns.append(conn)
+            self._spawn(self._run_reader, conn)
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        self._disconnect()
+        if self.server_sock:
+            self.server_sock.close()
+            self.server_sock = None
+        conns, self.server_conns = self.server_conns, []
+        for conn in conns:
+            conn.close()
@@ -3,11 +3,17 @@ MODULE Server
     VAR socketdev server_socket;
     VAR string client_ip;
     VAR string receive_string;
+    ! Partial command carried over to the next receive
+    VAR string pending_string:="";
+    VAR clock report_clock;
 
     PROC Main()
         StartServer;
+        ClkReset report_clock;
+        ClkStart report_clock;
         WHILE TRUE DO
             Receive;
+            IF report_state ReportState;
         ENDWHILE
     ERROR
         IF ERRNO=ERR_SOCK_CLOSED THEN
@@ -46,19 +52,23 @@ MODULE Server
     ENDPROC
 
     PROC Receive()
-        SocketReceive client_socket\Str:=receive_string;
-        TPWrite "Client wrote: "+receive_string;
-        SocketSend client_socket\Str:="Recieved: "+receive_string;
-        ParseMessage receive_string;
+        ! Wake up at least every report_interval so state reports keep flowing
+        SocketReceive client_socket\Str:=receive_string\Time:=report_interval;
+        ! Parse before anything else: a full 80-character receive (routine with
+        ! batched writes) must not be lost to a string overflow in the log line
+        ParseMessages receive_string;
+        IF StrLen(receive_string)>60 THEN
+            TPWrite "Client wrote: "+StrPart(receive_string,1,60)+"...";
+        ELSE
+            TPWrite "Client wrote: "+receive_string;
+        ENDIF
     ERROR
         IF ERRNO=ERR_SOCK_TIMEOUT THEN
-            RETRY;
+            RETURN ;
         ELSEIF ERRNO=ERR_SOCK_CLOSED THEN
             TPWrite "Socket Closed. Restarting Server";
             StartServer;
             RETRY;
-        ELSEIF ERRNO=ERR_SOCK_TIMEOUT THEN
-            RETRY;
         ELSEIF ERRNO=ERR_STRTOOLNG THEN
             TPWrite "STRING TOO LONG!.";
         ELSE
@@ -67,6 +77,47 @@ MODULE Server
         ENDIF
     ENDPROC
 
+    PROC ReportState()
+        ! Sends the current pose and joints as ctrans/[x,y,z]; crot/[q1,q2,q3,q4]; cjoints/[j1,...,j6];
+        ! (three sends, each one stays under the 80 character string limit)
+        VAR robtarget current_pose;
+        VAR jointtarget current_joints;
+
+        IF ClkRead(report_clock)<report_interval RETURN ;
+        ClkReset report_clock;
+        ClkStart report_clock;
+        current_pose:=CRobT(\TaskName:=motion_task\Tool:=tool0\WObj:=wobj0);
+        current_joints:=CJointT(\TaskName:=motion_task);
+        SocketSend client_socket\Str:="ctrans/"+ValToStr(current_pose.trans)+";";
+        SocketSend client_socket\Str:="crot/"+ValToStr(current_pose.rot)+";";
+        SocketSend client_socket\Str:="cjoints/"+ValToStr(current_joints.robax)+";";
+    ENDPROC
+
+    PROC ParseMessages(string data)
+        ! One receive can hold several ";"-terminated commands (e.g. a batched
+        ! OSC bundle), or end part-way through a command split by TCP
+        VAR num start:=1;
+        VAR num end_index;
+
+        WHILE start<=StrLen(data) DO
+            end_index:=StrMatch(data,start,";");
+            IF end_index>StrLen(data) THEN
+                ! No terminator yet: keep the rest until the next receive
+                pending_string:=pending_string+StrPart(data,start,StrLen(data)-start+1);
+                RETURN ;
+            ENDIF
+            ParseMessage pending_string+StrPart(data,start,end_index-start+1);
+            pending_string:="";
+            start:=end_index+1;
+        ENDWHILE
+    ERROR
+        IF ERRNO=ERR_STRTOOLNG THEN
+            TPWrite "Dropping oversized partial message.";
+            pending_string:="";
+            RETURN ;
+        ENDIF
+    ENDPROC
+
     PROC ParseMessage(string message)
         VAR string key;
         VAR string val;
@@ -0,0 +1,138 @@
+import argparse
+import multiprocessing
+import selectors
+import socket
+import time
+from tcp.tcp_client_manager import TCPClientManager
+from jog.jog_controller import POSE_COMMAND
+from .sharded_manager import ShardedTCPManager
+
+# Robot cell scaling benchmark: pose commands from the front process to N mock controllers,
+# one process vs robots sharded over worker processes. Run from the com_manager directory:
+#   python -m shard.shard_bench [--robots 2,4,8,16,32] [--processes 4] [--rate 100] [--seconds 3]
+# Latency is send call -> controller receive, both on time.perf_counter(), which is
+# system-wide on Linux and Windows.
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def _quiet(message):
+    pass
+
+def _mock_cell(port_pipe, done):
+    """Mock controllers in their own process: accept every robot, timestamp each pose by (robot, seq)"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", 0))
+    server.listen(64)
+    server.setblocking(False)
+    port_pipe.send(server.getsockname()[1])
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    robots = {}
+    buffers = {}
+    received = []
+    while not done.is_set():
+        for key, _ in selector.select(timeout=0.05):
+            sock = key.fileobj
+            if sock is server:
+                connection, _ = server.accept()
+                connection.setblocking(False)
+                buffers[connection] = ""
+                selector.register(connection, selectors.EVENT_READ)
+                continue
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                data = b""
+            now = time.perf_counter()
+            if not data:
+                selector.unregister(sock)
+                sock.close()
+                continue
+            *messages, buffers[sock] = (buffers[sock] + data.decode("utf-8")).split(";")
+            for message in messages:
+                if message.startswith("Hello from TCP client "):
+                    robots[sock] = message[len("Hello from TCP client "):].split("!")[0]
+                    # The greeting has no ";"; what follows it is a pose
+                    message = message.split("!", 1)[1]
+                if message.startswith("pose/[["):
+                    seq = int(float(message[7:].split(",")[0]))
+                    received.append((robots.get(sock), seq, now))
+    port_pipe.send(received)
+
+def bench_cell(mode, robots, processes=4, rate=100.0, seconds=3.0):
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    done = context.Event()
+    cell = context.Process(target=_mock_cell, args=(child, done), daemon=True)
+    cell.start()
+    port = parent.recv()
+
+    if mode == "single":
+        manager = TCPClientManager()
+    else:
+        manager = ShardedTCPManager(processes=min(processes, robots), quiet_workers=True)
+    manager.log = _quiet
+    names = [f"robot{i}" for i in range(robots)]
+    manager.add_clients([{"client_id": name, "host": "127.0.0.1", "port": port} for name in names])
+    deadline = time.perf_counter() + 10
+    while not all(client.connected for client in manager.clients.values()) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    sent = {}
+    period = 1.0 / rate
+    next_tick = time.perf_counter()
+    end = next_tick + seconds
+    seq = 0
+    while next_tick < end:
+        for name in names:
+            pose = (seq, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+            sent[(name, seq)] = time.perf_counter()
+            if mode == "single":
+                manager.send_message(name, POSE_COMMAND.format(*pose), log=False)
+            else:
+                manager.send_pose(name, pose)
+        seq += 1
+        next_tick += period
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    time.sleep(0.5)  # Let the last commands land
+    done.set()
+    received = parent.recv()
+    cell.join(timeout=5)
+    manager.stop_all()
+
+    latencies = [now - sent[(name, seq)] for name, seq, now in received if (name, seq) in sent]
+    return {
+        "mode": mode,
+        "robots": robots,
+        "sent": len(sent),
+        "lost": len(sent) - len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "max_ms": max(latencies) * 1e3 if latencies else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Robot cell scaling benchmark, one process vs sharded")
+    parser.add_argument("--robots", default="2,4,8,16,32", help="Comma-separated robot counts")
+    parser.add_argument("--processes", type=int, default=4, help="Shard worker processes (at most one per robot)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Pose commands per second per robot")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{multiprocessing.cpu_count()} CPUs")
+    print(f"{'mode':<8} {'robots':>6} {'sent':>7} {'lost':>5} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for robots in (int(n) for n in args.robots.split(",")):
+        for mode in ("single", "sharded"):
+            r = bench_cell(mode, robots, processes=args.processes, rate=args.rate, seconds=args.seconds)
+            print(f"{r['mode']:<8} {r['robots']:>6} {r['sent']:>7} {r['lost']:>5} {r['p50_ms']:>8.3f} "
+                  f"{r['p99_ms']:>8.3f} {r['max_ms']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
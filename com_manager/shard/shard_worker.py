@@ -0,0 +1,94 @@
+import json
+import struct
+import threading
+import time
+from .shm_ring import SharedRing
+
+# Records between the front process and a shard worker: one kind byte, then the payload.
+# Front -> worker
+ADD = b"A"         # json {"client_id", "host", "port", "lanes"}
+REMOVE = b"R"      # client_id
+TEXT = b"T"        # client_id NUL lane NUL command, logged like TCPClient.send_message; an empty lane classifies by key
+TEXT_QUIET = b"t"  # same, log=False
+POSE = b"P"        # 7 doubles (x, y, z, q1..q4), then client_id; the worker formats the RAPID command
+QUIT = b"Q"
+# Worker -> front
+MESSAGE = b"M"     # client_id NUL ";"-terminated message from the controller
+STATUS = b"S"      # b"1"/b"0" connected, then client_id
+
+POSE_STRUCT = struct.Struct("<7d")
+
+def run_worker(shard, commands, events, quiet=False, status_interval=0.1):
+    """
+    Shard process main: runs a TCPClient per robot assigned to this shard,
+    formats and sends the commands read from the `commands` ring, and reports
+    controller messages and connection changes on the `events` ring. Both
+    rings are (name, capacity, event) tuples created by the front process.
+    """
+    # Imported here so the front process never pays for them twice
+    from tcp.tcp_client import TCPClient
+    from jog.jog_controller import POSE_COMMAND
+
+    commands = SharedRing(commands[0], commands[1], commands[2])
+    events = SharedRing(events[0], events[1], events[2])
+    clients = {}
+    connected = {}
+    # Every client's listen thread reports here, but the ring takes one producer
+    events_lock = threading.Lock()
+
+    def log(message):
+        if not quiet:
+            print(f"{time.strftime('%H:%M:%S')} [Shard {shard}] {message}", flush=True)
+
+    def on_message(client, message):
+        with events_lock:
+            events.put(MESSAGE + client.client_id.encode("utf-8") + b"\0" + message.encode("utf-8"))
+        return True
+
+    def report_status():
+        with events_lock:
+            for client_id, client in list(clients.items()):
+                if client.connected != connected.get(client_id):
+                    connected[client_id] = client.connected
+                    events.put(STATUS + (b"1" if client.connected else b"0") + client_id.encode("utf-8"), block=True)
+
+    def start_client(client):
+        # start() waits for the first connect; keep reading commands meanwhile
+        client.start()
+        report_status()
+
+    running = True
+    while running:
+        for record in commands.get_batch(timeout=status_interval):
+            kind, payload = record[:1], record[1:]
+            if kind == POSE:
+                client = clients.get(payload[POSE_STRUCT.size:].decode("utf-8"))
+                if client:
+                    client.send_message(POSE_COMMAND.format(*POSE_STRUCT.unpack_from(payload)), log=False)
+            elif kind == TEXT or kind == TEXT_QUIET:
+                client_id, _, message = payload.partition(b"\0")
+                lane, _, message = message.partition(b"\0")
+                client = clients.get(client_id.decode("utf-8"))
+                if client:
+                    client.send_message(message.decode("utf-8"), log=kind == TEXT, lane=lane.decode("utf-8") or None)
+            elif kind == ADD:
+                spec = json.loads(payload)
+                client = TCPClient(spec["client_id"], spec["host"], spec["port"], logger=log, on_message=on_message,
+                                   lanes=spec.get("lanes"))
+                clients[spec["client_id"]] = client
+                threading.Thread(target=start_client, args=(client,), daemon=True).start()
+            elif kind == REMOVE:
+                client_id = payload.decode("utf-8")
+                client = clients.pop(client_id, None)
+                with events_lock:
+                    connected.pop(client_id, None)
+                if client:
+                    client.stop()
+            elif kind == QUIT:
+                running = False
+        report_status()
+
+    for client in clients.values():
+        client.stop()
+    commands.close()
+    events.close()
@@ -0,0 +1,180 @@
+import json
+import multiprocessing
+import threading
+from common.client_manager import ClientManager
+from .shm_ring import SharedRing
+from .shard_worker import run_worker, ADD, REMOVE, TEXT, TEXT_QUIET, POSE, QUIT, MESSAGE, STATUS, POSE_STRUCT
+
+class Shard:
+    """One worker process and its two rings: commands (front -> worker) and events (worker -> front)"""
+
+    def __init__(self, index, context, ring_size, on_event, quiet=False):
+        self.index = index
+        self.on_event = on_event
+        self.commands = SharedRing(capacity=ring_size, event=context.Event(), create=True)
+        self.events = SharedRing(capacity=ring_size, event=context.Event(), create=True)
+        # put() is single-producer; relays, jog and the control socket all send from their own threads
+        self.lock = threading.Lock()
+        self.process = context.Process(
+            target=run_worker, name=f"shard-{index}", daemon=True,
+            args=(index, (self.commands.name, ring_size, self.commands.event), (self.events.name, ring_size, self.events.event), quiet))
+        self.running = True
+        self.process.start()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def put(self, record, block=False):
+        with self.lock:
+            return self.commands.put(record, block=block)
+
+    def _read(self):
+        events = self.events
+        while self.running:
+            for record in events.get_batch(timeout=0.5):
+                self.on_event(record)
+
+    def stop(self):
+        self.put(QUIT, block=True)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.running = False
+        self.events.event.set()
+        self.reader.join(timeout=1)
+        self.commands.close()
+        self.events.close()
+
+class ShardClient:
+    """Front-process stand-in for a TCPClient living in a shard worker"""
+
+    def __init__(self, client_id, host, port, shard, on_message=None, logger=None, lanes=None):
+        self.client_id = client_id
+        self.host = host
+        self.port = port
+        self.lanes = lanes  # Passed to the worker's TCPClient, which classifies each command unless a lane is given
+        self.shard = shard
+        self.on_message = on_message
+        self.logger = logger or print
+        self.connected = False
+        self.connected_event = threading.Event()
+        self.prefix = client_id.encode("utf-8")
+
+    def start(self):
+        self.shard.put(ADD + json.dumps({"client_id": self.client_id, "host": self.host, "port": self.port, "lanes": self.lanes}).encode("utf-8"),
+                       block=True)
+        # Like TCPClient.start(): up to 0.5 s for the first connect
+        self.connected_event.wait(0.5)
+
+    def send_message(self, message, log=True, lane=None):
+        if not self.connected:
+            self.logger(f"[{self.client_id}] Not connected. Message will be sent after reconnection.")
+            return False
+        record = (TEXT if log else TEXT_QUIET) + self.prefix + b"\0" + (lane or "").encode("utf-8") + b"\0" + message.encode("utf-8")
+        if not self.shard.put(record):
+            self.logger(f"[{self.client_id}] Shard {self.shard.index} command ring full, message dropped")
+            return False
+        return True
+
+    def send_pose(self, pose):
+        """Send a pose target; the worker formats the RAPID command"""
+        if not self.connected:
+            return False
+        return self.shard.put(POSE + POSE_STRUCT.pack(*pose) + self.prefix)
+
+    def stop(self):
+        self.shard.put(REMOVE + self.prefix, block=True)
+
+class ShardedTCPManager(ClientManager):
+    """
+    TCPClientManager with the robots spread over `processes` worker processes.
+
+    Each worker runs its robots' TCPClients and formats their commands, so
+    socket I/O, encoding and logging for one group of robots never contend
+    for the front process's GIL. Commands and controller messages cross over
+    shared-memory rings (shm_ring.SharedRing) without pickling. The front keeps
+    a ShardClient per robot, so relays, the bus sink and jog work unchanged.
+    """
+
+    def __init__(self, processes=2, ring_size=1 << 20, quiet_workers=False):
+        super().__init__()
+        self.processes = processes
+        self.ring_size = ring_size
+        self.quiet_workers = quiet_workers  # Silence the workers' TCPClient log lines
+        self.context = multiprocessing.get_context("spawn")  # Same behaviour on Windows and Linux
+        self.shards = []
+        self.assigned = 0
+        self.shard_lock = threading.Lock()
+
+    def _next_shard(self):
+        with self.shard_lock:
+            index = self.assigned % self.processes
+            self.assigned += 1
+            if index == len(self.shards):
+                self.shards.append(Shard(index, self.context, self.ring_size, self._on_event, self.quiet_workers))
+            return self.shards[index]
+
+    def _on_event(self, record):
+        kind, payload = record[:1], record[1:]
+        if kind == MESSAGE:
+            client_id, _, message = payload.partition(b"\0")
+            client = self.clients.get(client_id.decode("utf-8"))
+            if client is None:
+                return
+            message = message.decode("utf-8", errors="replace")
+            handled = False
+            if client.on_message:
+                try:
+                    handled = client.on_message(client, message)
+                except Exception as e:
+                    self.log(f"[{client.client_id}] on_message error: {e}")
+            if not handled:
+                self.log(f"[{client.client_id}] Received: {message}")
+        elif kind == STATUS:
+            client = self.clients.get(payload[1:].decode("utf-8"))
+            if client:
+                client.connected = payload[:1] == b"1"
+                if client.connected:
+                    client.connected_event.set()
+                else:
+                    client.connected_event.clear()
+
+    def add_client(self, client_id: str, host: str = '127.0.0.1', port: int = 1025, on_message=None, lanes=None) -> bool:
+        if client_id in self.clients:
+            self.log(f"Client '{client_id}' already exists!")
+            return False
+        shard = self._next_shard()
+        return self._add(client_id,
+                         lambda: ShardClient(client_id, host, port, shard, on_message=on_message, logger=self.log, lanes=lanes),
+                         f"for {host}:{port} (process {shard.index})")
+
+    def send_message(self, client_id: str, message: str, log: bool = True, lane: str = None) -> bool:
+        client = self.get(client_id)
+        if client is None:
+            return False
+        return client.send_message(message, log=log, lane=lane)
+
+    def send_pose(self, client_id, pose):
+        client = self.get(client_id)
+        if client is None:
+            return False
+        return client.send_pose(pose)
+
+    def broadcast_message(self, message: str):
+        for client in self.clients.values():
+            client.send_message(message)
+
+    def describe(self, client_id, client):
+        status = "Connected" if client.connected else "Disconnected"
+        return [f"  {client_id}: {client.host}:{client.port} - {status} (process {client.shard.index})"]
+
+    def stats(self):
+        return {shard.index: {"pid": shard.process.pid, "alive": shard.process.is_alive(),
+                              "queued_bytes": len(shard.commands), "dropped": shard.commands.dropped}
+                for shard in self.shards}
+
+    def stop_all(self):
+        super().stop_all()
+        with self.shard_lock:
+            shards, self.shards = self.shards, []
+        for shard in shards:
+            shard.stop()
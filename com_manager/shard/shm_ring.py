@@ -0,0 +1,129 @@
+import struct
+import time
+from multiprocessing import shared_memory
+
+# Header: head (bytes ever written, producer only), tail (bytes ever read, consumer only),
+# waiting (consumer asleep), dropped (producer only). Positions only grow; offset = pos % capacity.
+_HEADER = struct.Struct("<QQQQ")
+_HEAD, _TAIL, _WAITING, _DROPPED = 0, 8, 16, 24
+_U64 = struct.Struct("<Q")
+_LEN = struct.Struct("<I")
+_WRAP = 0xFFFFFFFF  # Length marker: the rest of the buffer is padding, continue at offset 0
+
+class SharedRing:
+    """
+    Single-producer, single-consumer ring of byte records in shared memory.
+
+    Records are length-prefixed and never split: one that would cross the end
+    of the buffer starts again at offset 0. Nothing is pickled and no lock is
+    taken; each position is written by one side only. The consumer sets the
+    waiting flag before it sleeps on `event` (a multiprocessing.Event), and the
+    producer only sets the event when the flag is up, so a busy ring costs no
+    system calls. The sleep has a timeout, which bounds a missed wakeup.
+
+    The creating process owns the memory: create with create=True, pass
+    (ring.name, ring.capacity, ring.event) to the other process, which attaches
+    with create=False. Only the owner unlink()s it.
+    """
+
+    def __init__(self, name=None, capacity=1 << 20, event=None, create=False):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=_HEADER.size + capacity if create else 0)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.event = event
+        self.owner = create
+        if create:
+            _HEADER.pack_into(self.buf, 0, 0, 0, 0, 0)
+
+    def _get(self, offset):
+        return _U64.unpack_from(self.buf, offset)[0]
+
+    def _set(self, offset, value):
+        _U64.pack_into(self.buf, offset, value)
+
+    @property
+    def dropped(self):
+        return self._get(_DROPPED)
+
+    def __len__(self):
+        """Bytes waiting to be read"""
+        return self._get(_HEAD) - self._get(_TAIL)
+
+    def put(self, data, block=False, timeout=1.0):
+        """Append one record; returns False (and counts a drop) if it does not fit, after waiting if block"""
+        size = _LEN.size + len(data)
+        capacity = self.capacity
+        if size + _LEN.size > capacity:
+            raise ValueError(f"Record of {len(data)} bytes does not fit a {capacity} byte ring")
+        buf = self.buf
+        head = self._get(_HEAD)
+        offset = head % capacity
+        pad = capacity - offset if offset + size > capacity else 0
+        deadline = None
+        while capacity - (head - self._get(_TAIL)) < pad + size:
+            if not block:
+                self._set(_DROPPED, self._get(_DROPPED) + 1)
+                return False
+            if deadline is None:
+                deadline = time.perf_counter() + timeout
+            elif time.perf_counter() > deadline:
+                self._set(_DROPPED, self._get(_DROPPED) + 1)
+                return False
+            time.sleep(0.0005)
+        if pad:
+            if pad >= _LEN.size:
+                _LEN.pack_into(buf, _HEADER.size + offset, _WRAP)
+            head += pad
+            offset = 0
+        start = _HEADER.size + offset
+        _LEN.pack_into(buf, start, len(data))
+        buf[start + _LEN.size:start + size] = data
+        # Publish the record, then check whether the consumer is asleep
+        self._set(_HEAD, head + size)
+        if self._get(_WAITING) and self.event is not None:
+            self.event.set()
+        return True
+
+    def get_batch(self, timeout=None, max_records=None):
+        """Every record written so far (up to max_records), sleeping up to timeout if there are none"""
+        if self._get(_HEAD) == self._get(_TAIL) and timeout:
+            self._set(_WAITING, 1)
+            # Re-check after announcing: a put() before this saw waiting == 0
+            if self._get(_HEAD) == self._get(_TAIL) and self.event is not None:
+                self.event.wait(timeout)
+                self.event.clear()
+            elif self.event is None:
+                time.sleep(timeout)
+            self._set(_WAITING, 0)
+        buf = self.buf
+        capacity = self.capacity
+        head = self._get(_HEAD)
+        tail = self._get(_TAIL)
+        batch = []
+        while tail < head:
+            offset = tail % capacity
+            if capacity - offset < _LEN.size:
+                tail += capacity - offset
+                continue
+            length = _LEN.unpack_from(buf, _HEADER.size + offset)[0]
+            if length == _WRAP:
+                tail += capacity - offset
+                continue
+            start = _HEADER.size + offset + _LEN.size
+            batch.append(bytes(buf[start:start + length]))
+            tail += _LEN.size + length
+            if max_records and len(batch) >= max_records:
+                break
+        # Release the space only after the records are copied out
+        self._set(_TAIL, tail)
+        return batch
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
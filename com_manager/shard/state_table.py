@@ -0,0 +1,315 @@
+import argparse
+import math
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+# Latest-state table in shared memory, for visualisers, loggers and safety monitors in other
+# processes. Fixed layout, so readers need nothing but the name:
+#   header  magic, layout version, robot slots, input slots, writer pid
+#   robot   seq, name, connected, updated (time.time()), reports, commanded pose (x y z q1..q4),
+#           reported pose (x y z q1..q4), joints (j1..j6)
+#   input   seq, key ("<client>/<kind>/<channel>/<number>" or "<client><osc address>"), value, updated, count
+# Unknown values are NaN. Each slot is a seqlock: the writer makes seq odd, writes, then makes
+# it even again; a reader retries until it sees the same even seq before and after its copy.
+#
+# Read it from any process, from the com_manager directory:
+#   python -m shard.state_table [--name com_manager_state] [--watch HZ]
+#   python -m shard.state_table --bench
+
+MAGIC = b"COMSTATE"
+LAYOUT_VERSION = 2
+DEFAULT_NAME = "com_manager_state"
+_HEADER = struct.Struct("<8sIIII")
+_SEQ = struct.Struct("<Q")
+_ROBOT = struct.Struct("<Q32s?7xdQ7d7d6d")
+_INPUT = struct.Struct("<Q48sddQ")
+_NAN7 = (math.nan,) * 7
+_NAN6 = (math.nan,) * 6
+POSE_PREFIX = "pose/[["
+
+def parse_pose_command(command):
+    """(x, y, z, q1, q2, q3, q4) from a "pose/[[x,y,z],[q1,q2,q3,q4]];" command, else None"""
+    start = command.rfind(POSE_PREFIX)
+    if start < 0:
+        return None
+    end = command.find("]]", start)
+    try:
+        values = [float(v) for v in command[start + len(POSE_PREFIX):end].replace("],[", ",").split(",")]
+    except ValueError:
+        return None
+    return tuple(values) if len(values) == 7 else None
+
+_untracked = {}  # Shared memory name (as registered, with the leading "/") -> attaches in progress without tracking
+_untracked_lock = threading.Lock()
+_register = None
+
+def _register_tracked(name, rtype):
+    with _untracked_lock:
+        if rtype == "shared_memory" and name in _untracked:
+            return
+    _register(name, rtype)
+
+def _attach(name):
+    """Attach without registering with the resource tracker, which would unlink the writer's table when a reader exits"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    if os.name != "posix":
+        return shared_memory.SharedMemory(name=name)
+    # The tracker is shared with the writer's process tree, so registering and then unregistering
+    # would drop the writer's own registration. Skip registering this one name instead; the filter
+    # is installed once, so other threads attaching other segments are never affected.
+    global _register
+    from multiprocessing import resource_tracker
+    key = "/" + name
+    with _untracked_lock:
+        if _register is None:
+            _register = resource_tracker.register
+            resource_tracker.register = _register_tracked
+        _untracked[key] = _untracked.get(key, 0) + 1
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        with _untracked_lock:
+            _untracked[key] -= 1
+            if not _untracked[key]:
+                del _untracked[key]
+
+def _writer_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+def _unlink_if_stale(name):
+    """
+    Unlink an existing table left behind by a relay that did not shut down cleanly; raises
+    FileExistsError if it may still be in use (its writer is alive) or is not a state table
+    """
+    if os.name != "posix":
+        # Windows frees the mapping with its last handle, so an existing one is in use
+        raise FileExistsError(f"Shared memory '{name}' is in use by another process")
+    shm = _attach(name)
+    try:
+        magic, version, _, _, pid = _HEADER.unpack_from(shm.buf, 0) if shm.size >= _HEADER.size else (None,) * 5
+    finally:
+        shm.close()
+    if magic != MAGIC or version != LAYOUT_VERSION:
+        raise FileExistsError(f"Shared memory '{name}' exists and is not a layout {LAYOUT_VERSION} state table; "
+                              "pick another name or remove it")
+    if _writer_alive(pid):
+        raise FileExistsError(f"State table '{name}' is in use by process {pid}; pick another name")
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+
+class StateTable:
+    """
+    Writer side lives in the relay (create=True): update_robot() and
+    update_input() cost one struct.pack_into each, with no IPC. Readers attach
+    with StateTable(name) and call robots()/inputs() for consistent snapshots.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, robots=16, inputs=256, create=False):
+        self.owner = create
+        if create:
+            size = _HEADER.size + robots * _ROBOT.size + inputs * _INPUT.size
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                _unlink_if_stale(name)
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+            _HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, robots, inputs, os.getpid())
+        else:
+            self.shm = _attach(name)
+            magic, version, robots, inputs, _ = _HEADER.unpack_from(self.shm.buf, 0)
+            if magic != MAGIC or version != LAYOUT_VERSION:
+                self.shm.close()
+                raise ValueError(f"'{name}' is not a layout {LAYOUT_VERSION} state table")
+        self.name = name
+        self.buf = self.shm.buf
+        self.robot_slots = robots
+        self.input_slots = inputs
+        self.robot_base = _HEADER.size
+        self.input_base = _HEADER.size + robots * _ROBOT.size
+        # Writer side: slot per name, and the current values of each robot slot
+        self.lock = threading.Lock()
+        self.robot_index = {}
+        self.robot_values = {}
+        self.input_index = {}
+        self.input_counts = {}
+        self.overflows = 0
+
+    # --- writer ---
+
+    def _write(self, offset, record, values):
+        buf = self.buf
+        seq = _SEQ.unpack_from(buf, offset)[0]
+        _SEQ.pack_into(buf, offset, seq + 1)
+        record.pack_into(buf, offset, seq + 1, *values)
+        _SEQ.pack_into(buf, offset, seq + 2)
+
+    def update_robot(self, client_id, connected=None, commanded=None, pose=None, joints=None, report=False):
+        with self.lock:
+            values = self.robot_values.get(client_id)
+            if values is None:
+                index = len(self.robot_index)
+                if index >= self.robot_slots:
+                    self.overflows += 1
+                    return False
+                self.robot_index[client_id] = index
+                values = self.robot_values[client_id] = [client_id.encode("utf-8")[:32], False, 0.0, 0, _NAN7, _NAN7, _NAN6]
+            if connected is not None:
+                values[1] = connected
+            values[2] = time.time()
+            if report:
+                values[3] += 1
+            if commanded is not None:
+                values[4] = tuple(commanded)
+            if pose is not None:
+                values[5] = tuple(pose)
+            if joints is not None:
+                values[6] = tuple(joints)
+            offset = self.robot_base + self.robot_index[client_id] * _ROBOT.size
+            self._write(offset, _ROBOT, values[:4] + list(values[4]) + list(values[5]) + list(values[6]))
+            return True
+
+    def update_input(self, key, value):
+        with self.lock:
+            index = self.input_index.get(key)
+            if index is None:
+                index = len(self.input_index)
+                if index >= self.input_slots:
+                    self.overflows += 1
+                    return False
+                self.input_index[key] = index
+            count = self.input_counts.get(key, 0) + 1
+            self.input_counts[key] = count
+            self._write(self.input_base + index * _INPUT.size, _INPUT,
+                        (key.encode("utf-8")[:48], float(value), time.time(), count))
+            return True
+
+    # --- reader ---
+
+    def _read(self, offset, record, retries=1000):
+        buf = self.buf
+        size = record.size
+        for _ in range(retries):
+            seq = _SEQ.unpack_from(buf, offset)[0]
+            if seq & 1:
+                continue
+            data = bytes(buf[offset:offset + size])
+            if _SEQ.unpack_from(buf, offset)[0] == seq and _SEQ.unpack_from(data, 0)[0] == seq:
+                return record.unpack(data)
+        return None
+
+    def robots(self):
+        """{name: {"connected", "updated", "reports", "commanded", "pose", "joints"}}"""
+        robots = {}
+        for i in range(self.robot_slots):
+            values = self._read(self.robot_base + i * _ROBOT.size, _ROBOT)
+            if values is None or not values[0]:
+                continue
+            robots[values[1].rstrip(b"\0").decode("utf-8")] = {
+                "connected": values[2], "updated": values[3], "reports": values[4],
+                "commanded": values[5:12], "pose": values[12:19], "joints": values[19:25],
+            }
+        return robots
+
+    def inputs(self):
+        """{key: (value, updated, count)}"""
+        inputs = {}
+        for i in range(self.input_slots):
+            values = self._read(self.input_base + i * _INPUT.size, _INPUT)
+            if values is None or not values[0]:
+                continue
+            inputs[values[1].rstrip(b"\0").decode("utf-8")] = values[2:]
+        return inputs
+
+    def stats(self):
+        return {"robots": len(self.robot_index), "inputs": len(self.input_index), "overflows": self.overflows}
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+def _bench_writer(name, seconds, counter):
+    table = StateTable(name)
+    table.robot_index = {"bench": 0}
+    table.robot_values = {"bench": [b"bench", True, 0.0, 0, _NAN7, _NAN7, _NAN6]}
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+        # Every field carries n, so a torn read shows up as mixed values
+        table.update_robot("bench", commanded=(n,) * 7, pose=(n,) * 7, joints=(n,) * 6)
+    counter.value = n
+    table.close()
+
+def bench(seconds=2.0):
+    """Writer process updating one robot slot flat out, this process reading; checks every snapshot is whole"""
+    import multiprocessing
+    name = f"{DEFAULT_NAME}_bench_{os.getpid()}"
+    table = StateTable(name, robots=1, inputs=1, create=True)
+    context = multiprocessing.get_context("spawn")
+    counter = context.Value("Q", 0)
+    writer = context.Process(target=_bench_writer, args=(name, seconds, counter))
+    writer.start()
+    time.sleep(0.5)  # Writer start-up
+    reads = torn = 0
+    end = time.perf_counter() + seconds - 0.5
+    while time.perf_counter() < end:
+        state = table.robots().get("bench")
+        if state is None:
+            continue
+        reads += 1
+        values = set(state["commanded"] + state["pose"] + state["joints"])
+        if len(values) != 1:
+            torn += 1
+    writer.join()
+    table.close()
+    print(f"{counter.value / seconds:,.0f} robot updates/s written, {reads / (seconds - 0.5):,.0f} snapshots/s read "
+          f"concurrently, {torn} torn")
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the relay's shared-memory state table")
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--watch", type=float, help="Print continuously at this rate (Hz)")
+    parser.add_argument("--bench", action="store_true", help="Measure write/read rates and check for torn reads")
+    args = parser.parse_args()
+    if args.bench:
+        bench()
+        return
+    table = StateTable(args.name)
+    try:
+        while True:
+            now = time.time()
+            for name, state in table.robots().items():
+                pose = " ".join(f"{v:.2f}" for v in state["pose"][:3])
+                commanded = " ".join(f"{v:.2f}" for v in state["commanded"][:3])
+                print(f"{name}: {'connected' if state['connected'] else 'disconnected'}, pose [{pose}], "
+                      f"commanded [{commanded}], {state['reports']} reports, {now - state['updated']:.1f} s ago")
+            for key, (value, updated, count) in table.inputs().items():
+                print(f"  {key} = {value:g} ({count} updates, {now - updated:.1f} s ago)")
+            if not args.watch:
+                break
+            time.sleep(1.0 / args.watch)
+            print()
+    finally:
+        table.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+# State reports sent by ReportState in rapid/Server.mod:
+#   ctrans/[x,y,z];  crot/[q1,q2,q3,q4];  cjoints/[j1,j2,j3,j4,j5,j6];
+STATE_KEYS = ("ctrans", "crot", "cjoints")
+
+class RobotState:
+    __slots__ = ("client_id", "trans", "rot", "pending_trans", "joints", "pose_version", "joints_version", "timestamp", "reports")
+
+    def __init__(self, client_id):
+        self.client_id = client_id
+        self.trans = None   # [x, y, z] in mm
+        self.rot = None     # [qw, qx, qy, qz]
+        self.pending_trans = None  # ctrans waiting for the crot of the same report
+        self.joints = None  # [j1..j6] in degrees
+        self.pose_version = 0
+        self.joints_version = 0
+        self.timestamp = 0.0
+        self.reports = 0
+
+    @property
+    def pose(self):
+        if self.trans is None or self.rot is None:
+            return None
+        return self.trans + self.rot
+
+class RobotStateStore:
+    """Latest reported pose and joints per robot, fed from the TCP receive path"""
+
+    def __init__(self):
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def on_tcp_message(self, client, message):
+        """TCPClient on_message hook: returns True if message was a state report"""
+        return self.update(client.client_id, message)
+
+    def update(self, client_id, message):
+        key, sep, value = message.strip().partition("/")
+        if not sep or key not in STATE_KEYS:
+            return False
+        try:
+            values = [float(v) for v in value.strip("[]").split(",")]
+        except ValueError:
+            return False
+        with self.lock:
+            state = self.states.get(client_id)
+            if state is None:
+                state = self.states[client_id] = RobotState(client_id)
+            # ReportState sends ctrans then crot: the pose changes once, when crot completes it,
+            # so readers never see a new translation with the previous rotation
+            if key == "ctrans" and len(values) == 3:
+                state.pending_trans = values
+            elif key == "crot" and len(values) == 4:
+                if state.pending_trans is not None:
+                    state.trans = state.pending_trans
+                    state.pending_trans = None
+                state.rot = values
+                state.pose_version += 1
+            elif key == "cjoints" and len(values) == 6:
+                state.joints = values
+                state.joints_version += 1
+            else:
+                return False
+            state.timestamp = time.time()
+            state.reports += 1
+        return True
+
+    def get(self, client_id):
+        with self.lock:
+            return self.states.get(client_id)
+
+    def snapshot(self):
+        """[(client_id, pose_version, pose, joints_version, joints)] for every robot that has reported"""
+        with self.lock:
+            return [(s.client_id, s.pose_version, s.pose, s.joints_version, s.joints) for s in self.states.values()]
@@ -1,18 +1,31 @@
 import socket
 import threading
 import time
+from .tcp_lanes import OutboundLanes
 
 class TCPClient:
-    def __init__(self, client_id: str, host: str, port: int, logger=None):
+    def __init__(self, client_id: str, host: str, port: int, logger=None, on_message=None, lanes=None):
         self.client_id = client_id
         self.host = host
         self.port = port
         self.logger = logger or print
+        # on_message(client, message) is called for each ";"-terminated message from the
+        # controller; returning True marks it as handled and skips the log line
+        self.on_message = on_message
+        self.receive_buffer = ""
         self.connected = False
+        self.connected_event = threading.Event()  # Set while connected; start() waits on it
         self.client_socket = None
         self.should_reconnect = True
         self.listen_thread = None
         self.connect_thread = None
+        self.connection_lock = threading.Lock()  # The listen thread and a failed write can both notice a drop
+        # lanes: None writes each command from the caller's thread; True (or OutboundLanes options,
+        # e.g. {"flush_on_control": true}) queues it on control/interactive/bulk lanes instead
+        self.lanes = None
+        if lanes:
+            self.lanes = OutboundLanes(self._write, logger=lambda message: self.logger(f"[{self.client_id}] {message}"),
+                                       **(lanes if isinstance(lanes, dict) else {}))
     
     def connect_to_server(self):
         while self.should_reconnect:
@@ -22,12 +35,16 @@ class TCPClient:
                 
                 # Create a new TCP socket
                 self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                if self.lanes and self.lanes.send_buffer:
+                    self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.lanes.send_buffer)
                 
                 # Connect to the server
                 self.logger(f"[{self.client_id}] Connecting to {self.host}:{self.port}...")
                 self.client_socket.connect((self.host, self.port))
                 self.logger(f"[{self.client_id}] Connected successfully!")
+                self.receive_buffer = ""
                 self.connected = True
+                self.connected_event.set()
                 
                 # Send initial greeting
                 greeting = f"Hello from TCP client {self.client_id}!"
@@ -53,50 +70,100 @@ class TCPClient:
                 time.sleep(0.1)
                 continue
                 
+            sock = self.client_socket
             try:
-                response = self.client_socket.recv(1024)
+                response = sock.recv(1024)
                 if not response:
-                    self.logger(f"[{self.client_id}] Server closed the connection. Attempting to reconnect...")
-                    self.connected = False
-                    # Start reconnection in a separate thread
-                    self.connect_thread = threading.Thread(target=self.connect_to_server, daemon=True)
-                    self.connect_thread.start()
+                    self._connection_lost(sock, "Server closed the connection")
                     continue
-                self.logger(f"[{self.client_id}] Received: {response.decode('utf-8')}")
+                self._handle_received(response.decode('utf-8', errors='replace'))
             except socket.error:
-                self.logger(f"[{self.client_id}] Connection lost. Attempting to reconnect...")
-                self.connected = False
-                # Start reconnection in a separate thread
-                self.connect_thread = threading.Thread(target=self.connect_to_server, daemon=True)
-                self.connect_thread.start()
+                self._connection_lost(sock, "Connection lost")
+
+    def _connection_lost(self, sock, reason):
+        # Only the first report for the current socket reconnects; a socket that
+        # connect_to_server already replaced is ignored
+        with self.connection_lock:
+            if not self.connected or sock is not self.client_socket or not self.should_reconnect:
+                return
+            self.connected = False
+            self.connected_event.clear()
+        try:
+            sock.shutdown(socket.SHUT_RDWR)  # Wakes the listen thread if it is still blocked in recv()
+        except OSError:
+            pass
+        self.logger(f"[{self.client_id}] {reason}. Attempting to reconnect...")
+        # Start reconnection in a separate thread
+        self.connect_thread = threading.Thread(target=self.connect_to_server, daemon=True)
+        self.connect_thread.start()
     
+    def _handle_received(self, text: str):
+        # Messages can arrive split or coalesced; keep a partial message until its ";" arrives
+        self.receive_buffer += text
+        *messages, self.receive_buffer = self.receive_buffer.split(";")
+        if len(self.receive_buffer) > 4096:
+            self.logger(f"[{self.client_id}] Received: {self.receive_buffer}")
+            self.receive_buffer = ""
+        for message in messages:
+            handled = False
+            if self.on_message:
+                try:
+                    handled = self.on_message(self, message)
+                except Exception as e:
+                    self.logger(f"[{self.client_id}] on_message error: {e}")
+            if not handled:
+                self.logger(f"[{self.client_id}] Received: {message}")
+
     def start(self):
         # Initial connection
         self.connect_thread = threading.Thread(target=self.connect_to_server, daemon=True)
         self.connect_thread.start()
         
-        # Wait a moment for initial connection attempt
-        time.sleep(0.5)
+        # Wait up to 0.5 s for the initial connection attempt; returns as soon as it connects
+        self.connected_event.wait(0.5)
         
         # Start listening thread
         self.listen_thread = threading.Thread(target=self.listen_for_messages, daemon=True)
         self.listen_thread.start()
+        if self.lanes:
+            self.lanes.start()
     
-    def send_message(self, message: str) -> bool:
+    def send_message(self, message: str, log: bool = True, lane: str = None) -> bool:
         if self.connected and self.client_socket:
+            if self.lanes:
+                lane = self.lanes.put(message, lane)
+                if log:
+                    self.logger(f"[{self.client_id}] Queued ({lane}): {message}")
+                return True
+            sock = self.client_socket
             try:
-                self.client_socket.send(message.encode('utf-8'))
-                self.logger(f"[{self.client_id}] Sent: {message}")
+                sock.send(message.encode('utf-8'))
+                if log:
+                    self.logger(f"[{self.client_id}] Sent: {message}")
                 return True
             except socket.error as e:
                 self.logger(f"[{self.client_id}] Failed to send message: {e}")
+                self._connection_lost(sock, "Connection lost")
                 return False
         else:
             self.logger(f"[{self.client_id}] Not connected. Message will be sent after reconnection.")
             return False
     
+    def _write(self, data: bytes):
+        # Lane sender: a failed write drops the connection, so send_message returns False until it is back
+        sock = self.client_socket
+        if not self.connected or not sock:
+            raise OSError("not connected")
+        try:
+            sock.sendall(data)
+        except OSError as e:
+            self._connection_lost(sock, f"Write failed ({e})")
+            raise
+
     def stop(self):
         self.should_reconnect = False
+        if self.lanes:
+            self.lanes.stop()
         if self.client_socket:
             self.client_socket.close()
         self.logger(f"[{self.client_id}] Connection closed") 
\ No newline at end of file
@@ -1,73 +1,37 @@
-import socket
-import sys
 import argparse
-import threading
 import time
-from typing import Dict, Optional
+from typing import Dict
 from .tcp_client import TCPClient
+from common.client_manager import ClientManager
 
-class TCPClientManager:
-    def __init__(self):
-        self.clients: Dict[str, TCPClient] = {}
-        self.lock = threading.Lock()
+class TCPClientManager(ClientManager):
+    label = "client"
+    clients: Dict[str, TCPClient]
     
-    def log(self, message: str):
-        print(f"{time.strftime('%H:%M:%S')} {message}")
+    def add_client(self, client_id: str, host: str = '127.0.0.1', port: int = 1025, on_message=None, lanes=None) -> bool:
+        # TCPClient.start() waits 0.5 s for the first connect; that now happens outside the registry lock
+        return self._add(client_id,
+                         lambda: TCPClient(client_id, host, port, logger=self.log, on_message=on_message, lanes=lanes),
+                         f"for {host}:{port}")
     
-    def add_client(self, client_id: str, host: str = '127.0.0.1', port: int = 1025) -> bool:
-        with self.lock:
-            if client_id in self.clients:
-                self.log(f"Client '{client_id}' already exists!")
-                return False
-            
-            client = TCPClient(client_id, host, port, logger=self.log)
-            self.clients[client_id] = client
-            client.start()
-            self.log(f"Added client '{client_id}' for {host}:{port}")
-            return True
-    
-    def remove_client(self, client_id: str) -> bool:
-        with self.lock:
-            if client_id not in self.clients:
-                self.log(f"Client '{client_id}' not found!")
-                return False
-            
-            client = self.clients[client_id]
-            client.stop()
-            del self.clients[client_id]
-            self.log(f"Removed client '{client_id}'")
-            return True
-    
-    def send_message(self, client_id: str, message: str) -> bool:
-        with self.lock:
-            if client_id not in self.clients:
-                self.log(f"Client '{client_id}' not found!")
-                return False
-            
-            return self.clients[client_id].send_message(message)
+    def send_message(self, client_id: str, message: str, log: bool = True, lane: str = None) -> bool:
+        client = self.get(client_id)
+        if client is None:
+            return False
+        return client.send_message(message, log=log, lane=lane)
     
     def broadcast_message(self, message: str):
-        with self.lock:
-            for client_id, client in self.clients.items():
-                client.send_message(message)
-    
-    def list_clients(self):
-        with self.lock:
-            if not self.clients:
-                self.log("No clients connected")
-                return
-            
-            self.log("Connected clients:")
-            for client_id, client in self.clients.items():
-                status = "Connected" if client.connected else "Disconnected"
-                self.log(f"  {client_id}: {client.host}:{client.port} - {status}")
+        for client in self.clients.values():
+            client.send_message(message)
     
-    def stop_all(self):
-        with self.lock:
-            for client in self.clients.values():
-                client.stop()
-            self.clients.clear()
-            self.log("All clients stopped")
+    def describe(self, client_id: str, client: TCPClient):
+        status = "Connected" if client.connected else "Disconnected"
+        lines = [f"  {client_id}: {client.host}:{client.port} - {status}"]
+        if client.lanes:
+            for lane, stats in client.lanes.stats().items():
+                lines.append(f"    {lane}: {stats['sent']} sent, {stats['depth']} queued, {stats['dropped']} dropped, "
+                             f"{stats['flushed']} flushed, wait p50 {stats['wait_p50_ms']:.2f} ms / p99 {stats['wait_p99_ms']:.2f} ms")
+        return lines
 
 
 def main():
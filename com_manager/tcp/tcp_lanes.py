@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+
+# Outbound lanes of a robot, highest priority first
+CONTROL = "control"
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (CONTROL, INTERACTIVE, BULK)
+# Command keys (see rapid/Server.mod) that pick a lane; everything else is interactive
+CONTROL_COMMANDS = ("GoHome/",)
+BULK_COMMANDS = ("pose/", "joints/")
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+class OutboundLanes:
+    """
+    Prioritized send queues for one TCPClient, written by one sender thread.
+
+    Commands are sorted into lanes by their key: control (GoHome/),
+    bulk streaming (pose/, joints/) and interactive (the rest). The sender
+    always drains higher lanes first, batching up to max_write bytes per
+    write, so a control command waits for at most one write instead of the
+    whole streaming backlog. A command holding several ";"-separated commands
+    (an OSC bundle) goes whole in the lane of its most urgent part.
+
+    The bulk lane keeps at most bulk_size commands and drops the oldest (a
+    stale stream target) when full. With flush_on_control, a control command
+    also discards everything queued on the lower lanes. send_buffer shrinks
+    the socket's kernel send buffer, which is one more FIFO the lanes cannot
+    reorder.
+    """
+
+    def __init__(self, write, control=CONTROL_COMMANDS, bulk=BULK_COMMANDS, flush_on_control=False, bulk_size=256,
+                 max_write=1024, send_buffer=None, logger=None):
+        self.write = write  # write(data) sends bytes to the robot, raising OSError on failure
+        self.control = tuple(control)
+        self.bulk = tuple(bulk)
+        self.flush_on_control = flush_on_control
+        self.bulk_size = bulk_size
+        self.max_write = max_write
+        self.send_buffer = send_buffer
+        self.logger = logger or print
+        self.queues = {lane: deque() for lane in LANES}
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.counts = {lane: {"queued": 0, "sent": 0, "dropped": 0, "flushed": 0} for lane in LANES}
+        self.wait = {lane: [] for lane in LANES}  # Seconds from put() to the write that carried it
+        self.max_samples = 10000
+        self.write_errors = 0
+
+    def classify(self, message):
+        if message.count(";") > 1:
+            lanes = [self._lane(part) for part in message.split(";") if part]
+            return min(lanes, key=LANES.index) if lanes else INTERACTIVE
+        return self._lane(message)
+
+    def _lane(self, command):
+        if command.startswith(self.control):
+            return CONTROL
+        if command.startswith(self.bulk):
+            return BULK
+        return INTERACTIVE
+
+    def put(self, message, lane=None):
+        """Queue a command; returns the lane it went to"""
+        lane = lane or self.classify(message)
+        data = message.encode("utf-8")
+        with self.condition:
+            if lane == CONTROL and self.flush_on_control:
+                for lower in (INTERACTIVE, BULK):
+                    self.counts[lower]["flushed"] += len(self.queues[lower])
+                    self.queues[lower].clear()
+            queue = self.queues[lane]
+            if lane == BULK and len(queue) >= self.bulk_size:
+                queue.popleft()
+                self.counts[BULK]["dropped"] += 1
+            queue.append((time.perf_counter(), data))
+            self.counts[lane]["queued"] += 1
+            self.condition.notify()
+        return lane
+
+    def _take(self):
+        """Next write: queued commands in lane order, up to max_write bytes (at least one command)"""
+        batch = []
+        size = 0
+        now = time.perf_counter()
+        for lane in LANES:
+            queue = self.queues[lane]
+            while queue and (not batch or size + len(queue[0][1]) <= self.max_write):
+                queued, data = queue.popleft()
+                batch.append((lane, data))
+                size += len(data)
+                self._sample(self.wait[lane], now - queued)
+            if queue:
+                break
+        return batch
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not any(self.queues.values()):
+                    self.condition.wait()
+                if not self.running:
+                    return
+                batch = self._take()
+            try:
+                self.write(b"".join(data for _, data in batch))
+                counts = self.counts
+                for lane, _ in batch:
+                    counts[lane]["sent"] += 1
+            except OSError as e:
+                self.write_errors += 1
+                for lane, _ in batch:
+                    self.counts[lane]["dropped"] += 1
+                self.logger(f"Failed to send {len(batch)} queued commands: {e}")
+
+    def _sample(self, samples, value):
+        samples.append(value)
+        if len(samples) > self.max_samples:
+            del samples[:len(samples) // 2]
+
+    def stats(self):
+        stats = {}
+        for lane in LANES:
+            wait = self.wait[lane]
+            stats[lane] = dict(self.counts[lane], depth=len(self.queues[lane]),
+                               wait_p50_ms=_percentile(wait, 0.50) * 1e3, wait_p99_ms=_percentile(wait, 0.99) * 1e3,
+                               wait_max_ms=max(wait) * 1e3 if wait else 0.0)
+        return stats
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
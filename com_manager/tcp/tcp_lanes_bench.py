@@ -0,0 +1,117 @@
+import argparse
+import socket
+import threading
+import time
+from jog.jog_controller import POSE_COMMAND
+from .tcp_client import TCPClient
+from .tcp_lanes import LANES
+
+# Priority lane benchmark: a pose stream faster than a (mock) controller reads, and GoHome/
+# issued in the middle of it. Measures how long GoHome takes to reach the controller with one
+# FIFO queue, with priority lanes, and with lanes that flush the backlog. Run from the
+# com_manager directory:
+#   python -m tcp.tcp_lanes_bench [--rate 3000] [--consume 100000] [--seconds 2]
+
+def _quiet(message):
+    pass
+
+class SlowController:
+    """Accepts one connection and reads at most `consume` bytes/s with a small receive buffer, noting when GoHome/ arrives"""
+
+    def __init__(self, consume, receive_buffer=4096):
+        self.consume = consume
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.home_time = None
+        self.poses = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        connection, _ = self.sock.accept()
+        connection.settimeout(0.1)
+        chunk = 512
+        pending = ""
+        while self.running:
+            try:
+                data = connection.recv(chunk)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+            pending += data.decode("utf-8", errors="replace")
+            *commands, pending = pending.split(";")
+            for command in commands:
+                if command.startswith("GoHome/") and self.home_time is None:
+                    self.home_time = time.perf_counter()
+                elif command.startswith("pose/"):
+                    self.poses += 1
+            time.sleep(chunk / self.consume)
+        connection.close()
+
+    def stop(self):
+        self.running = False
+        self.sock.close()
+
+def run(mode, rate, consume, seconds):
+    controller = SlowController(consume)
+    if mode == "fifo":
+        # Same queue and sender, but every command in one lane: the old FIFO order
+        lanes = {"control": (), "bulk": ("",), "bulk_size": 1 << 30, "send_buffer": 4096}
+    elif mode == "lanes":
+        lanes = {"send_buffer": 4096}
+    else:
+        lanes = {"send_buffer": 4096, "flush_on_control": True}
+    client = TCPClient("bench", "127.0.0.1", controller.port, logger=_quiet, lanes=lanes)
+    client.start()
+    client.connected_event.wait(2)
+    period = 1.0 / rate
+    start = time.perf_counter()
+    home_sent = None
+    i = 0
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter()
+        if home_sent is None and now - start >= seconds / 2:
+            home_sent = now
+            client.send_message("GoHome/;", log=False)
+        client.send_message(POSE_COMMAND.format(500.0 + i % 100, 0.0, 400.0, 1.0, 0.0, 0.0, 0.0), log=False)
+        i += 1
+        delay = start + i * period - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    deadline = time.perf_counter() + 30
+    while controller.home_time is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    stats = client.lanes.stats()
+    client.stop()
+    controller.stop()
+    latency = (controller.home_time - home_sent) * 1e3 if controller.home_time else None
+    return latency, i, stats
+
+def main():
+    parser = argparse.ArgumentParser(description="TCP priority lane benchmark")
+    parser.add_argument("--rate", type=float, default=3000.0, help="Pose commands per second")
+    parser.add_argument("--consume", type=float, default=100000.0, help="Bytes per second the controller reads")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    print(f"{args.rate:g} poses/s into a controller reading {args.consume / 1000:g} kB/s (~{args.consume / 70:.0f} poses/s), "
+          f"GoHome/ after {args.seconds / 2:g} s")
+    for mode in ("fifo", "lanes", "lanes+flush"):
+        latency, poses, stats = run(mode, args.rate, args.consume, args.seconds)
+        print(f"{mode:<12} GoHome/ reached the controller after {'-' if latency is None else f'{latency:.1f} ms'} "
+              f"({poses} poses queued)")
+        for lane in LANES:
+            lane_stats = stats[lane]
+            if lane_stats["queued"]:
+                print(f"  {lane:<12} {lane_stats['queued']:>6} queued {lane_stats['sent']:>6} sent {lane_stats['dropped']:>6} dropped "
+                      f"{lane_stats['flushed']:>6} flushed, wait p50 {lane_stats['wait_p50_ms']:.2f} ms, "
+                      f"p99 {lane_stats['wait_p99_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import collections
+import math
+import time
+import numpy as np
+from tcp.robot_state import RobotStateStore
+from .telemetry_buffer import TelemetryRing, TelemetryStore, derivatives, motion_summary
+
+# Telemetry benchmark: appends/s from the TCP receive path and query latency over an hour of
+# 250 Hz history, compared with a deque of per-sample tuples. Run from the com_manager directory:
+#   python -m telemetry.telemetry_bench [--rate 250] [--hours 1] [--appends 200000]
+
+def _sample(i, rate):
+    t = i / rate
+    pose = (500 + 100 * math.sin(t), 200 * math.cos(t), 400 + 10 * t % 50, 1.0, 0.0, 0.0, 0.0)
+    joints = tuple(10 * math.sin(t + k) for k in range(6))
+    return t, pose, joints
+
+def bench_append(appends, rate):
+    """Full receive path: three state reports parsed by RobotStateStore, then TelemetryStore.on_state"""
+    store = RobotStateStore()
+    telemetry = TelemetryStore(seconds=appends / rate, rate_hz=rate)
+    messages = []
+    for i in range(1000):
+        _, pose, joints = _sample(i, rate)
+        messages.append((f"ctrans/[{pose[0]:.2f},{pose[1]:.2f},{pose[2]:.2f}]",
+                         "crot/[1.0,0.0,0.0,0.0]",
+                         "cjoints/[" + ",".join(f"{j:.3f}" for j in joints) + "]"))
+    start = time.perf_counter()
+    for i in range(appends):
+        for message in messages[i % 1000]:
+            store.update("bench", message)
+        telemetry.on_state(store.get("bench"))
+    receive_path = appends / (time.perf_counter() - start)
+
+    ring = TelemetryRing(appends)
+    samples = [_sample(i, rate) for i in range(min(appends, 100000))]
+    start = time.perf_counter()
+    for i in range(appends):
+        ring.append(*samples[i % len(samples)])
+    ring_only = appends / (time.perf_counter() - start)
+    return receive_path, ring_only
+
+def _filled_ring(rate, seconds, window_seconds):
+    """A ring holding `seconds` of history, filled in bulk (and wrapped once, like a long-running relay)"""
+    capacity = int(rate * seconds)
+    ring = TelemetryRing(capacity, int(rate * window_seconds))
+    n = capacity + capacity // 3
+    t = np.arange(n) / rate
+    rows = np.zeros(n, dtype=ring.data.dtype)
+    rows["t"] = t
+    rows["pose"][:, 0] = 500 + 100 * np.sin(t)
+    rows["pose"][:, 1] = 200 * np.cos(t)
+    rows["pose"][:, 2] = 400
+    rows["pose"][:, 3] = 1.0
+    rows["joints"] = 10 * np.sin(t[:, None] + np.arange(6))
+    rows["commanded"] = rows["pose"]
+    rows["commanded"][:, 0] += 0.5
+    # Same layout append() leaves behind
+    for first in range(0, n, capacity):
+        chunk = rows[first:first + capacity]
+        ring.data[:len(chunk)] = chunk
+        ring.count = first + len(chunk)
+    ring.data[capacity:] = ring.data[:ring.mirror]
+    return ring, rows
+
+def _python_summary(samples):
+    """Per-sample Python objects: finite-difference speed, acceleration and jerk over a deque of tuples"""
+    samples = list(samples)
+    peak_speed = peak_acceleration = peak_jerk = 0.0
+    velocity = []
+    for (t0, p0, _, _), (t1, p1, _, _) in zip(samples, samples[1:]):
+        dt = t1 - t0
+        v = [(b - a) / dt for a, b in zip(p0[:3], p1[:3])]
+        velocity.append((t1, v))
+        peak_speed = max(peak_speed, math.sqrt(sum(x * x for x in v)))
+    acceleration = []
+    for (t0, v0), (t1, v1) in zip(velocity, velocity[1:]):
+        a = [(b - c) / (t1 - t0) for c, b in zip(v0, v1)]
+        acceleration.append((t1, a))
+        peak_acceleration = max(peak_acceleration, math.sqrt(sum(x * x for x in a)))
+    for (t0, a0), (t1, a1) in zip(acceleration, acceleration[1:]):
+        j = [(b - c) / (t1 - t0) for c, b in zip(a0, a1)]
+        peak_jerk = max(peak_jerk, math.sqrt(sum(x * x for x in j)))
+    return peak_speed, peak_acceleration, peak_jerk
+
+def _timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_queries(rate, hours, repeat=5):
+    seconds = hours * 3600
+    ring, rows = _filled_ring(rate, seconds, window_seconds=60)
+    history = collections.deque(((r["t"], tuple(r["pose"]), tuple(r["joints"]), tuple(r["commanded"]))
+                                 for r in rows[-int(rate * 60):]), maxlen=int(rate * 60))
+    results = []
+    for label, window_seconds in (("1 s", 1), ("10 s", 10), ("60 s", 60), (f"{hours:g} h", seconds)):
+        view = ring.window(seconds=window_seconds, copy=False)
+        results.append((label, len(view), view.base is not None,
+                        _timed(lambda: ring.window(seconds=window_seconds, copy=False), repeat),
+                        _timed(lambda: ring.window(seconds=window_seconds), repeat),
+                        _timed(lambda: derivatives(ring.window(seconds=window_seconds)), repeat),
+                        _timed(lambda: motion_summary(ring.window(seconds=window_seconds)), repeat)))
+    python = []
+    for label, window_seconds in (("1 s", 1), ("10 s", 10), ("60 s", 60)):
+        n = int(rate * window_seconds)
+        python.append((label, _timed(lambda: _python_summary(list(history)[-n:]), max(1, repeat // 2))))
+    return ring, results, python
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry ring buffer benchmark")
+    parser.add_argument("--rate", type=float, default=250.0, help="State reports per second")
+    parser.add_argument("--hours", type=float, default=1.0, help="History held in the ring")
+    parser.add_argument("--appends", type=int, default=200000)
+    args = parser.parse_args()
+
+    receive_path, ring_only = bench_append(args.appends, args.rate)
+    print(f"appends/s: {ring_only:,.0f} ring only, {receive_path:,.0f} through RobotStateStore "
+          f"(3 reports parsed per row; {receive_path / args.rate:,.0f}x a {args.rate:g} Hz robot)")
+    ring, results, python = bench_queries(args.rate, args.hours)
+    print(f"{len(ring):,} rows ({ring.data.nbytes / 1e6:.0f} MB) at {args.rate:g} Hz")
+    print(f"{'window':<7} {'rows':>9} {'view':>5} {'view ms':>8} {'copy ms':>8} {'derivs ms':>10} {'summary ms':>11}")
+    for label, rows, view, view_time, copy_time, derivative_time, summary_time in results:
+        print(f"{label:<7} {rows:>9,} {'yes' if view else 'copy':>5} {view_time * 1e3:>8.3f} {copy_time * 1e3:>8.3f} "
+              f"{derivative_time * 1e3:>10.2f} {summary_time * 1e3:>11.2f}")
+    for label, elapsed in python:
+        print(f"{label:<7} per-sample Python tuples, speed/accel/jerk only: {elapsed * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import threading
+import numpy as np
+
+# One row per state report cycle (ctrans, crot, cjoints from rapid/Server.mod), plus the
+# commanded pose in force at the time. Poses are x y z (mm) q1..q4, joints in degrees.
+TELEMETRY_DTYPE = np.dtype([
+    ("t", "f8"),
+    ("pose", "f8", 7),
+    ("joints", "f8", 6),
+    ("commanded", "f8", 7),
+])
+# Report cycles per second: Server.mod's ReportState runs every report_interval (0.05 s in rapid/Common.sys)
+REPORT_RATE_HZ = 20.0
+
+class TelemetryRing:
+    """
+    Preallocated ring of TELEMETRY_DTYPE rows for one robot.
+
+    The first `window` rows are also written past the end of the array, so any
+    window of up to `window` samples is one contiguous slice: window(copy=False)
+    returns a view, never a copy (longer windows that wrap are copied). One
+    thread appends; other threads read with window(), which copies the rows
+    and drops any the writer overwrote meanwhile, without locking the writer.
+    """
+
+    def __init__(self, capacity, window=None):
+        self.capacity = capacity
+        self.mirror = min(window or capacity, capacity)
+        self.data = np.zeros(capacity + self.mirror, dtype=TELEMETRY_DTYPE)
+        self.data["commanded"] = np.nan
+        self.count = 0  # Rows ever appended
+        self.commanded = (np.nan,) * 7
+
+    def append(self, t, pose, joints):
+        i = self.count % self.capacity
+        row = (t, pose, joints, self.commanded)
+        self.data[i] = row
+        if i < self.mirror:
+            self.data[self.capacity + i] = row
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def window(self, samples=None, seconds=None, copy=True):
+        """
+        The last `samples` rows (or those from the last `seconds`), oldest first. The default copy
+        is safe to read while another thread appends; copy=False returns a view of the ring, which
+        only the appending thread can read safely.
+        """
+        count = self.count
+        n = min(count, self.capacity)
+        if seconds is not None and n:
+            latest = self.data["t"][(count - 1) % self.capacity]
+            # Rows are in time order, so bisect the (at most two) contiguous runs
+            samples = n - self._first_after(latest - seconds, n, count)
+        samples = n if samples is None else min(samples, n)
+        start = (count - samples) % self.capacity
+        if start + samples <= self.capacity + self.mirror:
+            rows = self.data[start:start + samples]
+            if not copy:
+                return rows
+            rows = rows.copy()
+        else:
+            rows = np.concatenate((self.data[start:self.capacity], self.data[:start + samples - self.capacity]))
+        # Re-check the write index after the copy: rows appended since then (and the one being
+        # written now) overwrote the oldest ones, which are dropped rather than returned torn
+        stale = (self.count - self.capacity + 1) - (count - samples)
+        return rows[stale:] if stale > 0 and copy else rows
+
+    def _first_after(self, t, n, count):
+        """Index (0 = oldest of the n rows up to row `count`) of the first row with timestamp >= t"""
+        oldest = (count - n) % self.capacity
+        times = self.data["t"]
+        if oldest + n <= self.capacity:
+            return int(np.searchsorted(times[oldest:oldest + n], t))
+        head = times[oldest:self.capacity]
+        if head.size and head[-1] >= t:
+            return int(np.searchsorted(head, t))
+        return head.size + int(np.searchsorted(times[:n - head.size], t))
+
+def derivatives(window, field="pose"):
+    """Velocity, acceleration and jerk per axis of a window: x y z for "pose", j1..j6 for "joints" (units per s, s^2, s^3)"""
+    t = window["t"]
+    values = window[field][:, :3] if field == "pose" else window[field]
+    if len(t) < 4:
+        empty = np.zeros((len(t), values.shape[1]))
+        return empty, empty, empty
+    velocity = np.gradient(values, t, axis=0)
+    acceleration = np.gradient(velocity, t, axis=0)
+    jerk = np.gradient(acceleration, t, axis=0)
+    return velocity, acceleration, jerk
+
+def tracking_error(window):
+    """Commanded vs reported pose: position error (mm) and orientation error (degrees) per sample, NaN before any command"""
+    commanded = window["commanded"]
+    pose = window["pose"]
+    position = np.linalg.norm(commanded[:, :3] - pose[:, :3], axis=1)
+    dot = np.abs(np.einsum("ij,ij->i", commanded[:, 3:], pose[:, 3:]))
+    orientation = np.degrees(2 * np.arccos(np.clip(dot, 0.0, 1.0)))
+    return position, orientation
+
+def rate_stats(window):
+    """Report rate and gaps of a window"""
+    dt = np.diff(window["t"])
+    if not dt.size:
+        return {"samples": len(window), "rate_hz": 0.0, "dt_mean_ms": 0.0, "dt_std_ms": 0.0, "dt_max_ms": 0.0, "gaps": 0}
+    mean = dt.mean()
+    return {
+        "samples": len(window),
+        "rate_hz": 1.0 / mean if mean > 0 else 0.0,
+        "dt_mean_ms": mean * 1e3,
+        "dt_std_ms": dt.std() * 1e3,
+        "dt_max_ms": dt.max() * 1e3,
+        "gaps": int(np.count_nonzero(dt > 2 * np.median(dt))),
+    }
+
+def motion_summary(window):
+    """Peak speed, acceleration and jerk (TCP, mm units), tracking error and rate for a window"""
+    velocity, acceleration, jerk = derivatives(window)
+    position, orientation = tracking_error(window)
+    has_command = ~np.isnan(position)
+    return {
+        "peak_speed": float(np.linalg.norm(velocity, axis=1).max()) if len(velocity) else 0.0,
+        "peak_acceleration": float(np.linalg.norm(acceleration, axis=1).max()) if len(acceleration) else 0.0,
+        "peak_jerk": float(np.linalg.norm(jerk, axis=1).max()) if len(jerk) else 0.0,
+        "tracking_error_mean_mm": float(position[has_command].mean()) if has_command.any() else None,
+        "tracking_error_max_mm": float(position[has_command].max()) if has_command.any() else None,
+        "orientation_error_max_deg": float(orientation[has_command].max()) if has_command.any() else None,
+        "rate": rate_stats(window),
+    }
+
+class TelemetryStore:
+    """
+    A TelemetryRing per robot, fed from RobotStateStore: one row is appended
+    when both the pose and the joints of a robot have been reported again
+    since the last row (one ReportState cycle). rate_hz sizes the rings and
+    should match the controller's report rate; set it if report_interval changes.
+    """
+
+    def __init__(self, seconds=600.0, rate_hz=REPORT_RATE_HZ, window_seconds=60.0):
+        self.capacity = int(seconds * rate_hz)
+        self.window = int(window_seconds * rate_hz)
+        self.rings = {}
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def ring(self, client_id):
+        ring = self.rings.get(client_id)
+        if ring is None:
+            with self.lock:
+                ring = self.rings.get(client_id)
+                if ring is None:
+                    ring = self.rings[client_id] = TelemetryRing(self.capacity, self.window)
+        return ring
+
+    def on_state(self, state):
+        """Call after RobotStateStore.update(); appends if a full report cycle has arrived"""
+        last_pose, last_joints = self.versions.get(state.client_id, (0, 0))
+        pose = state.pose
+        if pose is None or state.joints is None or state.pose_version == last_pose or state.joints_version == last_joints:
+            return False
+        self.versions[state.client_id] = (state.pose_version, state.joints_version)
+        self.ring(state.client_id).append(state.timestamp, pose, state.joints)
+        return True
+
+    def set_commanded(self, client_id, pose):
+        self.ring(client_id).commanded = tuple(pose)
+
+    def summary(self, client_id, seconds=10.0):
+        ring = self.rings.get(client_id)
+        if ring is None or not len(ring):
+            return None
+        return motion_summary(ring.window(seconds=seconds))
+
+    def stats(self):
+        return {client_id: {"samples": len(ring), "appended": ring.count} for client_id, ring in self.rings.items()}
@@ -0,0 +1,202 @@
+import re
+import threading
+import numpy as np
+
+# Reasons a target is rejected; check_* return a bitmask per target
+NOT_FINITE = 1
+OUTSIDE_WORKSPACE = 2
+OUTSIDE_ZONE = 4
+BAD_QUATERNION = 8
+STEP_TOO_LARGE = 16
+TOO_FAST = 32
+JOINT_LIMIT = 64
+JOINT_STEP_TOO_LARGE = 128
+REASONS = {
+    NOT_FINITE: "not a number",
+    OUTSIDE_WORKSPACE: "outside workspace",
+    OUTSIDE_ZONE: "outside safe zone",
+    BAD_QUATERNION: "bad quaternion",
+    STEP_TOO_LARGE: "step too large",
+    TOO_FAST: "too fast",
+    JOINT_LIMIT: "joint limit",
+    JOINT_STEP_TOO_LARGE: "joint step too large",
+}
+
+_POSE = re.compile(r"pose/\[\[([^\]]*)\],\[([^\]]*)\]\]")
+_JOINTS = re.compile(r"joints/\[([^\[\]]*)")
+
+def _other_commands(command):
+    """True if command holds anything besides pose/ and joints/ targets"""
+    return any(not part.lstrip().startswith(("pose/", "joints/")) for part in command.split(";") if part.strip())
+
+def reason_names(mask):
+    return [name for bit, name in REASONS.items() if mask & bit]
+
+class RobotLimits:
+    """
+    Limits for one robot. All optional:
+      workspace       [[xmin, xmax], [ymin, ymax], [zmin, zmax]] in mm
+      zone            convex safe zone as half-spaces [[a, b, c, d], ...], inside where a*x + b*y + c*z <= d
+      joint_limits    [[min, max]] * 6 in degrees
+      max_step        mm between consecutive pose targets
+      max_speed       mm/s from the previous pose target, using the time between commands
+      max_joint_step  degrees between consecutive joint targets, per joint
+    """
+
+    def __init__(self, workspace=None, zone=None, joint_limits=None, max_step=None, max_speed=None, max_joint_step=None):
+        self.workspace = np.asarray(workspace, dtype=float) if workspace is not None else None
+        zone = np.asarray(zone, dtype=float).reshape(-1, 4) if zone is not None else None
+        self.zone_normals = zone[:, :3] if zone is not None else None
+        self.zone_offsets = zone[:, 3] if zone is not None else None
+        self.joint_limits = np.asarray(joint_limits, dtype=float) if joint_limits is not None else None
+        self.max_step = max_step
+        self.max_speed = max_speed
+        self.max_joint_step = max_joint_step
+
+def check_poses(limits, poses, previous=None, dt=None):
+    """
+    Bitmask of violations for each row of poses (N x 7: x y z q1..q4), in one pass of NumPy.
+    previous is the last accepted pose (steps are measured from it). dt is the time to the
+    first target for the speed check, or an array with the time to each target.
+    """
+    poses = np.asarray(poses, dtype=float).reshape(-1, 7)
+    position = poses[:, :3]
+    mask = np.where(np.all(np.isfinite(poses), axis=1), 0, NOT_FINITE)
+    if limits.workspace is not None:
+        outside = np.any((position < limits.workspace[:, 0]) | (position > limits.workspace[:, 1]), axis=1)
+        mask |= np.where(outside, OUTSIDE_WORKSPACE, 0)
+    if limits.zone_normals is not None:
+        outside = np.any(position @ limits.zone_normals.T > limits.zone_offsets, axis=1)
+        mask |= np.where(outside, OUTSIDE_ZONE, 0)
+    mask |= np.where(np.abs(np.linalg.norm(poses[:, 3:], axis=1) - 1.0) > 0.01, BAD_QUATERNION, 0)
+    if limits.max_step is not None or limits.max_speed is not None:
+        if previous is not None:
+            before = np.vstack((np.asarray(previous, dtype=float)[:3], position[:-1]))
+            steps = np.linalg.norm(position - before, axis=1)
+        else:
+            steps = np.r_[0.0, np.linalg.norm(np.diff(position, axis=0), axis=1)]
+        if limits.max_step is not None:
+            mask |= np.where(steps > limits.max_step, STEP_TOO_LARGE, 0)
+        if limits.max_speed is not None and dt is not None:
+            if np.ndim(dt) == 0:
+                # Targets sent together have no time between them; only the first is timed
+                dt = np.r_[dt, np.full(len(steps) - 1, np.inf)]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                speed = steps / np.asarray(dt, dtype=float)
+            mask |= np.where(speed > limits.max_speed, TOO_FAST, 0)
+    return mask
+
+def check_joints(limits, joints, previous=None):
+    """Bitmask of violations for each row of joints (N x 6, degrees)"""
+    joints = np.asarray(joints, dtype=float).reshape(-1, 6)
+    mask = np.where(np.all(np.isfinite(joints), axis=1), 0, NOT_FINITE)
+    if limits.joint_limits is not None:
+        outside = np.any((joints < limits.joint_limits[:, 0]) | (joints > limits.joint_limits[:, 1]), axis=1)
+        mask |= np.where(outside, JOINT_LIMIT, 0)
+    if limits.max_joint_step is not None:
+        before = np.vstack((previous, joints[:-1])) if previous is not None else np.vstack((joints[:1], joints[:-1]))
+        mask |= np.where(np.any(np.abs(joints - before) > limits.max_joint_step, axis=1), JOINT_STEP_TOO_LARGE, 0)
+    return mask
+
+class CommandValidator:
+    """
+    Checks pose/ and joints/ targets before commands leave the relay, per robot.
+    A command batch (e.g. an OSC bundle) is accepted or rejected whole. Steps and
+    speed are measured from the last accepted target while targets keep coming.
+    Before the first one, after any other command (GoHome/, a drawing: the robot
+    moves without a target here) and after a pause of stale_after seconds, they
+    are measured from the robot's reported pose (RobotStateStore) instead, and the
+    speed of that first target uses the interval of the last stream of targets.
+    """
+
+    def __init__(self, limits, state_store=None, logger=None, stale_after=1.0):
+        # limits: {client_id or "*": RobotLimits or its keyword dict}
+        self.limits = {client_id: l if isinstance(l, RobotLimits) else RobotLimits(**l) for client_id, l in limits.items()}
+        self.state_store = state_store
+        self.logger = logger or print
+        self.stale_after = stale_after
+        self.lock = threading.Lock()
+        self.last_pose = {}    # client_id -> (pose, time) of the last accepted pose target
+        self.last_joints = {}  # client_id -> (joints, time) of the last accepted joint target
+        self.intervals = {}    # client_id -> seconds between the last two pose targets of a stream
+        self.checked = {}
+        self.rejected = {}  # client_id -> {reason: count}
+
+    def limits_for(self, client_id):
+        return self.limits.get(client_id) or self.limits.get("*")
+
+    def validate(self, client_id, command, now, stream=False):
+        """
+        Returns None if every target in command is allowed (and remembers them), else the reasons.
+        stream=True checks only where the targets are, not steps or speed, and remembers nothing:
+        for dense samples between targets that were checked in full (the interpolator's output).
+        """
+        limits = self.limits_for(client_id)
+        if limits is None:
+            return None
+        if "pose/" not in command and "joints/" not in command:
+            if not stream:
+                self.forget(client_id)
+            return None
+        try:
+            poses = [[float(v) for v in f"{trans},{rot}".split(",")] for trans, rot in _POSE.findall(command)]
+            joints = [[float(v) for v in values.split(",")[:6]] for values in _JOINTS.findall(command)]
+            malformed = any(len(p) != 7 for p in poses) or any(len(j) != 6 for j in joints)
+        except ValueError:
+            malformed = True
+        with self.lock:
+            self.checked[client_id] = self.checked.get(client_id, 0) + 1
+            if malformed:
+                return self._reject(client_id, NOT_FINITE)
+            mask = 0
+            if stream:
+                if poses:
+                    mask |= int(np.bitwise_or.reduce(check_poses(limits, poses)))
+                if joints:
+                    mask |= int(np.bitwise_or.reduce(check_joints(limits, joints)))
+                return self._reject(client_id, mask) if mask else None
+            if _other_commands(command):
+                # Its other commands move the robot before these targets
+                self.last_pose.pop(client_id, None)
+                self.last_joints.pop(client_id, None)
+            state = self.state_store.get(client_id) if self.state_store else None
+            last_pose, last_time = self.last_pose.get(client_id, (None, None))
+            streaming = last_time is not None and now - last_time < self.stale_after
+            if poses:
+                if streaming:
+                    dt = now - last_time
+                else:
+                    last_pose = state.pose if state else None
+                    dt = self.intervals.get(client_id)
+                mask |= int(np.bitwise_or.reduce(check_poses(limits, poses, last_pose, dt)))
+            last_joints, joints_time = self.last_joints.get(client_id, (None, None))
+            if joints_time is None or now - joints_time >= self.stale_after:
+                last_joints = state.joints if state else None
+            if joints:
+                mask |= int(np.bitwise_or.reduce(check_joints(limits, joints, last_joints)))
+            if mask:
+                return self._reject(client_id, mask)
+            if poses:
+                if streaming and now > last_time:
+                    self.intervals[client_id] = now - last_time
+                self.last_pose[client_id] = (poses[-1], now)
+            if joints:
+                self.last_joints[client_id] = (joints[-1], now)
+        return None
+
+    def forget(self, client_id):
+        """Measure the next targets from the reported pose, e.g. after a command that moves the robot otherwise"""
+        with self.lock:
+            self.last_pose.pop(client_id, None)
+            self.last_joints.pop(client_id, None)
+
+    def _reject(self, client_id, mask):
+        names = reason_names(mask)
+        counts = self.rejected.setdefault(client_id, {})
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        return names
+
+    def stats(self):
+        return {client_id: {"checked": checked, "rejected": dict(self.rejected.get(client_id, {}))}
+                for client_id, checked in self.checked.items()}
@@ -0,0 +1,53 @@
+from tcp.robot_state import RobotStateStore
+from validation.command_validator import CommandValidator
+
+# Step and speed references of the validator. Run from the com_manager directory:
+#   python -m pytest -q validation
+
+HOME = (0.0, 0.0, 500.0)
+FAR = (400.0, 0.0, 500.0)
+
+def _pose(position):
+    return "pose/[[{},{},{}],[1,0,0,0]];".format(*position)
+
+def _validator(at=HOME):
+    state = RobotStateStore()
+    _report(state, at)
+    return CommandValidator({"*": {"max_step": 50, "max_speed": 1000}}, state_store=state, logger=lambda message: None), state
+
+def _report(state, position):
+    state.update("robot", "ctrans/[{},{},{}]".format(*position))
+    state.update("robot", "crot/[1,0,0,0]")
+
+def _walk(validator, start, end, now, steps=10, interval=0.1):
+    """Stream targets from start to end; returns the time after the last one"""
+    for i in range(1, steps + 1):
+        position = [a + (b - a) * i / steps for a, b in zip(start, end)]
+        assert validator.validate("robot", _pose(position), now) is None
+        now += interval
+    return now
+
+def test_stream_within_limits():
+    validator, _ = _validator()
+    _walk(validator, HOME, (200.0, 0.0, 500.0), 0.0)
+
+def test_far_target_after_go_home():
+    validator, state = _validator()
+    now = _walk(validator, HOME, FAR, 0.0, steps=20)
+    # The robot drives home, then the last target is sent again: it is 400 mm away now
+    assert validator.validate("robot", "GoHome/;", now) is None
+    _report(state, HOME)
+    assert "step too large" in validator.validate("robot", _pose(FAR), now + 0.1)
+    assert validator.validate("robot", _pose((30.0, 0.0, 500.0)), now + 0.2) is None
+
+def test_too_fast_after_a_pause():
+    validator, state = _validator()
+    now = _walk(validator, HOME, (200.0, 0.0, 500.0), 0.0)
+    _report(state, (200.0, 0.0, 500.0))
+    # After a pause the first target is timed at the last stream's interval, not the pause:
+    # 40 mm at 0.1 s is 400 mm/s
+    assert validator.validate("robot", _pose((240.0, 0.0, 500.0)), now + 5.0) is None
+    now = _walk(validator, (240.0, 0.0, 500.0), (260.0, 0.0, 500.0), now + 5.01, steps=4, interval=0.01)
+    _report(state, (260.0, 0.0, 500.0))
+    # 40 mm at 0.01 s is 4000 mm/s
+    assert "too fast" in validator.validate("robot", _pose((300.0, 0.0, 500.0)), now + 5.0)
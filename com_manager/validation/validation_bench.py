@@ -0,0 +1,93 @@
+import argparse
+import math
+import time
+import numpy as np
+from .command_validator import RobotLimits, CommandValidator, check_poses, OUTSIDE_WORKSPACE, STEP_TOO_LARGE
+
+# Validation benchmark: a whole trajectory in one NumPy call vs a per-target Python loop, and
+# the per-command cost on the relay path. Run from the com_manager directory:
+#   python -m validation.validation_bench [--points 10000] [--commands 20000]
+
+LIMITS = {
+    "workspace": [[-1200, 1200], [-1200, 1200], [0, 1600]],
+    "zone": [[0, 0, -1, -50], [1, 1, 0, 1500]],  # z >= 50, x + y <= 1500
+    "joint_limits": [[-165, 165], [-110, 110], [-110, 70], [-160, 160], [-120, 120], [-400, 400]],
+    "max_step": 50.0,
+    "max_speed": 2000.0,
+    "max_joint_step": 10.0,
+}
+
+def _trajectory(points):
+    t = np.linspace(0, 2 * math.pi, points)
+    poses = np.zeros((points, 7))
+    poses[:, 0] = 600 + 300 * np.cos(t)
+    poses[:, 1] = 300 * np.sin(t)
+    poses[:, 2] = 400 + 100 * np.sin(3 * t)
+    poses[:, 3] = 1.0
+    # A few bad targets: out of the box, and a jump
+    poses[points // 3, 2] = 2000
+    poses[points // 2, 0] += 400
+    return poses
+
+def _python_check(limits, poses, previous):
+    """The same workspace, zone, quaternion and step checks, one target at a time"""
+    masks = []
+    (xmin, xmax), (ymin, ymax), (zmin, zmax) = limits["workspace"]
+    for pose in poses:
+        x, y, z = pose[0], pose[1], pose[2]
+        mask = 0
+        if not (xmin <= x <= xmax and ymin <= y <= ymax and zmin <= z <= zmax):
+            mask |= OUTSIDE_WORKSPACE
+        for a, b, c, d in limits["zone"]:
+            if a * x + b * y + c * z > d:
+                mask |= 4
+        if abs(math.sqrt(sum(q * q for q in pose[3:])) - 1.0) > 0.01:
+            mask |= 8
+        if previous is not None and math.dist(pose[:3], previous[:3]) > limits["max_step"]:
+            mask |= STEP_TOO_LARGE
+        previous = pose
+        masks.append(mask)
+    return masks
+
+def _timed(function, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Command validation benchmark")
+    parser.add_argument("--points", type=int, default=10000, help="Trajectory length")
+    parser.add_argument("--commands", type=int, default=20000, help="Single-target commands through CommandValidator")
+    args = parser.parse_args()
+
+    limits = RobotLimits(**LIMITS)
+    poses = _trajectory(args.points)
+    pose_list = poses.tolist()
+    numpy_time, numpy_masks = _timed(lambda: check_poses(limits, poses))
+    python_time, python_masks = _timed(lambda: _python_check(LIMITS, pose_list, None))
+    agree = list(numpy_masks) == python_masks
+    print(f"trajectory of {args.points:,} targets: NumPy {numpy_time * 1e3:.2f} ms, Python loop {python_time * 1e3:.2f} ms "
+          f"({python_time / numpy_time:.0f}x), {int(np.count_nonzero(numpy_masks))} rejected, results agree: {agree}")
+
+    validator = CommandValidator({"*": LIMITS})
+    commands = [f"pose/[[{p[0]:.2f},{p[1]:.2f},{p[2]:.2f}],[1.000000,0.000000,0.000000,0.000000]];" for p in pose_list]
+    start = time.perf_counter()
+    now = 0.0
+    for i in range(args.commands):
+        now += 0.01
+        validator.validate("robot", commands[i % len(commands)], now)
+    elapsed = time.perf_counter() - start
+    print(f"relay path: {elapsed / args.commands * 1e6:.1f} us per pose command "
+          f"({args.commands / elapsed:,.0f} commands/s), rejected {validator.stats()['robot']['rejected']}")
+    start = time.perf_counter()
+    for i in range(args.commands):
+        validator.validate("robot", "GoHome/;", now)
+    elapsed = time.perf_counter() - start
+    print(f"non-motion commands: {elapsed / args.commands * 1e6:.2f} us each")
+
+if __name__ == "__main__":
+    main()